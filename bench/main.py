@@ -0,0 +1,187 @@
+""" Benchmark process """
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from itertools import islice
+from statistics import median
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+from pyummeter import UMmeter, UMmeterDecoder, UMmeterInterfaceReplay
+from pyummeter.export_csv import ExportCSV
+from pyummeter.parser import UMmeterFrameParser
+from pyummeter.sampler import UMmeterSampler
+
+# UM25C data dump.
+FRAME = bytes.fromhex(
+    "09c901fe0148000006880014004400080000000b00000038000000000000000000000000"
+    "000000000000000000000000000000000000000000000000000000000000000000000000"
+    "00000000000000000000000000000000000000000000002a000100020009000000100000"
+    "0100000a000000f00001000200040001869f0002688c")
+
+
+def meter() -> UMmeter:
+    """ Create meter answering requests from memory """
+    return UMmeter(UMmeterInterfaceReplay([(0, FRAME)], loop=True))
+
+
+def bench_decode(nb: int) -> int:
+    """ Decode data dumps """
+    decoder = UMmeterDecoder()
+    for _ in range(nb):
+        decoder.decode(FRAME)
+    return nb
+
+
+def bench_parser(nb: int) -> int:
+    """ Parse data dumps received in chunks of 20 bytes """
+    parser = UMmeterFrameParser()
+    chunks = [FRAME[i:i + 20] for i in range(0, len(FRAME), 20)]
+    frames = 0
+    for _ in range(nb):
+        for chunk in chunks:
+            frames += len(parser.feed(chunk))
+    return frames
+
+
+def bench_get_data(nb: int) -> int:
+    """ Request and decode data dumps """
+    with meter() as um:
+        for _ in range(nb):
+            um.get_data()
+    return nb
+
+
+def bench_get_frame(nb: int) -> int:
+    """ Request data dumps, decoded on access of power """
+    with meter() as um:
+        for _ in range(nb):
+            frame = um.get_frame()
+            assert frame is not None
+            _ = frame["power"]
+    return nb
+
+
+def _export(nb: int, flush_rows: Optional[int]) -> int:
+    """ Write rows to CSV file """
+    data = UMmeterDecoder().decode(FRAME)
+    now = datetime.now()
+    with tempfile.TemporaryDirectory() as directory:
+        with ExportCSV(os.path.join(directory, "bench.csv"), flush_rows=flush_rows) as export:
+            for _ in range(nb):
+                export.update(now, data)
+    return nb
+
+
+def bench_export(nb: int) -> int:
+    """ Write rows to CSV file, flushed on each row """
+    return _export(nb, 1)
+
+
+def bench_export_buffered(nb: int) -> int:
+    """ Write rows to CSV file, flushed every 1000 rows """
+    return _export(nb, 1000)
+
+
+def bench_loop(nb: int) -> int:
+    """ Sample without delay and export (loop overhead) """
+    with tempfile.TemporaryDirectory() as directory:
+        with meter() as um, ExportCSV(os.path.join(directory, "bench.csv")) as export:
+            sampler = UMmeterSampler(um, timedelta(0))
+            for date, data in islice(sampler, nb):
+                assert data is not None
+                export.update(date, data)
+    return nb
+
+
+BENCHMARKS: Dict[str, Callable[[int], int]] = {
+    "decode": bench_decode,
+    "parser": bench_parser,
+    "get_data": bench_get_data,
+    "get_frame": bench_get_frame,
+    "export": bench_export,
+    "export_buffered": bench_export_buffered,
+    "loop": bench_loop,
+}
+
+
+def run(name: str, nb: int, repeat: int) -> Dict[str, float]:
+    """ Run benchmark, return median and best rate (items per second) """
+    bench = BENCHMARKS[name]
+    bench(max(1, nb // 10))  # Warm-up.
+    rates: List[float] = []
+    for _ in range(repeat):
+        start = perf_counter()
+        items = bench(nb)
+        rates.append(items / (perf_counter() - start))
+    return {"median": median(rates), "best": max(rates)}
+
+
+def environment() -> Dict[str, str]:
+    """ Describe benchmark environment, to compare results """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def parse_args():
+    """ Parse input arguments """
+    args = argparse.ArgumentParser()
+    args.add_argument("--number", "-n", type=int, default=20000,
+                      help="Number of items per run")
+    args.add_argument("--repeat", "-r", type=int, default=5,
+                      help="Number of runs per benchmark")
+    args.add_argument("--only", "-o", type=str, action="append", default=[],
+                      choices=list(BENCHMARKS), help="Benchmark to run (default: all)")
+    args.add_argument("--json", "-j", type=str, default="",
+                      help="Results output file")
+    args.add_argument("--compare", "-c", type=str, default="",
+                      help="Baseline results file to compare with")
+    args.add_argument("--threshold", "-t", type=float, default=10.0,
+                      help="Regression threshold in percent (with --compare)")
+    return args.parse_args()
+
+
+if __name__ == "__main__":
+    params = parse_args()
+    baseline: Dict[str, Dict[str, float]] = {}
+    if params.compare != "":
+        with open(params.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+    results = {}
+    regressions = []
+    for bench_name in params.only or list(BENCHMARKS):
+        result = run(bench_name, params.number, params.repeat)
+        results[bench_name] = result
+        line = f"{bench_name:<16} {result['median']:>12.0f}/s (best {result['best']:.0f}/s)"
+        if bench_name in baseline:
+            change = (result["median"] / baseline[bench_name]["median"] - 1) * 100
+            line += f" {change:+6.1f}%"
+            if change < -params.threshold:
+                regressions.append(bench_name)
+        print(line)
+    if params.json != "":
+        with open(params.json, "w", encoding="utf-8") as file:
+            json.dump({
+                "environment": environment(),
+                "number": params.number,
+                "repeat": params.repeat,
+                "results": results,
+            }, file, indent=2)
+    if regressions:
+        print(f"Regression over {params.threshold}%: {', '.join(regressions)}")
+        sys.exit(1)
@@ -1,10 +1,13 @@
 """ Main process """
 import argparse
-from datetime import datetime
+from datetime import datetime, timedelta
 from time import sleep
 from typing import Optional
 from pyummeter import UMmeter, UMmeterInterfaceTTY
+from pyummeter.capture import CaptureWriter
 from pyummeter.export_csv import ExportCSV
+from pyummeter.export_queue import ExportQueue
+from pyummeter.sampler import DeadlineScheduler
 
 
 def parse_args():
@@ -16,21 +19,35 @@ def parse_args():
                       help="Refresh period between each data dump")
     args.add_argument("--export", "-e", type=str, default="",
                       help="CSV export file")
+    args.add_argument("--capture", "-c", type=str, default="",
+                      help="Raw data dump capture file")
     return args.parse_args()
 
 
 if __name__ == "__main__":
     params = parse_args()
     # Prepare export instance if required.
-    export: Optional[ExportCSV] = None
+    # Rows are written from a worker thread, out of the polling loop.
+    export: Optional[ExportQueue] = None
     if params.export != "":
-        export = ExportCSV(params.export)
+        export = ExportQueue(ExportCSV(params.export), overflow="drop_oldest")
+    capture: Optional[CaptureWriter] = None
+    if params.capture != "":
+        capture = CaptureWriter(params.capture)
     # Run data dump process.
     with UMmeter(UMmeterInterfaceTTY(params.tty)) as meter:
+        scheduler = DeadlineScheduler(timedelta(seconds=params.refresh))
         try:
             while True:
-                data = meter.get_data()
+                # Request on a fixed-rate deadline grid.
+                sleep(scheduler.delay())
+                scheduler.tick()
                 now = datetime.now()
+                data = meter.get_frame()
+                if data is None:
+                    continue
+                if capture is not None:
+                    capture.write(data.raw)
                 if export is not None:
                     export.update(now, data)
                 print(
@@ -38,6 +55,14 @@ if __name__ == "__main__":
                     f" {data['voltage']:1.04f}V {data['intensity']:1.04f}A"
                     f" {data['power']:1.04f}W {data['resistance']}Ohm"
                 )
-                sleep(params.refresh)
         except KeyboardInterrupt:
-            pass
+            stats = scheduler.stats()
+            print(
+                f"{stats.samples} samples ({stats.rate:1.02f}/s),"
+                f" {stats.missed} missed, jitter {stats.jitter * 1000:1.01f}ms"
+            )
+        finally:
+            if export is not None:
+                export.close()
+            if capture is not None:
+                capture.close()
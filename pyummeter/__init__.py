@@ -1,3 +1,8 @@
-from pyummeter.ummeter import UMmeter, UMmeterData, UMmeterDataGroup  # noqa: F401
-from pyummeter.interface_base import UMmeterInterface  # noqa: F401
+from pyummeter.ummeter import AsyncUMmeter, UMmeter, UMmeterData, UMmeterDataGroup  # noqa: F401
+from pyummeter.decoder import UMmeterDecoder, UMmeterFrame  # noqa: F401
+from pyummeter.interface_base import UMmeterAsyncInterface, UMmeterInterface  # noqa: F401
 from pyummeter.interface_tty import UMmeterInterfaceTTY  # noqa: F401
+from pyummeter.interface_async_tty import UMmeterInterfaceAsyncTTY  # noqa: F401
+from pyummeter.interface_replay import UMmeterInterfaceReplay  # noqa: F401
+from pyummeter.interface_shared import UMmeterInterfaceShared  # noqa: F401
+from pyummeter.interface_tcp import UMmeterInterfaceTCP  # noqa: F401
@@ -0,0 +1,194 @@
+""" UM-Meter batch decoding (requires NumPy) """
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from pyummeter.decoder import Buffer, UMmeterDecoder, UMmeterScale
+from pyummeter.integrator import IntegratorTotals
+
+_DG = (UMmeterDecoder.DATA_GROUP_COUNT,)
+
+# Raw data dump layout, matching the decoder frame format.
+RAW_DTYPE = np.dtype([
+    ("model_id", ">u2"),
+    ("voltage", ">u2"),
+    ("intensity", ">u2"),
+    ("power", ">u4"),
+    ("temperature_celsius", ">u2"),
+    ("temperature_fahrenheit", ">u2"),
+    ("data_group_selected", ">u2"),
+    ("data_group", ">u4", _DG + (2,)),
+    ("usb_voltage_dp", ">u2"),
+    ("usb_voltage_dn", ">u2"),
+    ("charging_mode", ">u2"),
+    ("record_capacity_threshold", ">u4"),
+    ("record_energy_threshold", ">u4"),
+    ("record_intensity_threshold", ">u2"),
+    ("record_duration", ">u4"),
+    ("record_enabled", ">u2"),
+    ("screen_timeout", ">u2"),
+    ("screen_brightness", ">u2"),
+    ("resistance", ">u4"),
+    ("screen_index", ">u2"),
+    ("reserved", "u1"),
+    ("checksum", "u1"),
+])
+assert RAW_DTYPE.itemsize == UMmeterDecoder.FRAME_SIZE
+# Capture record layout, see pyummeter.capture.
+RECORD_DTYPE = np.dtype([
+    ("timestamp", ">i8"),
+    ("frame", RAW_DTYPE),
+])
+
+# Decoded data layout, one field per UMmeterData key.
+# The data group list is split into capacity and energy columns.
+FRAME_DTYPE = np.dtype([
+    ("model", "U7"),
+    ("voltage", "f8"),
+    ("intensity", "f8"),
+    ("power", "f8"),
+    ("resistance", "f8"),
+    ("usb_voltage_dp", "f8"),
+    ("usb_voltage_dn", "f8"),
+    ("charging_mode", "U7"),
+    ("charging_mode_full", "U36"),
+    ("temperature_celsius", "i4"),
+    ("temperature_fahrenheit", "i4"),
+    ("data_group_selected", "i4"),
+    ("data_group_capacity", "f8", _DG),
+    ("data_group_energy", "f8", _DG),
+    ("record_capacity_threshold", "f8"),
+    ("record_energy_threshold", "f8"),
+    ("record_intensity_threshold", "f8"),
+    ("record_duration", "m8[s]"),
+    ("record_enabled", "?"),
+    ("screen_index", "i4"),
+    ("screen_timeout", "m8[m]"),
+    ("screen_brightness", "i4"),
+    ("checksum", "u1"),
+])
+FRAME_FIELDS: Tuple[str, ...] = FRAME_DTYPE.names or ()
+
+# Scaled fields: (decoded field, raw field, conversion divisor field).
+_SCALED = [
+    ("voltage", "voltage", "voltage"),
+    ("intensity", "intensity", "intensity"),
+    ("power", "power", "power"),
+    ("resistance", "resistance", "resistance"),
+    ("usb_voltage_dp", "usb_voltage_dp", "usb_voltage"),
+    ("usb_voltage_dn", "usb_voltage_dn", "usb_voltage"),
+    ("record_capacity_threshold", "record_capacity_threshold", "record_capacity_threshold"),
+    ("record_energy_threshold", "record_energy_threshold", "record_energy_threshold"),
+    ("record_intensity_threshold", "record_intensity_threshold", "record_intensity_threshold"),
+]
+# Copied fields: (decoded field, raw field).
+_COPIED = [
+    ("temperature_celsius", "temperature_celsius"),
+    ("temperature_fahrenheit", "temperature_fahrenheit"),
+    ("data_group_selected", "data_group_selected"),
+    ("record_duration", "record_duration"),
+    ("screen_index", "screen_index"),
+    ("screen_timeout", "screen_timeout"),
+    ("screen_brightness", "screen_brightness"),
+    ("checksum", "checksum"),
+]
+
+# Model ID and charging mode are 16-bit values, resolved with lookup tables.
+_ID_RANGE = 1 << 16
+
+
+def _present(ids: np.ndarray) -> List[int]:
+    """ Get distinct 16-bit identifiers present in a column """
+    return [int(i) for i in np.flatnonzero(np.bincount(ids, minlength=_ID_RANGE))]
+
+
+def frames_view(buffer: Buffer) -> np.ndarray:
+    """ Get a zero-copy raw view of concatenated data dump frames """
+    if len(buffer) % UMmeterDecoder.FRAME_SIZE != 0:
+        raise ValueError("UM-Meter: buffer is not a whole number of frames")
+    return np.frombuffer(buffer, dtype=RAW_DTYPE)
+
+
+def decode_frames(buffer: Buffer) -> Dict[str, np.ndarray]:
+    """ Decode concatenated data dump frames into columns (FRAME_DTYPE fields) """
+    return _decode(frames_view(buffer))
+
+
+def decode_records(buffer: Buffer) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """ Decode concatenated capture records into timestamps and columns """
+    if len(buffer) % RECORD_DTYPE.itemsize != 0:
+        raise ValueError("UM-Meter: buffer is not a whole number of records")
+    records = np.frombuffer(buffer, dtype=RECORD_DTYPE)
+    return records["timestamp"].astype("M8[ns]"), _decode(records["frame"])
+
+
+def _decode(raw: np.ndarray) -> Dict[str, np.ndarray]:
+    """ Decode raw data dump array into columns """
+    decoder = UMmeterDecoder()
+    out = {
+        name: np.empty(len(raw), dtype=FRAME_DTYPE[name])
+        for name in FRAME_FIELDS
+    }
+    # Resolve model and conversion divisors once per model ID present.
+    # Unknown models use an infinite divisor, so values are converted to 0.
+    model_idx = raw["model_id"].astype(np.intp)
+    models = np.zeros(_ID_RANGE, dtype=FRAME_DTYPE["model"])
+    scales = np.full((_ID_RANGE, len(UMmeterScale._fields)), np.inf)
+    for model_id in _present(model_idx):
+        model, scale = decoder.resolve(model_id)
+        models[model_id] = model
+        if scale is not None:
+            scales[model_id] = scale
+    np.take(models, model_idx, out=out["model"])
+    div = {
+        name: scales[:, i].take(model_idx)
+        for i, name in enumerate(UMmeterScale._fields)
+    }
+    for field, raw_field, div_field in _SCALED:
+        np.divide(raw[raw_field], div[div_field], out=out[field])
+    np.divide(
+        raw["data_group"][:, :, 0], div["data_group_capacity"][:, None],
+        out=out["data_group_capacity"])
+    np.divide(
+        raw["data_group"][:, :, 1], div["data_group_energy"][:, None],
+        out=out["data_group_energy"])
+    for field, raw_field in _COPIED:
+        out[field][...] = raw[raw_field]
+    np.equal(raw["record_enabled"], 1, out=out["record_enabled"])
+    cmode_idx = raw["charging_mode"].astype(np.intp)
+    cmodes = np.zeros(_ID_RANGE, dtype=FRAME_DTYPE["charging_mode"])
+    cmodes_full = np.zeros(_ID_RANGE, dtype=FRAME_DTYPE["charging_mode_full"])
+    for cmode in _present(cmode_idx):
+        cmodes[cmode], cmodes_full[cmode] = decoder.charging_mode(cmode)
+    np.take(cmodes, cmode_idx, out=out["charging_mode"])
+    np.take(cmodes_full, cmode_idx, out=out["charging_mode_full"])
+    return out
+
+
+def to_records(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """ Pack decoded columns into a structured array (FRAME_DTYPE) """
+    records = np.empty(len(columns["model"]), dtype=FRAME_DTYPE)
+    for name in FRAME_FIELDS:
+        records[name] = columns[name]
+    return records
+
+
+def integrate(
+        timestamps: np.ndarray, intensity: np.ndarray, power: np.ndarray,
+        max_gap: Optional[timedelta] = timedelta(seconds=5)) -> IntegratorTotals:
+    """ Integrate capacity and energy of samples (see UMmeterIntegrator)
+
+        Timestamps are datetime64 (e.g. from decode_records), or seconds.
+    """
+    if np.issubdtype(timestamps.dtype, np.datetime64):
+        elapsed = np.diff(timestamps).astype("m8[ns]").astype("f8") / 1e9
+    else:
+        elapsed = np.diff(timestamps.astype("f8"))
+    gaps = elapsed < 0
+    if max_gap is not None:
+        gaps |= elapsed > max_gap.total_seconds()
+    elapsed[gaps] = 0.0
+    capacity = np.dot(intensity[:-1] + intensity[1:], elapsed) / 2
+    energy = np.dot(power[:-1] + power[1:], elapsed) / 2
+    return IntegratorTotals(
+        float(capacity) / 3600, float(energy) / 3600,
+        timedelta(seconds=float(elapsed.sum())), len(timestamps), int(gaps.sum()))
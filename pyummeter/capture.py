@@ -0,0 +1,146 @@
+""" Raw data dump capture """
+#
+# File format: header, followed by fixed-size records.
+# - Header: magic (8 bytes), version (u16), record size (u16), reserved (4 bytes).
+# - Record: timestamp in nanoseconds since epoch (i64), raw data dump (130 bytes).
+# All integers are big-endian, as in data dumps.
+#
+import mmap
+import os
+from struct import Struct
+from time import time_ns
+from typing import Iterator, Optional, Tuple
+from pyummeter.decoder import Buffer, UMmeterDecoder
+
+_HEADER = Struct(">8sHH4x")
+_MAGIC = b"UMMETER\x00"
+_VERSION = 1
+_TIMESTAMP = Struct(">q")
+RECORD_SIZE = _TIMESTAMP.size + UMmeterDecoder.FRAME_SIZE
+HEADER_SIZE = _HEADER.size
+
+
+def _check_header(header: Buffer):
+    """ Check capture file header """
+    if len(header) != HEADER_SIZE:
+        raise IOError("Capture: invalid header")
+    magic, version, record_size = _HEADER.unpack(header)
+    if magic != _MAGIC or version != _VERSION or record_size != RECORD_SIZE:
+        raise IOError("Capture: unsupported file format")
+
+
+class CaptureWriter:
+    """ Capture writer instance, appending records to file """
+    def __init__(self, filename: str):
+        assert filename is not None
+        assert len(filename) != 0
+        self._path = filename
+        self._file = open(self._path, "ab")  # pylint: disable=consider-using-with
+        self._is_open = True
+        if self._file.tell() == 0:
+            # New file, write header.
+            self._file.write(_HEADER.pack(_MAGIC, _VERSION, RECORD_SIZE))
+        else:
+            with open(self._path, "rb") as capture:
+                _check_header(capture.read(HEADER_SIZE))
+            # Discard incomplete record (interrupted write).
+            size = self._file.tell() - HEADER_SIZE
+            self._file.truncate(HEADER_SIZE + size - size % RECORD_SIZE)
+            self._file.seek(0, os.SEEK_END)
+
+    def __str__(self):
+        return f"<CaptureWriter: path={self._path}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _1, _2, _3):
+        self.close()
+
+    def is_open(self) -> bool:
+        """ Check if capture file is open """
+        return self._is_open
+
+    def close(self):
+        """ Flush pending records and close capture file """
+        if self.is_open():
+            self._file.close()
+            self._is_open = False
+
+    def flush(self):
+        """ Flush pending records to capture file """
+        self._file.flush()
+
+    def write(self, frame: Buffer, timestamp_ns: Optional[int] = None):
+        """ Append raw data dump, timestamped now if no timestamp given """
+        if not self.is_open():
+            raise IOError("Capture: file is closed")
+        if len(frame) != UMmeterDecoder.FRAME_SIZE:
+            raise ValueError("Capture: invalid frame size")
+        if timestamp_ns is None:
+            timestamp_ns = time_ns()
+        self._file.write(_TIMESTAMP.pack(timestamp_ns))
+        self._file.write(frame)
+
+
+class CaptureReader:
+    """ Capture reader instance, memory-mapping capture file
+
+        Records are accessed by index, as (timestamp in nanoseconds, raw data
+        dump) pairs without copy.
+    """
+    def __init__(self, filename: str):
+        assert filename is not None
+        assert len(filename) != 0
+        self._path = filename
+        with open(self._path, "rb") as capture:
+            _check_header(capture.read(HEADER_SIZE))
+            self._map = mmap.mmap(capture.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._len = (len(self._map) - HEADER_SIZE) // RECORD_SIZE
+
+    def __str__(self):
+        return f"<CaptureReader: path={self._path} records={len(self)}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _1, _2, _3):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index: int) -> Tuple[int, memoryview]:
+        if index < 0:
+            index += self._len
+        if index < 0 or self._len <= index:
+            raise IndexError("Capture: record index out of range")
+        offset = HEADER_SIZE + index * RECORD_SIZE
+        return (
+            _TIMESTAMP.unpack_from(self._view, offset)[0],
+            self._view[offset + _TIMESTAMP.size:offset + RECORD_SIZE]
+        )
+
+    def __iter__(self) -> Iterator[Tuple[int, memoryview]]:
+        for index in range(self._len):
+            yield self[index]
+
+    def close(self):
+        """ Release memory map (idempotent)
+
+            Record views still referenced keep the file mapped: it is then
+            unmapped when they are released or garbage collected.
+        """
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            # Exported record views: last one releases memory map.
+            pass
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> memoryview:
+        """ Get raw records in range, without copy """
+        start, stop, _ = slice(start, stop).indices(self._len)
+        stop = max(start, stop)
+        return self._view[HEADER_SIZE + start * RECORD_SIZE:HEADER_SIZE + stop * RECORD_SIZE]
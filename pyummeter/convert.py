@@ -0,0 +1,221 @@
+""" UM-Meter capture conversion (parallel) """
+#
+# Raw captures (see pyummeter.capture) are split into chunks of records,
+# decoded and formatted by a process pool, and written back in order to:
+# - CSV (same format as pyummeter.export_csv, compressed by suffix),
+# - SQLite (same database as pyummeter.export_sqlite),
+# - NumPy structured array file (".npy", requires NumPy).
+#
+import argparse
+import gzip
+import lzma
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from struct import Struct
+from typing import IO, Any, Deque, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from pyummeter.capture import RECORD_SIZE, CaptureReader
+from pyummeter.decoder import UMmeterDecoder
+from pyummeter.export_csv import ExportCSV
+from pyummeter.export_sqlite import ExportSQLite
+
+FORMATS = ("csv", "sqlite", "npy")
+# Output format of each file suffix.
+_SUFFIXES = {
+    ".csv": "csv",
+    ".csv.gz": "csv",
+    ".csv.xz": "csv",
+    ".db": "sqlite",
+    ".sqlite": "sqlite",
+    ".npy": "npy",
+}
+_TIMESTAMP = Struct(">q")
+
+# Chunk task: format, capture path, first record, end record, meter name.
+_Task = Tuple[str, str, int, int, str]
+
+
+class ConvertStats(NamedTuple):
+    """ Conversion statistics """
+    records: int
+    chunks: int
+    workers: int
+
+
+def _date(timestamp_ns: int) -> datetime:
+    """ Convert capture timestamp to date (microsecond resolution) """
+    return datetime.fromtimestamp((timestamp_ns // 1000) / 1e6)
+
+
+def _read_chunk(path: str, start: int, stop: int) -> bytes:
+    """ Read raw records of chunk (copied, so capture can be closed) """
+    with CaptureReader(path) as capture:
+        with capture.records(start, stop) as records:
+            return bytes(records)
+
+
+def _samples(raw: bytes) -> Iterator[Tuple[datetime, Any]]:
+    """ Decode raw records into samples """
+    decoder = UMmeterDecoder()
+    view = memoryview(raw)
+    for offset in range(0, len(raw), RECORD_SIZE):
+        timestamp = _TIMESTAMP.unpack_from(view, offset)[0]
+        yield _date(timestamp), decoder.decode(
+            view[offset + _TIMESTAMP.size:offset + RECORD_SIZE])
+
+
+def _chunk_csv(raw: bytes) -> str:
+    """ Format chunk as CSV rows """
+    return ExportCSV.format_rows(_samples(raw))
+
+
+def _chunk_sqlite(raw: bytes, meter: str) -> List[Tuple[Any, ...]]:
+    """ Format chunk as SQLite rows """
+    return [ExportSQLite.format_row(meter, date, data) for date, data in _samples(raw)]
+
+
+def _npy_dtype():
+    """ Get NumPy output layout: timestamp, then decoded fields """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    from pyummeter.batch import FRAME_DTYPE  # pylint: disable=import-outside-toplevel
+    return np.dtype([("timestamp", "M8[ns]")] + FRAME_DTYPE.descr)
+
+
+def _chunk_npy(raw: bytes):
+    """ Format chunk as NumPy structured array """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    from pyummeter.batch import (  # pylint: disable=import-outside-toplevel
+        FRAME_FIELDS, decode_records
+    )
+    timestamps, columns = decode_records(raw)
+    records = np.empty(len(timestamps), dtype=_npy_dtype())
+    records["timestamp"] = timestamps
+    for name in FRAME_FIELDS:
+        records[name] = columns[name]
+    return records
+
+
+def _convert_chunk(task: _Task) -> Any:
+    """ Decode and format chunk (worker process) """
+    fmt, path, start, stop, meter = task
+    raw = _read_chunk(path, start, stop)
+    if fmt == "csv":
+        return _chunk_csv(raw)
+    if fmt == "sqlite":
+        return _chunk_sqlite(raw, meter)
+    return _chunk_npy(raw)
+
+
+def _results(tasks: Iterable[_Task], workers: int) -> Iterator[Any]:
+    """ Convert chunks in a process pool, results in chunk order
+
+        At most two chunks per worker are in progress or waiting to be
+        written, bounding memory use.
+    """
+    if workers == 1:
+        for task in tasks:
+            yield _convert_chunk(task)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        pending: Deque[Future] = deque()
+        for task in tasks:
+            pending.append(pool.submit(_convert_chunk, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _open_csv(path: str) -> IO[str]:
+    """ Create CSV output file, compressed according to its suffix """
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8")
+    if path.endswith(".xz"):
+        return lzma.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+
+
+def output_format(output: str) -> str:
+    """ Get output format from output file suffix """
+    for suffix, fmt in _SUFFIXES.items():
+        if output.endswith(suffix):
+            return fmt
+    raise ValueError(f"Convert: unknown format of {output}")
+
+
+def convert(
+        capture: str, output: str, fmt: Optional[str] = None,
+        workers: Optional[int] = None, chunk_size: int = 65536,
+        meter: str = "default") -> ConvertStats:
+    """ Convert capture file to output file
+
+        Format is given by 'fmt' (see FORMATS), or by output suffix. Records
+        are converted by chunks of 'chunk_size' records, with 'workers'
+        processes (default: one per CPU, 1 to convert in this process).
+        SQLite rows are stored for 'meter', added to an existing database.
+    """
+    assert chunk_size > 0
+    assert workers is None or workers > 0
+    if fmt is None:
+        fmt = output_format(output)
+    if fmt not in FORMATS:
+        raise ValueError(f"Convert: format {fmt} not supported")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with CaptureReader(capture) as reader:
+        count = len(reader)
+    tasks = [
+        (fmt, capture, start, min(start + chunk_size, count), meter)
+        for start in range(0, count, chunk_size)
+    ]
+    results = _results(tasks, workers)
+    if fmt == "csv":
+        with _open_csv(output) as csv_f:
+            csv_f.write(ExportCSV.format_header())
+            for text in results:
+                csv_f.write(text)
+    elif fmt == "sqlite":
+        with ExportSQLite(output, meter, flush_rows=None, flush_interval=None) as export:
+            for rows in results:
+                export.insert_rows(rows)
+                export.flush()
+    else:
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        if count == 0:
+            # Empty file cannot be memory-mapped.
+            np.save(output, np.empty(0, dtype=_npy_dtype()))
+            return ConvertStats(0, 0, workers)
+        array = np.lib.format.open_memmap(output, "w+", _npy_dtype(), (count,))
+        start = 0
+        for records in results:
+            array[start:start + len(records)] = records
+            start += len(records)
+        array.flush()
+        del array
+    return ConvertStats(count, len(tasks), workers)
+
+
+def parse_args():
+    """ Parse input arguments """
+    args = argparse.ArgumentParser(description="Convert raw capture file")
+    args.add_argument("capture", type=str, help="Capture file")
+    args.add_argument("output", type=str,
+                      help="Output file (.csv[.gz|.xz], .db/.sqlite, .npy)")
+    args.add_argument("--format", "-f", type=str, choices=FORMATS, default=None,
+                      help="Output format (default: from output suffix)")
+    args.add_argument("--workers", "-w", type=int, default=None,
+                      help="Number of worker processes (default: one per CPU)")
+    args.add_argument("--chunk-size", "-c", type=int, default=65536,
+                      help="Number of records per chunk")
+    args.add_argument("--meter", "-m", type=str, default="default",
+                      help="Meter name (SQLite)")
+    return args.parse_args()
+
+
+if __name__ == "__main__":
+    params = parse_args()
+    stats = convert(
+        params.capture, params.output, params.format, params.workers,
+        params.chunk_size, params.meter)
+    print(f"{stats.records} records, {stats.chunks} chunks, {stats.workers} workers")
@@ -0,0 +1,313 @@
+""" UM-Meter data dump decoder """
+#
+# Information from "https://sigrok.org/wiki/RDTech_UM_series"
+#
+from datetime import timedelta
+from struct import Struct, error
+from typing import (
+    Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple, TypedDict,
+    Union
+)
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class UMmeterDataGroup(TypedDict):
+    """ UM-Meter data group format """
+    capacity: float
+    energy: float
+
+
+class UMmeterData(TypedDict):
+    """ UM-Meter data format """
+    model: str
+    voltage: float
+    intensity: float
+    power: float
+    resistance: float
+    usb_voltage_dp: float
+    usb_voltage_dn: float
+    charging_mode: str
+    charging_mode_full: str
+    temperature_celsius: int
+    temperature_fahrenheit: int
+    data_group_selected: int
+    data_group: List[UMmeterDataGroup]
+    record_capacity_threshold: float
+    record_energy_threshold: float
+    record_intensity_threshold: float
+    record_duration: timedelta
+    record_enabled: bool
+    screen_index: int
+    screen_timeout: timedelta
+    screen_brightness: int
+    checksum: int
+
+
+class UMmeterScale(NamedTuple):
+    """ UM-Meter conversion divisors of a model """
+    voltage: int
+    usb_voltage: int
+    intensity: int
+    power: int
+    resistance: int
+    record_intensity_threshold: int
+    record_capacity_threshold: int
+    record_energy_threshold: int
+    data_group_capacity: int
+    data_group_energy: int
+
+
+class UMmeterDecoder:
+    """ UM-Meter data dump decoder """
+    FRAME_SIZE = 130
+    DATA_GROUP_COUNT = 10
+    _FRAME = Struct(">HHHLHHH80sHHHLLHLHHHLHBB")
+    # Same layout, data groups skipped (unpacked in place, see _decode_data_group).
+    _FRAME_FIELDS = Struct(">HHHLHHH80xHHHLLHLHHHLHBB")
+    _DATA_GROUP = Struct(f">{2 * DATA_GROUP_COUNT}L")
+    _DATA_GROUP_OFFSET = 16
+    _MODEL = {
+        0x0963: "UM24C",
+        0x09c9: "UM25C",
+        0x0d4c: "UM34C"
+    }
+    _MODEL_UNKNOWN = "Unknown"
+    _SCALE = {
+        "UM24C": UMmeterScale(100, 100, 1000, 1000, 10, 100, 1000, 1000, 1000, 1000),
+        "UM25C": UMmeterScale(1000, 100, 10000, 1000, 10, 100, 1000, 1000, 1000, 1000),
+        "UM34C": UMmeterScale(100, 100, 1000, 1000, 10, 100, 1000, 1000, 1000, 1000),
+    }
+    # Neutral divisors, used with zeroed values for unknown models.
+    _SCALE_NONE = UMmeterScale(1, 1, 1, 1, 1, 1, 1, 1, 1, 1)
+    _CHARGING_MODE = {
+        0: ("Unknown", "Unknown"),
+        1: ("QC2", "Qualcomm Quick Charge 2.0"),
+        2: ("QC3", "Qualcomm Quick Charge 3.0"),
+        3: ("APP2.4A", "Apple (max. 2.4 A)"),
+        4: ("APP2.1A", "Apple (max. 2.1 A)"),
+        5: ("APP1.0A", "Apple (max. 1.0 A)"),
+        6: ("APP0.5A", "Apple (max. 0.5 A)"),
+        7: ("DCP1.5A", "Dedicated Charging Port (max. 1.5 A)"),
+        8: ("Samsung", "Samsung")
+    }
+    _CHARGING_MODE_UNKNOWN = ("Unknown", "Unknown")
+    # Reverse tables, for encoding.
+    _MODEL_ID = {name: model_id for model_id, name in _MODEL.items()}
+    _CHARGING_MODE_ID = {name[0]: value for value, name in _CHARGING_MODE.items()}
+
+    def __init__(self):
+        # Model name and conversion table, resolved once per model ID.
+        self._models: Dict[int, Tuple[str, Optional[UMmeterScale]]] = {}
+
+    def __str__(self):
+        return f"<UM-Meter decoder: models={len(self._models)}>"
+
+    @classmethod
+    def model_ids(cls) -> List[int]:
+        """ Get known model IDs """
+        return list(cls._MODEL)
+
+    @classmethod
+    def model_names(cls) -> List[str]:
+        """ Get known model names """
+        return list(cls._MODEL.values())
+
+    def resolve(self, model_id: int) -> Tuple[str, Optional[UMmeterScale]]:
+        """ Get model name and conversion table (None if unknown) """
+        resolved = self._models.get(model_id)
+        if resolved is None:
+            name = self._MODEL.get(model_id, self._MODEL_UNKNOWN)
+            resolved = (name, self._SCALE.get(name))
+            self._models[model_id] = resolved
+        return resolved
+
+    def encode(self, data: Mapping[str, Any]) -> bytes:
+        """ Encode data into a complete data dump frame (inverse of decode) """
+        model_id = self._MODEL_ID.get(data["model"], 0)
+        scale = self._SCALE.get(data["model"], self._SCALE_NONE)
+        data_group = []
+        for group in data["data_group"]:
+            data_group.extend([
+                round(group["capacity"] * scale.data_group_capacity),
+                round(group["energy"] * scale.data_group_energy)
+            ])
+        return self._FRAME.pack(
+            model_id,
+            round(data["voltage"] * scale.voltage),
+            round(data["intensity"] * scale.intensity),
+            round(data["power"] * scale.power),
+            data["temperature_celsius"],
+            data["temperature_fahrenheit"],
+            data["data_group_selected"],
+            self._DATA_GROUP.pack(*data_group),
+            round(data["usb_voltage_dp"] * scale.usb_voltage),
+            round(data["usb_voltage_dn"] * scale.usb_voltage),
+            self.charging_mode_id(data["charging_mode"]),
+            round(data["record_capacity_threshold"] * scale.record_capacity_threshold),
+            round(data["record_energy_threshold"] * scale.record_energy_threshold),
+            round(data["record_intensity_threshold"] * scale.record_intensity_threshold),
+            int(data["record_duration"].total_seconds()),
+            int(data["record_enabled"]),
+            int(data["screen_timeout"].total_seconds() // 60),
+            data["screen_brightness"],
+            round(data["resistance"] * scale.resistance),
+            data["screen_index"],
+            0,
+            data["checksum"])
+
+    def decode_field(self, raw: Buffer, key: str) -> Any:
+        """ Decode a single field of a complete data dump frame """
+        if key not in _FIELDS:
+            raise KeyError(key)
+        offset, fmt, convert = _FIELDS[key]
+        value = fmt.unpack_from(raw, offset)[0]
+        return convert(self, value, raw)
+
+    def decode_data_group(self, raw: Buffer) -> List[UMmeterDataGroup]:
+        """ Decode data group list of a complete data dump frame """
+        return self._decode_data_group(raw, self.resolve(_U16.unpack_from(raw, 0)[0])[1])
+
+    def _decode_data_group(
+            self, raw: Buffer, scale: Optional[UMmeterScale]) -> List[UMmeterDataGroup]:
+        """ Decode data group list with model conversion table """
+        if scale is None:
+            # Unknown model, no conversion available.
+            return [
+                {"capacity": 0.0, "energy": 0.0}
+                for _ in range(self.DATA_GROUP_COUNT)
+            ]
+        dg_val = self._DATA_GROUP.unpack_from(raw, self._DATA_GROUP_OFFSET)
+        cap_div = scale.data_group_capacity
+        wh_div = scale.data_group_energy
+        return [
+            {"capacity": dg_val[i] / cap_div, "energy": dg_val[i + 1] / wh_div}
+            for i in range(0, 2 * self.DATA_GROUP_COUNT, 2)
+        ]
+
+    def charging_mode(self, value: int) -> Tuple[str, str]:
+        """ Get charging mode short and full names """
+        return self._CHARGING_MODE.get(value, self._CHARGING_MODE_UNKNOWN)
+
+    def charging_mode_id(self, name: str) -> int:
+        """ Get charging mode value from short name """
+        return self._CHARGING_MODE_ID.get(name, 0)
+
+    def decode(self, raw: Buffer) -> UMmeterData:
+        """ Decode a complete data dump frame """
+        if len(raw) != self.FRAME_SIZE:
+            # Same error as unpacking a whole buffer.
+            raise error(f"unpack requires a buffer of {self.FRAME_SIZE} bytes")
+        (
+            mod, volt, amp, watt, temp_c, temp_f, dg_cur, udp, udn,
+            cmode, rt_mah, rt_wh, rt_ma, rt_dur, rt_en, sc_time, sc_light,
+            ohm, sc_cur, _1, crc
+        ) = self._FRAME_FIELDS.unpack_from(raw)
+        model, scale = self.resolve(mod)
+        cmode_name, cmode_full = self._CHARGING_MODE.get(
+            cmode, self._CHARGING_MODE_UNKNOWN)
+        data_group = self._decode_data_group(raw, scale)
+        if scale is None:
+            # Unknown model, no conversion available.
+            volt = amp = watt = ohm = udp = udn = rt_mah = rt_wh = rt_ma = 0
+            scale = self._SCALE_NONE
+        return {
+            "model": model,
+            "voltage": volt / scale.voltage,
+            "intensity": amp / scale.intensity,
+            "power": watt / scale.power,
+            "resistance": ohm / scale.resistance,
+            "temperature_celsius": temp_c,
+            "temperature_fahrenheit": temp_f,
+            "data_group_selected": dg_cur,
+            "data_group": data_group,
+            "usb_voltage_dp": udp / scale.usb_voltage,
+            "usb_voltage_dn": udn / scale.usb_voltage,
+            "charging_mode": cmode_name,
+            "charging_mode_full": cmode_full,
+            "record_capacity_threshold": rt_mah / scale.record_capacity_threshold,
+            "record_energy_threshold": rt_wh / scale.record_energy_threshold,
+            "record_intensity_threshold": rt_ma / scale.record_intensity_threshold,
+            "record_duration": timedelta(seconds=rt_dur),
+            "record_enabled": bool(rt_en == 1),
+            "screen_timeout": timedelta(minutes=sc_time),
+            "screen_brightness": sc_light,
+            "screen_index": sc_cur,
+            "checksum": crc
+        }
+
+
+class UMmeterFrame(Mapping[str, Any]):
+    """ UM-Meter data dump, decoded on access
+
+        Read-only mapping with the same keys as UMmeterData, keeping only the
+        raw frame: each field is decoded when accessed.
+    """
+    __slots__ = ("_raw", "_decoder")
+
+    def __init__(self, raw: Buffer, decoder: Optional[UMmeterDecoder] = None):
+        if len(raw) != UMmeterDecoder.FRAME_SIZE:
+            raise ValueError("UM-Meter: invalid frame size")
+        self._raw = bytes(raw)
+        self._decoder = decoder if decoder is not None else UMmeterDecoder()
+
+    def __str__(self):
+        return f"<UM-Meter frame: model={self['model']}>"
+
+    def __getitem__(self, key: str) -> Any:
+        return self._decoder.decode_field(self._raw, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_FIELDS)
+
+    def __len__(self) -> int:
+        return len(_FIELDS)
+
+    @property
+    def raw(self) -> bytes:
+        """ Raw data dump frame """
+        return self._raw
+
+    def to_dict(self) -> UMmeterData:
+        """ Decode all fields """
+        return self._decoder.decode(self._raw)
+
+
+def _scaled(divisor: str) -> Callable[[UMmeterDecoder, int, Buffer], float]:
+    """ Field conversion using a model conversion divisor """
+    def convert(decoder: UMmeterDecoder, value: int, raw: Buffer) -> float:
+        scale = decoder.resolve(_U16.unpack_from(raw, 0)[0])[1]
+        if scale is None:
+            return 0.0
+        return value / getattr(scale, divisor)
+    return convert
+
+
+_U8 = Struct(">B")
+_U16 = Struct(">H")
+_U32 = Struct(">L")
+# UM-Meter field: offset in frame, raw format, conversion method.
+_FIELDS: Dict[str, Tuple[int, Struct, Callable[[UMmeterDecoder, int, Buffer], Any]]] = {
+    "model": (0, _U16, lambda d, v, _: d.resolve(v)[0]),
+    "voltage": (2, _U16, _scaled("voltage")),
+    "intensity": (4, _U16, _scaled("intensity")),
+    "power": (6, _U32, _scaled("power")),
+    "resistance": (122, _U32, _scaled("resistance")),
+    "usb_voltage_dp": (96, _U16, _scaled("usb_voltage")),
+    "usb_voltage_dn": (98, _U16, _scaled("usb_voltage")),
+    "charging_mode": (100, _U16, lambda d, v, _: d.charging_mode(v)[0]),
+    "charging_mode_full": (100, _U16, lambda d, v, _: d.charging_mode(v)[1]),
+    "temperature_celsius": (10, _U16, lambda d, v, _: v),
+    "temperature_fahrenheit": (12, _U16, lambda d, v, _: v),
+    "data_group_selected": (14, _U16, lambda d, v, _: v),
+    "data_group": (14, _U16, lambda d, _, raw: d.decode_data_group(raw)),
+    "record_capacity_threshold": (102, _U32, _scaled("record_capacity_threshold")),
+    "record_energy_threshold": (106, _U32, _scaled("record_energy_threshold")),
+    "record_intensity_threshold": (110, _U16, _scaled("record_intensity_threshold")),
+    "record_duration": (112, _U32, lambda d, v, _: timedelta(seconds=v)),
+    "record_enabled": (116, _U16, lambda d, v, _: bool(v == 1)),
+    "screen_index": (126, _U16, lambda d, v, _: v),
+    "screen_timeout": (118, _U16, lambda d, v, _: timedelta(minutes=v)),
+    "screen_brightness": (120, _U16, lambda d, v, _: v),
+    "checksum": (129, _U8, lambda d, v, _: v),
+}
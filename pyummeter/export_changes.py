@@ -0,0 +1,127 @@
+""" UM-Meter change-only export """
+from datetime import datetime, timedelta
+from typing import (
+    Any, Dict, Iterable, NamedTuple, Optional, Protocol, Sequence, Tuple, Union
+)
+from pyummeter.decoder import UMmeterData, UMmeterFrame
+
+Sample = Tuple[datetime, Union[UMmeterData, UMmeterFrame]]
+
+
+class Exporter(Protocol):
+    """ Export interface (e.g. ExportCSV) """
+    def update(self, date: datetime, data: Union[UMmeterData, UMmeterFrame]):
+        ...
+
+    def update_many(self, samples: Iterable[Sample]):
+        ...
+
+    def flush(self):
+        ...
+
+    def close(self):
+        ...
+
+
+class ChangesStats(NamedTuple):
+    """ Change-only export statistics """
+    written: int
+    skipped: int
+    keepalives: int
+
+
+class ExportChanges:
+    """ Export wrapper writing samples only on change
+
+        Samples are compared to the last written one: on the raw data dump
+        (UMmeterFrame) or all data if 'fields' is not given, else on these
+        fields only. A field with a 'deadband' changes only when it moves by
+        more than the deadband from its last written value. If 'keepalive'
+        is given, a sample is written at least at this period.
+    """
+    def __init__(
+            self, export: Exporter, fields: Optional[Sequence[str]] = None,
+            deadband: Optional[Dict[str, float]] = None,
+            keepalive: Optional[timedelta] = None):
+        deadband = deadband or {}
+        if fields is None and len(deadband) != 0:
+            raise ValueError("ExportChanges: deadband requires fields")
+        if fields is not None and any(field not in fields for field in deadband):
+            raise ValueError("ExportChanges: deadband field not compared")
+        self._export = export
+        self._fields = None if fields is None else tuple(fields)
+        # Deadband of each compared field (0: any change).
+        self._deadband = None if fields is None else [
+            deadband.get(field, 0.0) for field in fields
+        ]
+        self._keepalive = keepalive
+        self._last: Any = None
+        self._last_date: Optional[datetime] = None
+        self._written = 0
+        self._skipped = 0
+        self._keepalives = 0
+
+    def __str__(self):
+        return f"<ExportChanges: export={self._export}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _1, _2, _3):
+        self.close()
+
+    def stats(self) -> ChangesStats:
+        """ Get export statistics """
+        return ChangesStats(self._written, self._skipped, self._keepalives)
+
+    def flush(self):
+        """ Flush pending rows """
+        self._export.flush()
+
+    def close(self):
+        """ Close export """
+        self._export.close()
+
+    def update(self, date: datetime, data: Union[UMmeterData, UMmeterFrame]):
+        """ Write data to export, if changed """
+        if self._changed(date, data):
+            self._export.update(date, data)
+
+    def update_many(self, samples: Iterable[Sample]):
+        """ Write several data to export, if changed """
+        self._export.update_many([
+            (date, data) for date, data in samples if self._changed(date, data)
+        ])
+
+    def _key(self, data: Union[UMmeterData, UMmeterFrame]) -> Any:
+        """ Get comparison key of data """
+        if self._fields is not None:
+            return [data[field] for field in self._fields]  # type: ignore
+        if isinstance(data, UMmeterFrame):
+            return data.raw
+        return data
+
+    def _differs(self, key: Any) -> bool:
+        """ Check if key differs from last written one """
+        if self._deadband is None:
+            return key != self._last
+        for value, previous, deadband in zip(key, self._last, self._deadband):
+            if deadband > 0:
+                if abs(value - previous) > deadband:
+                    return True
+            elif value != previous:
+                return True
+        return False
+
+    def _changed(self, date: datetime, data: Union[UMmeterData, UMmeterFrame]) -> bool:
+        """ Check if sample must be written (and update last written) """
+        key = self._key(data)
+        if self._last_date is not None and not self._differs(key):
+            if self._keepalive is None or date - self._last_date < self._keepalive:
+                self._skipped += 1
+                return False
+            self._keepalives += 1
+        self._last = key
+        self._last_date = date
+        self._written += 1
+        return True
@@ -1,8 +1,15 @@
 """ CSV export manager """
 import csv
+import gzip
+import io
+import lzma
+import os
 from datetime import datetime, timedelta
-from typing import Callable, Optional
-from pyummeter import UMmeterData
+from time import monotonic
+from typing import (
+    IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+)
+from pyummeter.decoder import UMmeterData, UMmeterDecoder, UMmeterFrame
 
 
 def _bool_to_str(value: bool) -> str:
@@ -20,74 +27,307 @@ def _timedelta_to_str(value: timedelta) -> str:
     return str(int(value.total_seconds()))
 
 
+def _str_to_bool(value: str) -> bool:
+    """ Convert string to bool """
+    return bool(int(value))
+
+
+def _str_to_datetime(value: str) -> datetime:
+    """ Convert string (ISO format) to date """
+    return datetime.fromisoformat(value)
+
+
+def _str_to_timedelta(value: str) -> timedelta:
+    """ Convert string (elapsing seconds) to time delta """
+    return timedelta(seconds=int(value))
+
+
+# Compression file suffix.
+_COMPRESSION = {
+    "gzip": ".gz",
+    "xz": ".xz",
+}
+
+
+def _open_read(filename: str) -> IO[str]:
+    """ Open text file for reading, decompressed according to its suffix """
+    if filename.endswith(_COMPRESSION["gzip"]):
+        return gzip.open(filename, "rt", encoding="utf-8")
+    if filename.endswith(_COMPRESSION["xz"]):
+        return lzma.open(filename, "rt", encoding="utf-8")
+    return open(filename, "r", encoding="utf-8")  # pylint: disable=consider-using-with
+
+
+# UM-Meter field, Description, Conversion method, Parsing method.
+_Field = Tuple[str, str, Optional[Callable[[Any], str]], Callable[[str], Any]]
+
+
 class ExportCSV:
     """ CSV export instance """
     _SEP = ";"
-    _FIELD_DATE = ("", "Date", _datetime_to_str)
-    _FIELDS = [
-        # UM-Meter field, Description, Conversion method.
-        ("voltage", "Voltage (V)", None),
-        ("intensity", "Intensity (A)", None),
-        ("power", "Power (W)", None),
-        ("resistance", "Resistance (Ohm)", None),
-        ("usb_voltage_dp", "USB D+ (V)", None),
-        ("usb_voltage_dn", "USB D- (V)", None),
-        ("charging_mode", "Charging Mode", None),
-        ("temperature_celsius", "Temperature (°C)", None),
-        ("model", "Model", None),
-        ("record_enabled", "Recording", _bool_to_str),
-        ("record_duration", "Record duration (sec)", _timedelta_to_str),
-        ("record_intensity_threshold", "Record intensity (A)", None),
-        ("record_capacity_threshold", "Record capacity (Ah)", None),
-        ("record_energy_threshold", "Record energy (Wh)", None),
+    # Default flush policy of compressed file (rows).
+    _FLUSH_ROWS_COMPRESSED = 1000
+    _FIELD_DATE = ("", "Date", _datetime_to_str, _str_to_datetime)
+    _FIELDS: List[_Field] = [
+        # UM-Meter field, Description, Conversion method, Parsing method.
+        ("voltage", "Voltage (V)", None, float),
+        ("intensity", "Intensity (A)", None, float),
+        ("power", "Power (W)", None, float),
+        ("resistance", "Resistance (Ohm)", None, float),
+        ("usb_voltage_dp", "USB D+ (V)", None, float),
+        ("usb_voltage_dn", "USB D- (V)", None, float),
+        ("charging_mode", "Charging Mode", None, str),
+        ("temperature_celsius", "Temperature (°C)", None, int),
+        ("model", "Model", None, str),
+        ("record_enabled", "Recording", _bool_to_str, _str_to_bool),
+        ("record_duration", "Record duration (sec)", _timedelta_to_str, _str_to_timedelta),
+        ("record_intensity_threshold", "Record intensity (A)", None, float),
+        ("record_capacity_threshold", "Record capacity (Ah)", None, float),
+        ("record_energy_threshold", "Record energy (Wh)", None, float),
     ]
-    _FIELDS_DG = [
-        # UM-Meter field, Description.
-        ("capacity", "Capacity (Ah)", None),
-        ("energy", "Energy (Wh)", None),
+    _FIELDS_DG: List[_Field] = [
+        # UM-Meter field, Description, Conversion method, Parsing method.
+        ("capacity", "Capacity (Ah)", None, float),
+        ("energy", "Energy (Wh)", None, float),
     ]
 
-    def __init__(self, filename: str):
+    def __init__(
+            self, filename: str, flush_rows: Optional[int] = 0,
+            flush_interval: Optional[timedelta] = None, fsync: bool = False,
+            compression: Optional[str] = None, rotate_size: Optional[int] = None,
+            rotate_interval: Optional[timedelta] = None):
+        """ Create CSV file, kept open until closed
+
+            Written rows are flushed after 'flush_rows' rows and/or after
+            'flush_interval' since last flush (None to disable each policy),
+            and synchronised to storage on each flush if 'fsync' is set.
+            By default (0), each row is flushed, or rows are flushed by batch
+            of 1000 rows if compressed.
+
+            File is compressed with 'compression' ("gzip" or "xz", suffix
+            added to filename). With gzip, a flush ends a compressed block,
+            so rows should be flushed by batch. With xz, a flush does not
+            write rows to storage: they are written by the compressor as its
+            blocks fill, and only complete (and durable) once the segment is
+            rotated or the file is closed. If 'rotate_size' (bytes written to
+            storage, approximately) or 'rotate_interval' is given, rows are
+            written to numbered segments (e.g. "export.0001.csv.gz"), each
+            starting with the description row.
+        """
         assert filename is not None
         assert len(filename) != 0
+        assert flush_rows is None or flush_rows >= 0
+        assert rotate_size is None or rotate_size > 0
+        if compression is not None and compression not in _COMPRESSION:
+            raise ValueError(f"ExportCSV: compression {compression} not supported")
+        if flush_rows == 0:
+            flush_rows = 1 if compression is None else self._FLUSH_ROWS_COMPRESSED
         self._path = filename
-        # Prepare description row.
-        desc_row = [self._FIELD_DATE[1]]
-        desc_row.extend([d[1] for d in self._FIELDS])
-        desc_row.extend([d[1] for d in self._FIELDS_DG])
-        # Write description row, and create CSV file.
-        with open(self._path, "w", encoding="utf-8") as csv_f:
-            csv_w = csv.writer(
-                csv_f, delimiter=self._SEP, quoting=csv.QUOTE_MINIMAL)
-            csv_w.writerow(desc_row)
+        self._flush_rows = flush_rows
+        self._flush_interval = \
+            flush_interval.total_seconds() if flush_interval is not None else None
+        self._fsync = fsync
+        self._compression = compression
+        self._rotate_size = rotate_size
+        self._rotate_interval = \
+            rotate_interval.total_seconds() if rotate_interval is not None else None
+        self._segment = 0
+        self._segments: List[str] = []
+        self._pending = 0
+        self._flush_time = monotonic()
+        self._open_segment()
+
+    def _segment_path(self) -> str:
+        """ Get path of current segment """
+        path = self._path
+        suffix = "" if self._compression is None else _COMPRESSION[self._compression]
+        if suffix != "" and path.endswith(suffix):
+            path = path[:-len(suffix)]
+        if self._rotate_size is not None or self._rotate_interval is not None:
+            root, ext = os.path.splitext(path)
+            path = f"{root}.{self._segment:04d}{ext}"
+        return path + suffix
+
+    def _open_segment(self):
+        """ Create next segment file, and write description row """
+        self._segment += 1
+        path = self._segment_path()
+        # Create CSV file, and write description row.
+        self._file: IO[str]
+        if self._compression is None:
+            self._file = open(  # pylint: disable=consider-using-with
+                path, "w", encoding="utf-8")
+            self._raw: IO[Any] = self._file
+        else:
+            self._raw = open(path, "wb")  # pylint: disable=consider-using-with
+            if self._compression == "gzip":
+                compressed: Any = gzip.GzipFile(fileobj=self._raw, mode="wb")
+            else:
+                compressed = lzma.LZMAFile(self._raw, "wb")
+            self._file = io.TextIOWrapper(compressed, encoding="utf-8")
+        self._csv = csv.writer(
+            self._file, delimiter=self._SEP, quoting=csv.QUOTE_MINIMAL)
+        self._segments.append(path)
+        self._segment_time = monotonic()
+        self._is_open = True
+        self._csv.writerow(self._description())
+        self.flush()
+
+    def _close_segment(self):
+        """ Flush and close current segment file """
+        self.flush()
+        self._file.close()
+        if self._raw is not self._file:
+            if self._fsync:
+                self._raw.flush()
+                os.fsync(self._raw.fileno())
+            self._raw.close()
 
     def __str__(self):
         return f"<ExportCSV: path={self._path}>"
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _1, _2, _3):
+        self.close()
+
+    def is_open(self) -> bool:
+        """ Check if export file is open """
+        return self._is_open
+
+    def segments(self) -> List[str]:
+        """ Get path of written files (current one last) """
+        return list(self._segments)
+
+    def close(self):
+        """ Flush pending rows and close export file """
+        if self.is_open():
+            self._close_segment()
+            self._is_open = False
+
+    def flush(self):
+        """ Flush pending rows to export file (not written to storage with xz) """
+        self._file.flush()
+        # LZMA stream is only ended when segment is closed: nothing to sync.
+        if self._fsync and self._compression != "xz":
+            self._raw.flush()
+            os.fsync(self._raw.fileno())
+        self._pending = 0
+        self._flush_time = monotonic()
+
     @staticmethod
     def _convert(convert: Optional[Callable], value) -> str:
         if convert is None:
             return str(value)
         return convert(value)
 
-    def update(self, date: datetime, data: UMmeterData):
-        """ Write data to export file """
-        # Prepare values to export.
+    @classmethod
+    def format_header(cls) -> str:
+        """ Format description row, as written at start of export file """
+        return cls._format([cls._description()])
+
+    @classmethod
+    def format_rows(
+            cls, samples: Iterable[Tuple[datetime, Union[UMmeterData, UMmeterFrame]]]) -> str:
+        """ Format data as rows of export file """
+        return cls._format(cls._row(date, data) for date, data in samples)
+
+    @classmethod
+    def _format(cls, rows: Iterable[List[str]]) -> str:
+        """ Format rows as CSV text """
+        text = io.StringIO()
+        csv.writer(text, delimiter=cls._SEP, quoting=csv.QUOTE_MINIMAL).writerows(rows)
+        return text.getvalue()
+
+    @classmethod
+    def _description(cls) -> List[str]:
+        """ Prepare description row """
+        desc_row = [cls._FIELD_DATE[1]]
+        desc_row.extend([d[1] for d in cls._FIELDS])
+        desc_row.extend([d[1] for d in cls._FIELDS_DG])
+        return desc_row
+
+    @classmethod
+    def _row(cls, date: datetime, data: Union[UMmeterData, UMmeterFrame]) -> List[str]:
+        """ Prepare values to export """
         val = [
-            self._convert(self._FIELD_DATE[2], date)
+            cls._convert(cls._FIELD_DATE[2], date)
         ]
         val.extend([
-            self._convert(f[2], data[f[0]])  # type: ignore
-            for f in self._FIELDS
+            cls._convert(f[2], data[f[0]])  # type: ignore
+            for f in cls._FIELDS
         ])
         val.extend([
-            self._convert(
+            cls._convert(
                 f[2],
                 data["data_group"][data["data_group_selected"]][f[0]])  # type: ignore
-            for f in self._FIELDS_DG
+            for f in cls._FIELDS_DG
         ])
-        # Write value to CSV file.
-        with open(self._path, "a", encoding="utf-8") as csv_f:
-            csv_w = csv.writer(
-                csv_f, delimiter=self._SEP, quoting=csv.QUOTE_MINIMAL)
-            csv_w.writerow(val)
+        return val
+
+    def _written(self, rows: int):
+        """ Apply flush and rotation policies after rows written """
+        self._pending += rows
+        if (self._flush_rows is not None and self._pending >= self._flush_rows) \
+                or (self._flush_interval is not None
+                    and monotonic() - self._flush_time >= self._flush_interval):
+            self.flush()
+        if (self._rotate_size is not None
+                and os.fstat(self._raw.fileno()).st_size >= self._rotate_size) \
+                or (self._rotate_interval is not None
+                    and monotonic() - self._segment_time >= self._rotate_interval):
+            self._close_segment()
+            self._open_segment()
+
+    def update(self, date: datetime, data: Union[UMmeterData, UMmeterFrame]):
+        """ Write data to export file """
+        if not self.is_open():
+            raise IOError("ExportCSV: file is closed")
+        self._csv.writerow(self._row(date, data))
+        self._written(1)
+
+    def update_many(
+            self, samples: Iterable[Tuple[datetime, Union[UMmeterData, UMmeterFrame]]]):
+        """ Write several data to export file """
+        if not self.is_open():
+            raise IOError("ExportCSV: file is closed")
+        rows = [self._row(date, data) for date, data in samples]
+        self._csv.writerows(rows)
+        self._written(len(rows))
+
+    @classmethod
+    def read(cls, filename: str) -> Iterator[Tuple[datetime, UMmeterData]]:
+        """ Read data back from export file (compressed or not)
+
+            Data not exported are set to default values: the exported data
+            group is the first one (selected), others are cleared. Incomplete
+            rows (e.g. last row truncated by a crash) are skipped.
+        """
+        decoder = UMmeterDecoder()
+        size = 1 + len(cls._FIELDS) + len(cls._FIELDS_DG)
+        with _open_read(filename) as csv_f:
+            csv_r = csv.reader(csv_f, delimiter=cls._SEP)
+            next(csv_r, None)
+            for row in csv_r:
+                if len(row) != size:
+                    continue
+                values = iter(row)
+                date = cls._FIELD_DATE[3](next(values))
+                data: Dict[str, Any] = {f[0]: f[3](next(values)) for f in cls._FIELDS}
+                group = {f[0]: f[3](next(values)) for f in cls._FIELDS_DG}
+                data.update({
+                    "charging_mode_full": decoder.charging_mode(
+                        decoder.charging_mode_id(data["charging_mode"]))[1],
+                    "temperature_fahrenheit": round(data["temperature_celsius"] * 9 / 5 + 32),
+                    "data_group_selected": 0,
+                    "data_group": [group] + [
+                        {"capacity": 0.0, "energy": 0.0}
+                        for _ in range(UMmeterDecoder.DATA_GROUP_COUNT - 1)
+                    ],
+                    "screen_index": 0,
+                    "screen_timeout": timedelta(),
+                    "screen_brightness": 0,
+                    "checksum": 0,
+                })
+                yield date, data  # type: ignore
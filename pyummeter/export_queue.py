@@ -0,0 +1,185 @@
+""" UM-Meter asynchronous export """
+from collections import deque
+from datetime import datetime, timedelta
+from threading import Condition, Thread
+from typing import Deque, Iterable, List, NamedTuple, Optional, Union
+from pyummeter.decoder import UMmeterData, UMmeterFrame
+from pyummeter.export_changes import Exporter, Sample
+
+
+class ExportQueueStats(NamedTuple):
+    """ Asynchronous export statistics """
+    queued: int
+    written: int
+    dropped: int
+    errors: int
+    last_error: Optional[str]
+    depth_max: int
+
+
+class ExportQueue:
+    """ Export samples from a worker thread, through a bounded queue
+
+        Samples are queued without waiting for storage, and written by
+        batch (up to 'batch' samples per update_many() call) by the worker
+        thread. When the queue holds 'size' samples, the overflow policy
+        applies: "block" waits for room, "drop_oldest" drops the oldest
+        queued sample, "drop_newest" drops the new sample (drops counted).
+        Export errors are counted, the worker going on with next samples.
+    """
+    OVERFLOW = ("block", "drop_oldest", "drop_newest")
+
+    def __init__(
+            self, export: Exporter, size: int = 1024, overflow: str = "block",
+            batch: int = 256):
+        assert size > 0
+        assert batch > 0
+        if overflow not in self.OVERFLOW:
+            raise ValueError(f"ExportQueue: overflow policy {overflow} not supported")
+        self._export = export
+        self._size = size
+        self._overflow = overflow
+        self._batch = batch
+        self._queue: Deque[Sample] = deque()
+        self._cond = Condition()
+        self._closing = False
+        self._busy = False
+        self._queued = 0
+        self._written = 0
+        self._dropped = 0
+        self._errors = 0
+        self._last_error: Optional[str] = None
+        self._depth_max = 0
+        self._thread: Optional[Thread] = Thread(
+            target=self._run, name="pyummeter-export", daemon=True)
+        self._thread.start()
+
+    def __str__(self):
+        return f"<ExportQueue: export={self._export} depth={len(self._queue)}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _1, _2, _3):
+        self.close()
+
+    def is_open(self) -> bool:
+        """ Check if queue accepts samples """
+        return self._thread is not None and not self._closing
+
+    def stats(self) -> ExportQueueStats:
+        """ Get export statistics """
+        with self._cond:
+            return ExportQueueStats(
+                self._queued, self._written, self._dropped, self._errors,
+                self._last_error, self._depth_max)
+
+    def update(self, date: datetime, data: Union[UMmeterData, UMmeterFrame]):
+        """ Queue data to export """
+        self.update_many([(date, data)])
+
+    def update_many(self, samples: Iterable[Sample]):
+        """ Queue several data to export """
+        with self._cond:
+            if not self.is_open():
+                raise IOError("ExportQueue: queue is closed")
+            for sample in samples:
+                if len(self._queue) >= self._size:
+                    if self._overflow == "drop_newest":
+                        self._dropped += 1
+                        continue
+                    if self._overflow == "drop_oldest":
+                        self._queue.popleft()
+                        self._dropped += 1
+                    else:
+                        self._cond.notify_all()
+                        self._cond.wait_for(
+                            lambda: len(self._queue) < self._size or self._closing)
+                        if self._closing:
+                            raise IOError("ExportQueue: queue is closed")
+                self._queue.append(sample)
+                self._queued += 1
+                self._depth_max = max(self._depth_max, len(self._queue))
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[timedelta] = None) -> bool:
+        """ Wait for queued samples to be written and flushed
+
+            Return False if not written before timeout.
+        """
+        with self._cond:
+            if not self.is_open():
+                raise IOError("ExportQueue: queue is closed")
+            done = self._cond.wait_for(
+                lambda: len(self._queue) == 0 and not self._busy,
+                None if timeout is None else timeout.total_seconds())
+            if not done:
+                return False
+            # Worker idle: export used from this thread, under lock.
+            self._busy = True
+        try:
+            self._export.flush()
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+        return True
+
+    def close(self, timeout: Optional[timedelta] = None):
+        """ Write queued samples, then close export (from worker thread)
+
+            If queued samples are not written before timeout, they are
+            dropped (counted), and export is closed once the current write
+            is done.
+        """
+        with self._cond:
+            thread = self._thread
+            if thread is None or self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        thread.join(None if timeout is None else timeout.total_seconds())
+        with self._cond:
+            if thread.is_alive():
+                self._dropped += len(self._queue)
+                self._queue.clear()
+            else:
+                self._thread = None
+            self._cond.notify_all()
+
+    def _run(self):
+        """ Worker thread loop """
+        try:
+            self._drain()
+        finally:
+            self._export.close()
+
+    def _drain(self):
+        """ Write queued samples, until closed and queue empty """
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: (len(self._queue) != 0 or self._closing) and not self._busy)
+                if len(self._queue) == 0:
+                    return
+                batch: List[Sample] = [
+                    self._queue.popleft()
+                    for _ in range(min(self._batch, len(self._queue)))
+                ]
+                self._busy = True
+                self._cond.notify_all()
+            try:
+                self._export.update_many(batch)
+                written = len(batch)
+                error = None
+            except Exception as exp:  # pylint: disable=broad-except
+                written = 0
+                error = repr(exp)
+            with self._cond:
+                self._busy = False
+                self._written += written
+                if error is not None:
+                    self._errors += 1
+                    self._last_error = error
+                    self._dropped += len(batch)
+                self._cond.notify_all()
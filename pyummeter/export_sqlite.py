@@ -0,0 +1,195 @@
+""" SQLite export manager """
+import sqlite3
+from datetime import datetime, timedelta
+from time import monotonic
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from pyummeter.decoder import UMmeterData, UMmeterDecoder, UMmeterFrame
+
+# Column name, SQL type, Conversion method (to SQL), Parsing method (from SQL).
+_Column = Tuple[str, str, Callable[[Any], Any], Callable[[Any], Any]]
+
+# SQL type and conversion methods of each UMmeterData type.
+_TYPES: Dict[Any, Tuple[str, Callable[[Any], Any], Callable[[Any], Any]]] = {
+    float: ("REAL", float, float),
+    int: ("INTEGER", int, int),
+    str: ("TEXT", str, str),
+    bool: ("INTEGER", int, bool),
+    timedelta: ("REAL", timedelta.total_seconds, lambda value: timedelta(seconds=value)),
+}
+
+
+def _columns() -> List[_Column]:
+    """ Derive columns from UMmeterData format (data groups flattened) """
+    columns = []
+    for key, kind in UMmeterData.__annotations__.items():
+        if key == "data_group":
+            continue
+        sql_type, convert, parse = _TYPES[kind]
+        columns.append((key, sql_type, convert, parse))
+    return columns
+
+
+class ExportSQLite:
+    """ SQLite export instance
+
+        Samples of one or several meters (named by 'meter') are stored in a
+        typed table, indexed on meter and timestamp. Rows are inserted by
+        batch, in one transaction, after 'flush_rows' rows and/or after
+        'flush_interval' since last flush (None to disable each policy).
+        The database uses write-ahead logging, so it can be read while
+        written.
+    """
+    _TABLE = "samples"
+    _COLUMNS = _columns()
+    _DG_COLUMNS = [
+        (f"data_group_{index}_{key}", index, key)
+        for index in range(UMmeterDecoder.DATA_GROUP_COUNT)
+        for key in ("capacity", "energy")
+    ]
+
+    def __init__(
+            self, filename: str, meter: str = "default", flush_rows: Optional[int] = 100,
+            flush_interval: Optional[timedelta] = timedelta(seconds=1)):
+        assert filename is not None
+        assert len(filename) != 0
+        assert flush_rows is None or flush_rows > 0
+        self._path = filename
+        self._meter = meter
+        self._flush_rows = flush_rows
+        self._flush_interval = \
+            flush_interval.total_seconds() if flush_interval is not None else None
+        self._pending: List[Tuple[Any, ...]] = []
+        self._flush_time = monotonic()
+        # Connection used by one thread at a time (e.g. export worker).
+        self._db = sqlite3.connect(self._path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        columns = ["meter TEXT NOT NULL", "timestamp REAL NOT NULL"]
+        columns.extend(f"{c[0]} {c[1]}" for c in self._COLUMNS)
+        columns.extend(f"{c[0]} REAL" for c in self._DG_COLUMNS)
+        with self._db:
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._TABLE} ({', '.join(columns)})")
+            self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS {self._TABLE}_meter_timestamp"
+                f" ON {self._TABLE} (meter, timestamp)")
+        names = ["meter", "timestamp"] + [c[0] for c in self._COLUMNS] \
+            + [c[0] for c in self._DG_COLUMNS]
+        self._insert = \
+            f"INSERT INTO {self._TABLE} ({', '.join(names)})" \
+            f" VALUES ({', '.join('?' * len(names))})"
+        self._select = f"SELECT {', '.join(names)} FROM {self._TABLE}"
+        self._is_open = True
+
+    def __str__(self):
+        return f"<ExportSQLite: path={self._path} meter={self._meter}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _1, _2, _3):
+        self.close()
+
+    def is_open(self) -> bool:
+        """ Check if export database is open """
+        return self._is_open
+
+    def close(self):
+        """ Insert pending rows and close export database """
+        if self.is_open():
+            self.flush()
+            self._db.close()
+            self._is_open = False
+
+    def flush(self):
+        """ Insert pending rows, in one transaction """
+        if len(self._pending) != 0:
+            with self._db:
+                self._db.executemany(self._insert, self._pending)
+            self._pending.clear()
+        self._flush_time = monotonic()
+
+    @classmethod
+    def format_row(
+            cls, meter: str, date: datetime,
+            data: Union[UMmeterData, UMmeterFrame]) -> Tuple[Any, ...]:
+        """ Prepare row of data for meter (see insert_rows) """
+        row: List[Any] = [meter, date.timestamp()]
+        row.extend(c[2](data[c[0]]) for c in cls._COLUMNS)  # type: ignore
+        groups = data["data_group"]
+        row.extend(groups[index][key] for _, index, key in cls._DG_COLUMNS)  # type: ignore
+        return tuple(row)
+
+    def _row(self, date: datetime, data: Union[UMmeterData, UMmeterFrame]) -> Tuple[Any, ...]:
+        """ Prepare values to insert """
+        return self.format_row(self._meter, date, data)
+
+    def insert_rows(self, rows: Iterable[Tuple[Any, ...]]):
+        """ Write prepared rows (see format_row) to export database """
+        if not self.is_open():
+            raise IOError("ExportSQLite: database is closed")
+        self._pending.extend(rows)
+        self._written()
+
+    def _written(self):
+        """ Apply flush policy after rows queued """
+        if (self._flush_rows is not None and len(self._pending) >= self._flush_rows) \
+                or (self._flush_interval is not None
+                    and monotonic() - self._flush_time >= self._flush_interval):
+            self.flush()
+
+    def update(self, date: datetime, data: Union[UMmeterData, UMmeterFrame]):
+        """ Write data to export database """
+        if not self.is_open():
+            raise IOError("ExportSQLite: database is closed")
+        self._pending.append(self._row(date, data))
+        self._written()
+
+    def update_many(
+            self, samples: Iterable[Tuple[datetime, Union[UMmeterData, UMmeterFrame]]]):
+        """ Write several data to export database """
+        if not self.is_open():
+            raise IOError("ExportSQLite: database is closed")
+        self._pending.extend(self._row(date, data) for date, data in samples)
+        self._written()
+
+    def meters(self) -> List[str]:
+        """ Get meters stored in database (pending rows inserted first) """
+        if not self.is_open():
+            raise IOError("ExportSQLite: database is closed")
+        self.flush()
+        cursor = self._db.execute(f"SELECT DISTINCT meter FROM {self._TABLE} ORDER BY meter")
+        return [row[0] for row in cursor]
+
+    def query(
+            self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+            meter: Optional[str] = None) -> Iterator[Tuple[datetime, UMmeterData]]:
+        """ Read data of meter (default: this export meter) in [start, end[
+
+            Pending rows are inserted first.
+        """
+        if not self.is_open():
+            raise IOError("ExportSQLite: database is closed")
+        self.flush()
+        where = ["meter = ?"]
+        params: List[Any] = [self._meter if meter is None else meter]
+        if start is not None:
+            where.append("timestamp >= ?")
+            params.append(start.timestamp())
+        if end is not None:
+            where.append("timestamp < ?")
+            params.append(end.timestamp())
+        cursor = self._db.execute(
+            f"{self._select} WHERE {' AND '.join(where)} ORDER BY timestamp",
+            params)
+        count = len(self._COLUMNS)
+        for row in cursor:
+            data: Dict[str, Any] = {
+                c[0]: c[3](value) for c, value in zip(self._COLUMNS, row[2:2 + count])
+            }
+            groups = row[2 + count:]
+            data["data_group"] = [
+                {"capacity": groups[2 * index], "energy": groups[2 * index + 1]}
+                for index in range(UMmeterDecoder.DATA_GROUP_COUNT)
+            ]
+            yield datetime.fromtimestamp(row[1]), data  # type: ignore
@@ -0,0 +1,68 @@
+""" UM-Meter capacity and energy integration """
+from datetime import datetime, timedelta
+from typing import Any, Mapping, NamedTuple, Optional
+
+
+class IntegratorTotals(NamedTuple):
+    """ Integrated totals
+
+        Capacity in Ah and energy in Wh, over the integrated duration (gaps
+        excluded).
+    """
+    capacity: float
+    energy: float
+    duration: timedelta
+    samples: int
+    gaps: int
+
+
+class UMmeterIntegrator:
+    """ Capacity and energy integration of samples, on their timestamps
+
+        Intensity and power are integrated with the trapezoidal rule, with
+        a better resolution than the meter data groups. Intervals longer
+        than 'max_gap' (e.g. lost samples) or going backwards (e.g. local
+        time at daylight saving time end) are not integrated, and counted
+        as gaps.
+    """
+    def __init__(self, max_gap: Optional[timedelta] = timedelta(seconds=5)):
+        self._max_gap = None if max_gap is None else max_gap.total_seconds()
+        self.reset()
+
+    def __str__(self):
+        return f"<UM-Meter integrator: samples={self._samples}>"
+
+    def reset(self):
+        """ Reset totals """
+        self._last: Optional[datetime] = None
+        self._intensity = 0.0
+        self._power = 0.0
+        # Totals in ampere-seconds and watt-seconds.
+        self._capacity = 0.0
+        self._energy = 0.0
+        self._duration = 0.0
+        self._samples = 0
+        self._gaps = 0
+
+    def update(self, date: datetime, data: Mapping[str, Any]):
+        """ Integrate sample """
+        intensity = data["intensity"]
+        power = data["power"]
+        if self._last is not None:
+            elapsed = (date - self._last).total_seconds()
+            if elapsed < 0 or (self._max_gap is not None and elapsed > self._max_gap):
+                self._gaps += 1
+            else:
+                self._capacity += (self._intensity + intensity) * elapsed / 2
+                self._energy += (self._power + power) * elapsed / 2
+                self._duration += elapsed
+        self._last = date
+        self._intensity = intensity
+        self._power = power
+        self._samples += 1
+
+    def totals(self) -> IntegratorTotals:
+        """ Get integrated totals """
+        return IntegratorTotals(
+            self._capacity / 3600, self._energy / 3600, timedelta(seconds=self._duration),
+            self._samples, self._gaps)
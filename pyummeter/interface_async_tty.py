@@ -0,0 +1,77 @@
+""" UM-Meter interface TTY (asyncio) """
+import asyncio
+from datetime import timedelta
+from typing import Optional
+from pyummeter.interface_base import UMmeterAsyncInterface
+from pyummeter.interface_serial import UMmeterSerialPort
+import serial
+
+
+class UMmeterInterfaceAsyncTTY(UMmeterSerialPort, UMmeterAsyncInterface):
+    """ TTY interface using non-blocking I/O on the running event loop
+
+        Serial interface is waited for readiness with the event loop (POSIX
+        file descriptor), so several interfaces are served by a single thread.
+    """
+    def __init__(self, path: str):
+        # Non-blocking read/write.
+        super().__init__(path, timeout=0, write_timeout=0)
+
+    def __str__(self):
+        return f"<Async TTY: path={self._tty} open={self.is_open()}>"
+
+    async def send(self, data: bytearray) -> int:
+        """ Send raw data to interface, return number of bytes sent """
+        com = self._opened()
+        loop = asyncio.get_running_loop()
+        sent = com.write(data) or 0
+        while sent < len(data):
+            await self._wait(loop, com, None, write=True)
+            sent += com.write(data[sent:]) or 0
+        return sent
+
+    async def receive(self, nb: int, timeout: Optional[timedelta] = None) -> bytearray:
+        """ Receive 'nb' bytes of raw data from interface, return bytes received
+
+            Timeout covers the whole reception, 'timeout' overriding the
+            configured receive timeout for this call.
+        """
+        com = self._opened()
+        loop = asyncio.get_running_loop()
+        value = self._timeout if timeout is None else timeout.total_seconds()
+        deadline = None if value is None else loop.time() + value
+        data = bytearray(com.read(nb))
+        while len(data) < nb:
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                break
+            if not await self._wait(loop, com, remaining):
+                break
+            data.extend(com.read(nb - len(data)))
+        return data
+
+    @staticmethod
+    async def _wait(
+            loop: asyncio.AbstractEventLoop, com: serial.Serial, timeout: Optional[float],
+            write: bool = False) -> bool:
+        """ Wait for serial interface readiness, return False on timeout """
+        ready = loop.create_future()
+        fd = com.fileno()
+
+        def _ready():
+            if not ready.done():
+                ready.set_result(None)
+        if write:
+            loop.add_writer(fd, _ready)
+        else:
+            loop.add_reader(fd, _ready)
+        try:
+            await asyncio.wait_for(ready, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            if write:
+                loop.remove_writer(fd)
+            else:
+                loop.remove_reader(fd)
@@ -1,6 +1,8 @@
 """ UM-Meter interface base """
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
 from datetime import timedelta
+from typing import ContextManager, Optional
 
 
 class UMmeterInterface(ABC):
@@ -24,7 +26,7 @@ class UMmeterInterface(ABC):
 
     @abstractmethod
     def set_timeout(self, timeout: timedelta):
-        """ Configure receive timeout """
+        """ Configure receive timeout (sub-second resolution) """
         raise NotImplementedError
 
     @abstractmethod
@@ -33,6 +35,79 @@ class UMmeterInterface(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def receive(self, nb: int) -> bytearray:
-        """ Receive 'nb' bytes of raw data from interface, return bytes received """
+    def receive(self, nb: int, timeout: Optional[timedelta] = None) -> bytearray:
+        """ Receive 'nb' bytes of raw data from interface, return bytes received
+
+            Timeout covers the whole reception, 'timeout' overriding the
+            configured receive timeout for this call.
+        """
+        raise NotImplementedError
+
+    def receive_into(self, buffer: memoryview, timeout: Optional[timedelta] = None) -> int:
+        """ Receive up to len(buffer) bytes of raw data into buffer, return bytes received
+
+            Default implementation copies received data, interfaces override
+            it to receive in place.
+        """
+        data = self.receive(len(buffer), timeout)
+        buffer[:len(data)] = data
+        return len(data)
+
+    def discard_input(self):
+        """ Discard data received but not read yet (e.g. late response)
+
+            No-op by default, interfaces with an input buffer override it.
+        """
+
+    def transaction(self) -> ContextManager:
+        """ Get context serialising a request and its response
+
+            No-op by default, see UMmeterInterfaceShared to share an
+            interface between threads.
+        """
+        return nullcontext(self)
+
+
+class UMmeterAsyncInterface(ABC):
+    def __str__(self):
+        return "<UM-Meter async interface base>"
+
+    @abstractmethod
+    def is_open(self) -> bool:
+        """ Check if interface is open """
+        raise NotImplementedError
+
+    @abstractmethod
+    def open(self):
+        """ Open interface """
         raise NotImplementedError
+
+    @abstractmethod
+    def close(self):
+        """ Close interface """
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_timeout(self, timeout: timedelta):
+        """ Configure receive timeout (sub-second resolution) """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def send(self, data: bytearray) -> int:
+        """ Send raw data to interface, return number of bytes sent """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def receive(self, nb: int, timeout: Optional[timedelta] = None) -> bytearray:
+        """ Receive 'nb' bytes of raw data from interface, return bytes received
+
+            Timeout covers the whole reception, 'timeout' overriding the
+            configured receive timeout for this call.
+        """
+        raise NotImplementedError
+
+    def discard_input(self):
+        """ Discard data received but not read yet (e.g. late response)
+
+            No-op by default, interfaces with an input buffer override it.
+        """
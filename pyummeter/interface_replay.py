@@ -0,0 +1,111 @@
+""" UM-Meter interface replaying a capture """
+from datetime import timedelta
+from time import monotonic, sleep
+from typing import Iterable, Iterator, Optional, Tuple
+from pyummeter.decoder import Buffer, UMmeterDecoder
+from pyummeter.export_csv import ExportCSV
+from pyummeter.interface_base import UMmeterInterface
+
+
+class UMmeterInterfaceReplay(UMmeterInterface):
+    """ Interface answering data dump requests with recorded data dumps
+
+        Records are (timestamp in nanoseconds, raw data dump) pairs, as read
+        from a capture (see pyummeter.capture.CaptureReader). They are served
+        as fast as requested, or paced at the recorded timestamps. Once all
+        records are served, requests are not answered (as a timeout), unless
+        looping is enabled.
+    """
+    def __init__(
+            self, records: Iterable[Tuple[int, Buffer]], paced: bool = False,
+            loop: bool = False):
+        assert records is not None
+        self._records = records
+        self._paced = paced
+        self._loop = loop
+        self._iter: Optional[Iterator[Tuple[int, Buffer]]] = None
+        self._pending = bytearray()
+        # Pacing reference: first record timestamp, and its replay time.
+        self._start: Optional[Tuple[int, float]] = None
+
+    def __str__(self):
+        return f"<Replay: paced={self._paced} loop={self._loop} open={self.is_open()}>"
+
+    @classmethod
+    def from_csv(cls, filename: str, paced: bool = False, loop: bool = False):
+        """ Create interface from CSV export, re-encoded to data dumps """
+        decoder = UMmeterDecoder()
+        records = [
+            (int(date.timestamp() * 1_000_000_000), decoder.encode(data))
+            for date, data in ExportCSV.read(filename)
+        ]
+        return cls(records, paced, loop)
+
+    def is_open(self) -> bool:
+        """ Check if interface is open """
+        return self._iter is not None
+
+    def open(self):
+        """ Open interface, replaying from first record """
+        if not self.is_open():
+            self._iter = iter(self._records)
+            self._pending.clear()
+            self._start = None
+
+    def close(self):
+        """ Close interface """
+        self._iter = None
+
+    def set_timeout(self, timeout: timedelta):
+        """ Configure receive timeout (not used, replay never blocks) """
+        if not self.is_open():
+            raise IOError("UM-Meter: replay interface is not opened")
+
+    def send(self, data: bytearray) -> int:
+        """ Send raw data to interface, return number of bytes sent
+
+            Data dump requests are answered with next record, other
+            commands are ignored.
+        """
+        if not self.is_open():
+            raise IOError("UM-Meter: replay interface is not opened")
+        for cmd in data:
+            if cmd == 0xf0:
+                self._next_record()
+        return len(data)
+
+    def receive(self, nb: int, timeout: Optional[timedelta] = None) -> bytearray:
+        """ Receive 'nb' bytes of raw data from interface, return bytes received
+
+            Timeout is ignored, recorded data dumps being immediately available.
+        """
+        if not self.is_open():
+            raise IOError("UM-Meter: replay interface is not opened")
+        data = self._pending[:nb]
+        del self._pending[:nb]
+        return data
+
+    def discard_input(self):
+        """ Discard data dumps not received yet """
+        if not self.is_open():
+            raise IOError("UM-Meter: replay interface is not opened")
+        self._pending.clear()
+
+    def _next_record(self):
+        """ Queue next record for reception """
+        assert self._iter is not None
+        record = next(self._iter, None)
+        if record is None and self._loop:
+            self._iter = iter(self._records)
+            self._start = None
+            record = next(self._iter, None)
+        if record is None:
+            return
+        timestamp, frame = record
+        if self._paced:
+            if self._start is None:
+                self._start = (timestamp, monotonic())
+            delay = self._start[1] + (timestamp - self._start[0]) / 1e9 - monotonic()
+            if delay > 0:
+                sleep(delay)
+        self._pending.extend(frame)
@@ -0,0 +1,67 @@
+""" UM-Meter serial port (shared by TTY interfaces) """
+from datetime import timedelta
+from typing import Any, Dict, Optional
+import serial
+
+
+class UMmeterSerialPort:
+    """ Serial port setup, open and close of TTY interfaces (opened on demand) """
+    _BAUD = 9600
+    _MODE = "8N1"
+
+    def __init__(self, path: str, **options: Any):
+        assert path is not None
+        assert len(path) != 0
+        self._tty = path
+        self._config: Dict[str, Any] = {
+            "baudrate": self._BAUD,
+            "bytesize": int(self._MODE[0]),
+            "parity": self._MODE[1],
+            "stopbits": int(self._MODE[2]),
+            **options
+        }
+        # Do not open serial interface on init.
+        self._com: Optional[serial.Serial] = None
+        self._is_open = False
+        # Receive timeout in seconds (None: wait forever).
+        self._timeout: Optional[float] = None
+
+    def is_open(self) -> bool:
+        """ Check if interface is open """
+        return self._is_open
+
+    def open(self):
+        """ Open interface """
+        if not self.is_open():
+            try:
+                if self._com is None:
+                    # No instance, create it and open interface.
+                    self._com = serial.Serial(self._tty, **self._config)
+                else:
+                    # Instance already created, just open it.
+                    self._com.open()
+                self._is_open = True
+            except Exception as exp:
+                raise IOError("UM-Meter: could not open TTY interface") from exp
+
+    def close(self):
+        """ Close interface """
+        if self.is_open() and self._com is not None:
+            self._com.close()
+            self._is_open = False
+
+    def set_timeout(self, timeout: timedelta):
+        """ Configure receive timeout """
+        if self._com is None:
+            raise IOError("UM-Meter: TTY interface is not opened")
+        self._timeout = timeout.total_seconds()
+
+    def discard_input(self):
+        """ Discard data received but not read yet (e.g. late response) """
+        self._opened().reset_input_buffer()
+
+    def _opened(self) -> serial.Serial:
+        """ Get opened serial instance """
+        if not self.is_open() or self._com is None:
+            raise IOError("UM-Meter: TTY interface is not opened")
+        return self._com
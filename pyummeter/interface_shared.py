@@ -0,0 +1,125 @@
+""" UM-Meter interface shared between threads """
+from collections import deque
+from contextlib import contextmanager
+from datetime import timedelta
+from threading import RLock
+from typing import Deque, Iterator, Optional
+from pyummeter.interface_base import UMmeterInterface
+
+
+class UMmeterInterfaceShared(UMmeterInterface):
+    """ Interface wrapper sharing one interface between threads and users
+
+        Requests and their responses are serialised as transactions (see
+        transaction()), so a data dump request is never interleaved with
+        another thread I/O. Data sent by another thread while a transaction
+        is in progress (control commands) is queued without waiting, and
+        sent in order when the transaction ends, between data dump requests.
+        The wrapped interface is opened by first user, and closed by last.
+    """
+    def __init__(self, com: UMmeterInterface):
+        assert com is not None
+        self._com = com
+        self._lock = RLock()
+        self._commands: Deque[bytearray] = deque()
+        self._users = 0
+
+    def __str__(self):
+        return f"<Shared: {self._com} users={self._users}>"
+
+    def is_open(self) -> bool:
+        """ Check if interface is open """
+        return self._com.is_open()
+
+    def open(self):
+        """ Open interface (on first user) """
+        with self._lock:
+            if self._users == 0:
+                self._com.open()
+            self._users += 1
+
+    def close(self):
+        """ Close interface (on last user), queued data sent first """
+        with self._lock:
+            if self._users == 0:
+                return
+            self._users -= 1
+            if self._users == 0:
+                try:
+                    if self._com.is_open():
+                        self._send_queued()
+                finally:
+                    self._commands.clear()
+                    self._com.close()
+
+    def users(self) -> int:
+        """ Get number of users having opened interface """
+        return self._users
+
+    def pending(self) -> int:
+        """ Get number of queued sends """
+        return len(self._commands)
+
+    @contextmanager
+    def transaction(self) -> Iterator["UMmeterInterfaceShared"]:
+        """ Serialise I/O in context with other threads (reentrant) """
+        try:
+            with self._lock:
+                self._send_queued()
+                yield self
+                self._send_queued()
+        finally:
+            self._flush()
+
+    def set_timeout(self, timeout: timedelta):
+        """ Configure receive timeout """
+        with self._lock:
+            self._com.set_timeout(timeout)
+
+    def send(self, data: bytearray) -> int:
+        """ Send raw data to interface, return number of bytes sent
+
+            If another thread is in a transaction, data is queued (whole
+            data returned as sent).
+        """
+        if not self._lock.acquire(blocking=False):
+            self._commands.append(data)
+            self._flush()
+            return len(data)
+        try:
+            self._send_queued()
+            return self._com.send(data)
+        finally:
+            self._lock.release()
+
+    def receive(self, nb: int, timeout: Optional[timedelta] = None) -> bytearray:
+        """ Receive 'nb' bytes of raw data from interface, return bytes received """
+        with self.transaction():
+            return self._com.receive(nb, timeout)
+
+    def receive_into(self, buffer: memoryview, timeout: Optional[timedelta] = None) -> int:
+        """ Receive up to len(buffer) bytes of raw data into buffer, return bytes received """
+        with self.transaction():
+            return self._com.receive_into(buffer, timeout)
+
+    def discard_input(self):
+        """ Discard data received but not read yet (e.g. late response) """
+        with self._lock:
+            self._com.discard_input()
+
+    def _send_queued(self):
+        """ Send queued data, in order (lock held) """
+        while self._commands:
+            self._com.send(self._commands.popleft())
+
+    def _flush(self):
+        """ Send data queued while lock was held, unless another thread holds it
+
+            Either this thread sends queued data, or the lock holder does when
+            releasing it, so data is not left queued.
+        """
+        while self._commands and self._lock.acquire(blocking=False):
+            try:
+                self._send_queued()
+            finally:
+                self._lock.release()
@@ -0,0 +1,226 @@
+""" UM-Meter interface TCP (serial over network, e.g. ser2net raw mode) """
+import socket
+from datetime import timedelta
+from threading import Lock
+from time import monotonic
+from typing import Dict, Optional, Tuple
+from pyummeter.interface_base import UMmeterInterface
+from pyummeter.interface_shared import UMmeterInterfaceShared
+
+
+class UMmeterInterfaceTCP(UMmeterInterface):
+    """ Interface to a meter behind a raw TCP serial server
+
+        The connection is kept open (TCP_NODELAY, TCP keep-alive) between
+        requests. When it is lost, the current request fails with IOError,
+        and next request reconnects, waiting between failed connections
+        with an exponential backoff (from 'backoff_min' to 'backoff_max').
+    """
+    _KEEPALIVE = {
+        # Probe after 10s idle, every 5s, connection lost after 3 probes.
+        "TCP_KEEPIDLE": 10,
+        "TCP_KEEPINTVL": 5,
+        "TCP_KEEPCNT": 3,
+    }
+
+    def __init__(
+            self, host: str, port: int,
+            connect_timeout: timedelta = timedelta(seconds=5),
+            backoff_min: timedelta = timedelta(milliseconds=100),
+            backoff_max: timedelta = timedelta(seconds=10)):
+        assert host is not None
+        assert len(host) != 0
+        assert 0 < port < 65536
+        assert backoff_min <= backoff_max
+        self._host = host
+        self._port = port
+        self._connect_timeout = connect_timeout.total_seconds()
+        self._backoff_min = backoff_min.total_seconds()
+        self._backoff_max = backoff_max.total_seconds()
+        self._backoff = self._backoff_min
+        # Earliest reconnection time, after a failed connection.
+        self._retry = 0.0
+        self._sock: Optional[socket.socket] = None
+        self._is_open = False
+        self._connections = 0
+        # Receive timeout in seconds (None: wait forever).
+        self._timeout: Optional[float] = None
+
+    def __str__(self):
+        return f"<TCP: host={self._host} port={self._port} open={self.is_open()}>"
+
+    def is_open(self) -> bool:
+        """ Check if interface is open (connection may be re-established) """
+        return self._is_open
+
+    def is_connected(self) -> bool:
+        """ Check if connection is established """
+        return self._sock is not None
+
+    def connections(self) -> int:
+        """ Get number of connections established """
+        return self._connections
+
+    def open(self):
+        """ Open interface """
+        if not self.is_open():
+            try:
+                self._connect()
+            except OSError as exp:
+                raise IOError("UM-Meter: could not open TCP interface") from exp
+            self._is_open = True
+
+    def close(self):
+        """ Close interface """
+        self._disconnect()
+        self._is_open = False
+        self._backoff = self._backoff_min
+        self._retry = 0.0
+
+    def set_timeout(self, timeout: timedelta):
+        """ Configure receive timeout """
+        self._timeout = timeout.total_seconds()
+
+    def send(self, data: bytearray) -> int:
+        """ Send raw data to interface, return number of bytes sent """
+        sock = self._get_sock()
+        try:
+            sock.sendall(data)
+        except OSError as exp:
+            self._disconnect()
+            raise IOError("UM-Meter: TCP connection lost") from exp
+        return len(data)
+
+    def receive(self, nb: int, timeout: Optional[timedelta] = None) -> bytearray:
+        """ Receive 'nb' bytes of raw data from interface, return bytes received
+
+            Timeout covers the whole reception, 'timeout' overriding the
+            configured receive timeout for this call.
+        """
+        data = bytearray(nb)
+        received = self.receive_into(memoryview(data), timeout)
+        del data[received:]
+        return data
+
+    def receive_into(self, buffer: memoryview, timeout: Optional[timedelta] = None) -> int:
+        """ Receive up to len(buffer) bytes of raw data into buffer, return bytes received """
+        sock = self._get_sock()
+        value = self._timeout if timeout is None else timeout.total_seconds()
+        deadline = None if value is None else monotonic() + value
+        received = 0
+        try:
+            while received < len(buffer):
+                if deadline is not None:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        break
+                    sock.settimeout(remaining)
+                else:
+                    sock.settimeout(None)
+                chunk = sock.recv_into(buffer[received:])
+                if chunk == 0:
+                    raise ConnectionResetError("connection closed by server")
+                received += chunk
+        except socket.timeout:
+            pass
+        except OSError as exp:
+            self._disconnect()
+            raise IOError("UM-Meter: TCP connection lost") from exp
+        return received
+
+    def discard_input(self):
+        """ Discard data received but not read yet (e.g. late response) """
+        sock = self._get_sock()
+        sock.setblocking(False)
+        try:
+            while sock.recv(4096):
+                pass
+            # Empty read: connection closed by server.
+            self._disconnect()
+        except BlockingIOError:
+            pass
+        except OSError as exp:
+            self._disconnect()
+            raise IOError("UM-Meter: TCP connection lost") from exp
+
+    def _get_sock(self) -> socket.socket:
+        """ Get connection, reconnecting if lost """
+        if not self.is_open():
+            raise IOError("UM-Meter: TCP interface is not opened")
+        if self._sock is None:
+            if monotonic() < self._retry:
+                raise IOError("UM-Meter: TCP interface is disconnected")
+            try:
+                self._connect()
+            except OSError as exp:
+                raise IOError("UM-Meter: could not reconnect TCP interface") from exp
+        assert self._sock is not None
+        return self._sock
+
+    def _connect(self):
+        """ Establish connection (backoff updated) """
+        try:
+            sock = socket.create_connection((self._host, self._port), self._connect_timeout)
+        except OSError:
+            self._retry = monotonic() + self._backoff
+            self._backoff = min(self._backoff * 2, self._backoff_max)
+            raise
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        for option, value in self._KEEPALIVE.items():
+            # Keep-alive tuning is not available on all platforms.
+            if hasattr(socket, option):
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+        self._sock = sock
+        self._backoff = self._backoff_min
+        self._retry = 0.0
+        self._connections += 1
+
+    def _disconnect(self):
+        """ Drop connection """
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class UMmeterConnectionPool:
+    """ Shared TCP interfaces, one per endpoint
+
+        Users of an endpoint get the same shared interface (see
+        UMmeterInterfaceShared), so they reuse one connection.
+    """
+    def __init__(self):
+        self._lock = Lock()
+        self._interfaces: Dict[Tuple[str, int], UMmeterInterfaceShared] = {}
+
+    def __str__(self):
+        return f"<UM-Meter connection pool: endpoints={len(self._interfaces)}>"
+
+    def __len__(self) -> int:
+        return len(self._interfaces)
+
+    def get(self, host: str, port: int, **options) -> UMmeterInterfaceShared:
+        """ Get shared interface of endpoint (created with 'options' if new) """
+        with self._lock:
+            key = (host, port)
+            if key not in self._interfaces:
+                self._interfaces[key] = UMmeterInterfaceShared(
+                    UMmeterInterfaceTCP(host, port, **options))
+            return self._interfaces[key]
+
+    def clear(self):
+        """ Close and forget all interfaces """
+        with self._lock:
+            for shared in self._interfaces.values():
+                while shared.users() != 0:
+                    shared.close()
+            self._interfaces.clear()
+
+
+# Process-wide connection pool.
+POOL = UMmeterConnectionPool()
+
+
+def tcp_interface(host: str, port: int, **options) -> UMmeterInterfaceShared:
+    """ Get shared TCP interface of endpoint from process-wide pool """
+    return POOL.get(host, port, **options)
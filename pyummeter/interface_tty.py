@@ -1,69 +1,70 @@
 """ UM-Meter interface TTY """
+import os
+import select
 from datetime import timedelta
+from time import monotonic
 from typing import Optional
 from pyummeter.interface_base import UMmeterInterface
+from pyummeter.interface_serial import UMmeterSerialPort
 import serial
 
 
-class UMmeterInterfaceTTY(UMmeterInterface):
-    _BAUD = 9600
-    _MODE = "8N1"
-
-    def __init__(self, path: str):
-        assert path is not None
-        assert len(path) != 0
-        self._tty = path
-        self._config = {
-            "baudrate": self._BAUD,
-            "bytesize": int(self._MODE[0]),
-            "parity": self._MODE[1],
-            "stopbits": int(self._MODE[2])
-        }
-        # Do not open serial interface on init.
-        self._com: Optional[serial.Serial] = None
-        self._is_open = False
-
+class UMmeterInterfaceTTY(UMmeterSerialPort, UMmeterInterface):
     def __str__(self):
         return f"<TTY: path={self._tty} open={self.is_open()}>"
 
-    def is_open(self) -> bool:
-        """ Check if interface is open """
-        return self._is_open
-
-    def open(self):
-        """ Open interface """
-        if not self.is_open():
-            try:
-                if self._com is None:
-                    # No instance, create it and open interface.
-                    self._com = serial.Serial(self._tty, **self._config)
-                else:
-                    # Instance already created, just open it.
-                    self._com.open()
-                self._is_open = True
-            except Exception as exp:
-                raise IOError("UM-Meter: could not open TTY interface") from exp
-
-    def close(self):
-        """ Close interface """
-        if self.is_open() and self._com is not None:
-            self._com.close()
-            self._is_open = False
-
     def set_timeout(self, timeout: timedelta):
         """ Configure receive timeout """
-        if self._com is None:
-            raise IOError("UM-Meter: TTY interface is not opened")
-        self._com.timeout = int(timeout.total_seconds())
+        super().set_timeout(timeout)
+        if self._com is not None:
+            self._com.timeout = self._timeout
 
     def send(self, data: bytearray) -> int:
         """ Send raw data to interface, return number of bytes sent """
-        if not self.is_open() or self._com is None:
-            raise IOError("UM-Meter: TTY interface is not opened")
-        return self._com.write(data)
+        return self._opened().write(data)
+
+    def receive(self, nb: int, timeout: Optional[timedelta] = None) -> bytearray:
+        """ Receive 'nb' bytes of raw data from interface, return bytes received
+
+            Timeout covers the whole reception, 'timeout' overriding the
+            configured receive timeout for this call.
+        """
+        return self._get_com(timeout).read(nb)
+
+    def receive_into(self, buffer: memoryview, timeout: Optional[timedelta] = None) -> int:
+        """ Receive up to len(buffer) bytes of raw data into buffer, return bytes received
+
+            On POSIX, data is read from the serial port file descriptor
+            directly into buffer (pyserial read() allocates and copies).
+        """
+        if not hasattr(os, "readv"):
+            return super().receive_into(buffer, timeout)
+        fd = self._opened().fileno()
+        value = self._timeout if timeout is None else timeout.total_seconds()
+        deadline = None if value is None else monotonic() + value
+        received = 0
+        while received < len(buffer):
+            wait = None if deadline is None else max(0.0, deadline - monotonic())
+            ready, _, _ = select.select([fd], [], [], wait)
+            if not ready:
+                break
+            try:
+                nb = os.readv(fd, [buffer[received:]])
+            except BlockingIOError:
+                continue
+            except OSError as exp:
+                raise IOError("UM-Meter: TTY interface read failed") from exp
+            if nb == 0:
+                # Readable without data: device disconnected.
+                raise IOError("UM-Meter: TTY interface disconnected")
+            received += nb
+        return received
 
-    def receive(self, nb: int) -> bytearray:
-        """ Receive 'nb' bytes of raw data from interface, return bytes received """
-        if not self.is_open() or self._com is None:
-            raise IOError("UM-Meter: TTY interface is not opened")
-        return self._com.read(nb)
+    def _get_com(self, timeout: Optional[timedelta]) -> serial.Serial:
+        """ Get serial interface, configured for reception """
+        com = self._opened()
+        value = self._timeout if timeout is None else timeout.total_seconds()
+        if com.timeout != value:
+            # Serial port is reconfigured only when timeout changes.
+            com.timeout = value
+        return com
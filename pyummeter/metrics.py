@@ -0,0 +1,252 @@
+""" UM-Meter round-trip instrumentation """
+from contextlib import contextmanager
+from datetime import timedelta
+from math import frexp, ldexp
+from threading import Lock
+from time import perf_counter
+from typing import Callable, ContextManager, Dict, Iterator, List, NamedTuple, Optional
+from pyummeter.interface_base import UMmeterInterface
+
+
+class StageStats(NamedTuple):
+    """ Stage duration statistics, in seconds """
+    samples: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+class MetricsStats(NamedTuple):
+    """ Instrumentation snapshot """
+    requests: int
+    frames: int
+    timeouts: int
+    short_reads: int
+    bytes_sent: int
+    bytes_received: int
+    stages: Dict[str, StageStats]
+
+
+class Histogram:
+    """ Streaming histogram of durations, on log-scale buckets
+
+        Each power of two (of microseconds) is split in 'sub' buckets, so
+        percentiles are bounded to about '100 / sub' % relative error, with
+        constant memory and insertion cost.
+    """
+    _EXPONENTS = 48
+
+    def __init__(self, sub: int = 16):
+        assert sub > 0
+        self._sub = sub
+        self._buckets = [0] * (self._EXPONENTS * sub)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    def __str__(self):
+        return f"<Histogram: count={self._count}>"
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, seconds: float):
+        """ Add duration """
+        self._buckets[self._index(seconds)] += 1
+        self._count += 1
+        self._sum += seconds
+        if seconds > self._max:
+            self._max = seconds
+
+    def percentile(self, percent: float) -> float:
+        """ Get duration percentile (bucket upper bound, clamped to maximum) """
+        if percent < 0 or 100 < percent:
+            raise ValueError("Histogram: percentile invalid range")
+        if self._count == 0:
+            return 0.0
+        rank = max(1, round(percent / 100 * self._count))
+        total = 0
+        for index, count in enumerate(self._buckets):
+            total += count
+            if total >= rank:
+                return min(self._bound(index), self._max)
+        return self._max
+
+    def stats(self) -> StageStats:
+        """ Get statistics """
+        return StageStats(
+            self._count,
+            self._sum / self._count if self._count > 0 else 0.0,
+            self.percentile(50),
+            self.percentile(95),
+            self.percentile(99),
+            self._max)
+
+    def _index(self, seconds: float) -> int:
+        """ Get bucket index of duration """
+        mantissa, exponent = frexp(seconds * 1e6)
+        if exponent <= 0:
+            return 0
+        index = (exponent - 1) * self._sub + int((2 * mantissa - 1) * self._sub)
+        return min(index, len(self._buckets) - 1)
+
+    def _bound(self, index: int) -> float:
+        """ Get bucket upper bound, in seconds """
+        exponent, sub = divmod(index, self._sub)
+        return ldexp(1 + (sub + 1) / self._sub, exponent) / 1e6
+
+
+class UMmeterMetrics:
+    """ Request stages timing and I/O counters
+
+        Stages are timed in seconds ("send", "first_byte", "receive",
+        "decode", "request" for UMmeter, any name with measure()), each
+        duration being also given to hooks as 'hook(stage, seconds)'.
+    """
+    def __init__(self):
+        self._lock = Lock()
+        self._hooks: List[Callable[[str, float], None]] = []
+        self._stages: Dict[str, Histogram] = {}
+        self._counters = dict.fromkeys(MetricsStats._fields[:-1], 0)
+
+    def __str__(self):
+        return f"<UM-Meter metrics: requests={self._counters['requests']}>"
+
+    def add_hook(self, hook: Callable[[str, float], None]):
+        """ Add hook called on each stage duration """
+        self._hooks.append(hook)
+
+    def record(self, stage: str, seconds: float):
+        """ Record stage duration """
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = Histogram()
+            histogram.add(seconds)
+        for hook in self._hooks:
+            hook(stage, seconds)
+
+    def count(self, counter: str, nb: int = 1):
+        """ Increment counter """
+        with self._lock:
+            self._counters[counter] += nb
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """ Time block as stage (e.g. "export") """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, perf_counter() - start)
+
+    def stats(self) -> MetricsStats:
+        """ Get snapshot of statistics """
+        with self._lock:
+            stages = {stage: hist.stats() for stage, hist in self._stages.items()}
+            return MetricsStats(**self._counters, stages=stages)
+
+    def reset(self):
+        """ Reset statistics (hooks kept) """
+        with self._lock:
+            self._stages.clear()
+            for counter in self._counters:
+                self._counters[counter] = 0
+
+
+class UMmeterInterfaceMetrics(UMmeterInterface):
+    """ Interface wrapper timing and counting I/O of another interface
+
+        Receptions are split to time the first byte: first byte latency is
+        measured from the end of last send. The receive timeout (given, or
+        configured) still bounds the whole reception.
+    """
+    def __init__(self, com: UMmeterInterface, metrics: UMmeterMetrics):
+        self._com = com
+        self._metrics = metrics
+        self._sent: Optional[float] = None
+        # Configured receive timeout (None: unknown, or wait forever).
+        self._timeout: Optional[timedelta] = None
+
+    def __str__(self):
+        return f"<Metrics: {self._com}>"
+
+    def is_open(self) -> bool:
+        """ Check if interface is open """
+        return self._com.is_open()
+
+    def open(self):
+        """ Open interface """
+        self._com.open()
+
+    def close(self):
+        """ Close interface """
+        self._com.close()
+
+    def set_timeout(self, timeout: timedelta):
+        """ Configure receive timeout """
+        self._com.set_timeout(timeout)
+        self._timeout = timeout
+
+    def discard_input(self):
+        """ Discard data received but not read yet (e.g. late response) """
+        self._com.discard_input()
+
+    def transaction(self) -> ContextManager:
+        """ Get context serialising a request and its response """
+        return self._com.transaction()
+
+    def send(self, data: bytearray) -> int:
+        """ Send raw data to interface, return number of bytes sent """
+        start = perf_counter()
+        sent = self._com.send(data)
+        self._sent = perf_counter()
+        self._metrics.record("send", self._sent - start)
+        self._metrics.count("bytes_sent", sent or 0)
+        return sent
+
+    def receive(self, nb: int, timeout: Optional[timedelta] = None) -> bytearray:
+        """ Receive 'nb' bytes of raw data from interface, return bytes received """
+        start = perf_counter()
+        data = self._com.receive(1, timeout) if nb > 1 else self._com.receive(nb, timeout)
+        first = perf_counter()
+        if len(data) != 0 and self._sent is not None:
+            self._metrics.record("first_byte", first - self._sent)
+        self._sent = None
+        if len(data) != 0 and nb > 1:
+            data = bytearray(data) + self._com.receive(
+                nb - 1, self._remaining(timeout, first - start))
+        self._received(start, len(data), nb)
+        return data
+
+    def receive_into(self, buffer: memoryview, timeout: Optional[timedelta] = None) -> int:
+        """ Receive up to len(buffer) bytes of raw data into buffer, return bytes received """
+        nb = len(buffer)
+        start = perf_counter()
+        received = self._com.receive_into(buffer[:1] if nb > 1 else buffer, timeout)
+        first = perf_counter()
+        if received != 0 and self._sent is not None:
+            self._metrics.record("first_byte", first - self._sent)
+        self._sent = None
+        if received != 0 and nb > 1:
+            received += self._com.receive_into(
+                buffer[1:], self._remaining(timeout, first - start))
+        self._received(start, received, nb)
+        return received
+
+    def _remaining(self, timeout: Optional[timedelta], elapsed: float) -> Optional[timedelta]:
+        """ Get timeout left for reception rest, after first byte """
+        if timeout is None:
+            timeout = self._timeout
+        if timeout is None:
+            return None
+        return max(timedelta(0), timeout - timedelta(seconds=elapsed))
+
+    def _received(self, start: float, received: int, nb: int):
+        """ Record reception duration and counters """
+        self._metrics.record("receive", perf_counter() - start)
+        self._metrics.count("bytes_received", received)
+        if received < nb:
+            self._metrics.count("short_reads")
@@ -0,0 +1,112 @@
+""" UM-Meter data dump stream parser """
+from typing import Callable, List, NamedTuple, Optional
+from pyummeter.decoder import Buffer, UMmeterDecoder
+
+
+class ParserStats(NamedTuple):
+    """ Parser statistics """
+    frames: int
+    resyncs: int
+    discarded: int
+    invalid: int
+
+
+class UMmeterFrameParser:
+    """ Incremental data dump parser, accepting arbitrary chunks of bytes
+
+        Frames start with a known model ID. If 'validate' is given, each frame
+        candidate must also pass it (e.g. checksum verification), else it is
+        dropped as invalid. Bytes not belonging to a frame are discarded, and
+        the parser resynchronises on next model ID.
+    """
+    def __init__(self, validate: Optional[Callable[[bytes], bool]] = None):
+        self._validate = validate
+        self._headers = [
+            bytes([model_id >> 8, model_id & 0xff])
+            for model_id in UMmeterDecoder.model_ids()
+        ]
+        self._ids = frozenset(UMmeterDecoder.model_ids())
+        self._buffer = bytearray()
+        self._synced = True
+        self._frames = 0
+        self._resyncs = 0
+        self._discarded = 0
+        self._invalid = 0
+
+    def __str__(self):
+        return f"<UM-Meter parser: pending={len(self._buffer)}>"
+
+    def stats(self) -> ParserStats:
+        """ Get parser statistics """
+        return ParserStats(self._frames, self._resyncs, self._discarded, self._invalid)
+
+    def pending(self) -> int:
+        """ Get number of bytes pending """
+        return len(self._buffer)
+
+    def missing(self) -> int:
+        """ Get number of bytes needed to complete pending frame """
+        if self._buffer[:2] in self._headers:
+            return UMmeterDecoder.FRAME_SIZE - len(self._buffer)
+        return UMmeterDecoder.FRAME_SIZE
+
+    def aligned(self, raw: Buffer) -> bool:
+        """ Check if raw is exactly one valid frame, with nothing pending
+
+            Frames of unknown models are accepted when raw contains no known
+            model ID at all.
+        """
+        if len(raw) != UMmeterDecoder.FRAME_SIZE or len(self._buffer) != 0:
+            return False
+        if (raw[0] << 8 | raw[1]) not in self._ids:
+            data = bytes(raw)
+            if any(data.find(header, 1) >= 0 for header in self._headers):
+                return False
+        elif self._validate is not None and not self._validate(bytes(raw)):
+            return False
+        self._frames += 1
+        return True
+
+    def reset(self):
+        """ Discard pending bytes """
+        self._discarded += len(self._buffer)
+        self._buffer.clear()
+
+    def feed(self, chunk: Buffer) -> List[bytes]:
+        """ Parse chunk of bytes, return complete frames """
+        size = UMmeterDecoder.FRAME_SIZE
+        buffer = self._buffer
+        buffer.extend(chunk)
+        frames = []
+        while len(buffer) >= 2:
+            if buffer[:2] in self._headers:
+                if len(buffer) < size:
+                    break
+                frame = bytes(buffer[:size])
+                if self._validate is None or self._validate(frame):
+                    frames.append(frame)
+                    self._frames += 1
+                    self._synced = True
+                    del buffer[:size]
+                    continue
+                # Invalid frame: resynchronise after its model ID.
+                self._invalid += 1
+            self._resync()
+        return frames
+
+    def _resync(self):
+        """ Discard bytes until next model ID """
+        buffer = self._buffer
+        found = [buffer.find(header, 1) for header in self._headers]
+        found = [index for index in found if index >= 0]
+        if found:
+            skip = min(found)
+        else:
+            # Keep last byte, which may be the start of a model ID.
+            skip = len(buffer) - 1
+        if self._synced:
+            # Synchronisation lost.
+            self._resyncs += 1
+            self._synced = False
+        self._discarded += skip
+        del buffer[:skip]
@@ -0,0 +1,180 @@
+""" UM-Meter multiple devices poller """
+from datetime import datetime, timedelta
+from queue import Queue
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, List, NamedTuple, Optional
+from pyummeter.sampler import DeadlineScheduler
+from pyummeter.ummeter import UMmeter, UMmeterData
+
+
+class PollerSample(NamedTuple):
+    """ Data dump received from a polled device """
+    name: str
+    date: datetime
+    data: UMmeterData
+
+
+class PollerDeviceStats(NamedTuple):
+    """ Polled device statistics """
+    samples: int
+    timeouts: int
+    errors: int
+    last_error: Optional[str]
+    missed: int
+
+
+class _PollerDevice:
+    """ Polled device state """
+    def __init__(
+            self, name: str, meter: UMmeter, period: timedelta,
+            timeout: Optional[timedelta]):
+        self.name = name
+        self.meter = meter
+        self.scheduler = DeadlineScheduler(period)
+        self.timeout = timeout
+        self.samples = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.thread: Optional[Thread] = None
+
+    def stats(self) -> PollerDeviceStats:
+        """ Get device statistics """
+        return PollerDeviceStats(
+            self.samples, self.timeouts, self.errors, self.last_error,
+            self.scheduler.stats().missed)
+
+
+class UMmeterPoller:
+    """ Poll several UM-Meter concurrently, each at its own rate
+
+        Each device is polled from its own thread, on its own deadline grid
+        (see DeadlineScheduler), so a slow or failing device does not delay
+        the others. Samples are delivered to the
+        callback (called from polling threads, one call at a time) and/or
+        put in the queue.
+        On error, the device is closed and re-opened after a retry delay,
+        doubled on each consecutive error (up to 'retry_max').
+    """
+    def __init__(
+            self, callback: Optional[Callable[[PollerSample], None]] = None,
+            queue: Optional["Queue[PollerSample]"] = None,
+            retry_delay: timedelta = timedelta(seconds=1),
+            retry_max: timedelta = timedelta(seconds=60)):
+        assert callback is not None or queue is not None
+        self._callback = callback
+        self._callback_lock = Lock()
+        self._callback_errors = 0
+        self._queue = queue
+        self._retry_delay = retry_delay.total_seconds()
+        self._retry_max = retry_max.total_seconds()
+        self._devices: Dict[str, _PollerDevice] = {}
+        self._stop = Event()
+        self._running = False
+
+    def __str__(self):
+        return f"<UM-Meter poller: devices={len(self._devices)} running={self._running}>"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, _1, _2, _3):
+        self.stop()
+
+    def add(
+            self, name: str, meter: UMmeter, period: timedelta,
+            timeout: Optional[timedelta] = None):
+        """ Add device to poll, at given period
+
+            If 'timeout' is given, it bounds each request, so a dead device
+            costs at most this budget per period.
+        """
+        if self._running:
+            raise RuntimeError("UM-Meter poller: already running")
+        if name in self._devices:
+            raise ValueError(f"UM-Meter poller: device {name} already added")
+        self._devices[name] = _PollerDevice(name, meter, period, timeout)
+
+    def devices(self) -> List[str]:
+        """ Get polled devices name """
+        return list(self._devices)
+
+    def stats(self) -> Dict[str, PollerDeviceStats]:
+        """ Get statistics of each device """
+        return {name: device.stats() for name, device in self._devices.items()}
+
+    def callback_errors(self) -> int:
+        """ Get number of errors raised by callback """
+        return self._callback_errors
+
+    def is_running(self) -> bool:
+        """ Check if poller is running """
+        return self._running
+
+    def start(self):
+        """ Start polling all devices """
+        if self._running:
+            return
+        self._stop.clear()
+        self._running = True
+        for device in self._devices.values():
+            device.thread = Thread(
+                target=self._poll, args=(device,), name=f"pyummeter-poller-{device.name}",
+                daemon=True)
+            device.thread.start()
+
+    def stop(self, timeout: Optional[timedelta] = None):
+        """ Stop polling, and wait for polling threads """
+        if not self._running:
+            return
+        self._stop.set()
+        for device in self._devices.values():
+            if device.thread is not None:
+                device.thread.join(None if timeout is None else timeout.total_seconds())
+                device.thread = None
+        self._running = False
+
+    def _deliver(self, sample: PollerSample):
+        """ Deliver sample to consumers (consumer errors are not device errors) """
+        if self._queue is not None:
+            self._queue.put(sample)
+        if self._callback is not None:
+            with self._callback_lock:
+                try:
+                    self._callback(sample)
+                except Exception:  # pylint: disable=broad-except
+                    self._callback_errors += 1
+
+    def _poll(self, device: _PollerDevice):
+        """ Device polling loop """
+        retry = self._retry_delay
+        device.scheduler.start()
+        while not self._stop.wait(device.scheduler.delay()):
+            device.scheduler.tick()
+            try:
+                if not device.meter.is_open():
+                    device.meter.open()
+                data = device.meter.get_data(device.timeout)
+                now = datetime.now()
+                retry = self._retry_delay
+            except Exception as exp:  # pylint: disable=broad-except
+                device.errors += 1
+                device.last_error = repr(exp)
+                try:
+                    device.meter.close()
+                except Exception:  # pylint: disable=broad-except
+                    pass
+                self._stop.wait(retry)
+                retry = min(2 * retry, self._retry_max)
+                device.scheduler.realign()
+                continue
+            if data is None:
+                device.timeouts += 1
+            else:
+                device.samples += 1
+                self._deliver(PollerSample(device.name, now, data))
+        try:
+            device.meter.close()
+        except Exception:  # pylint: disable=broad-except
+            pass
@@ -0,0 +1,121 @@
+""" UM-Meter fixed-rate sampling """
+from datetime import datetime, timedelta
+from math import floor, sqrt
+from time import monotonic, sleep
+from typing import Callable, Iterator, NamedTuple, Optional, Tuple
+from pyummeter.ummeter import UMmeter, UMmeterData
+
+
+class SamplerStats(NamedTuple):
+    """ Sampling statistics
+
+        Jitter is the standard deviation of the request lateness against the
+        deadline grid (in seconds), missed deadlines are periods skipped
+        because a request overran.
+    """
+    samples: int
+    missed: int
+    rate: float
+    jitter: float
+    lateness_max: float
+
+
+class DeadlineScheduler:
+    """ Fixed-rate deadline grid, on a monotonic clock
+
+        Deadlines are 'start + n * period': the time spent by a request does
+        not shift the following deadlines. Deadlines already elapsed by more
+        than a period are skipped (counted as missed).
+    """
+    def __init__(self, period: timedelta, clock: Callable[[], float] = monotonic):
+        if period.total_seconds() < 0:
+            raise ValueError("Scheduler: period invalid range")
+        self._period = period.total_seconds()
+        self._clock = clock
+        self._origin = clock()
+        self._index = 0
+        self._missed = 0
+        # Lateness statistics (Welford algorithm).
+        self._late_mean = 0.0
+        self._late_m2 = 0.0
+        self._late_max = 0.0
+
+    def __str__(self):
+        return f"<Scheduler: period={self._period}s>"
+
+    def start(self):
+        """ Restart deadline grid from now """
+        self._origin = self._clock()
+        self._index = 0
+        self._missed = 0
+        self._late_mean = 0.0
+        self._late_m2 = 0.0
+        self._late_max = 0.0
+
+    def realign(self):
+        """ Move deadline grid so next deadline is now (statistics kept) """
+        self._origin = self._clock() - self._index * self._period
+
+    def delay(self) -> float:
+        """ Get delay until next deadline, in seconds """
+        now = self._clock()
+        deadline = self._origin + self._index * self._period
+        if self._period > 0 and now - deadline >= self._period:
+            skipped = floor((now - deadline) / self._period)
+            self._index += skipped
+            self._missed += skipped
+            deadline += skipped * self._period
+        return max(0.0, deadline - now)
+
+    def tick(self):
+        """ Mark next deadline as served (now) """
+        lateness = max(0.0, self._clock() - (self._origin + self._index * self._period))
+        self._index += 1
+        served = self._index - self._missed
+        delta = lateness - self._late_mean
+        self._late_mean += delta / served
+        self._late_m2 += delta * (lateness - self._late_mean)
+        self._late_max = max(self._late_max, lateness)
+
+    def stats(self) -> SamplerStats:
+        """ Get statistics since start """
+        served = self._index - self._missed
+        elapsed = self._clock() - self._origin
+        return SamplerStats(
+            served,
+            self._missed,
+            served / elapsed if elapsed > 0 else 0.0,
+            sqrt(self._late_m2 / served) if served > 0 else 0.0,
+            self._late_max)
+
+
+class UMmeterSampler:
+    """ Sample UM-Meter data at a fixed rate, without drift
+
+        Each data dump is requested on a deadline grid, and timestamped with
+        its request date. If 'timeout' is given, it bounds each request.
+    """
+    def __init__(
+            self, meter: UMmeter, period: timedelta, timeout: Optional[timedelta] = None):
+        self._meter = meter
+        self._scheduler = DeadlineScheduler(period)
+        self._timeout = timeout
+
+    def __str__(self):
+        return f"<UM-Meter sampler: meter={self._meter} scheduler={self._scheduler}>"
+
+    def __iter__(self) -> Iterator[Tuple[datetime, Optional[UMmeterData]]]:
+        self._scheduler.start()
+        while True:
+            yield self.sample()
+
+    def sample(self) -> Tuple[datetime, Optional[UMmeterData]]:
+        """ Wait for next deadline, and request data dump """
+        sleep(self._scheduler.delay())
+        self._scheduler.tick()
+        date = datetime.now()
+        return date, self._meter.get_data(self._timeout)
+
+    def stats(self) -> SamplerStats:
+        """ Get sampling statistics """
+        return self._scheduler.stats()
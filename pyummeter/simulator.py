@@ -0,0 +1,276 @@
+""" UM-Meter device simulator over a pseudo-terminal (POSIX) """
+import os
+import random
+import select
+import tty
+from datetime import timedelta
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
+from typing import Any, NamedTuple, Optional
+from pyummeter.decoder import UMmeterData, UMmeterDataGroup, UMmeterDecoder
+
+
+class SimulatorFaults(NamedTuple):
+    """ Fault injection probabilities (per data dump request)
+
+        'drop': request not answered, 'truncate': data dump cut short,
+        'corrupt': one byte of data dump altered, 'garbage': random bytes sent
+        before data dump, 'latency': delay before answering.
+    """
+    drop: float = 0.0
+    truncate: float = 0.0
+    corrupt: float = 0.0
+    garbage: float = 0.0
+    latency: timedelta = timedelta(0)
+
+
+class SimulatorStats(NamedTuple):
+    """ Simulator statistics """
+    requests: int
+    commands: int
+    faults: int
+
+
+class UMmeterSimulator:
+    """ Simulated UM-Meter answering on a pseudo-terminal
+
+        The slave side path (see 'path') is used as a TTY interface. Data
+        dump requests are answered with the current data, paced at the
+        serial baudrate (None: as fast as possible), and control commands
+        update the simulated state. The selected data group accumulates
+        capacity and energy over time, as a real meter.
+    """
+    _SCREEN_COUNT = 6
+    # 8N1: start bit, 8 data bits, stop bit.
+    _BITS_PER_BYTE = 10
+    _CHUNK = 16
+
+    def __init__(
+            self, model: str = "UM25C", baudrate: Optional[int] = 9600,
+            faults: Optional[SimulatorFaults] = None, seed: Optional[int] = None):
+        if model not in UMmeterDecoder.model_names():
+            raise ValueError(f"Simulator: unknown model {model}")
+        assert baudrate is None or baudrate > 0
+        self._decoder = UMmeterDecoder()
+        self._byte_time = 0.0 if baudrate is None else self._BITS_PER_BYTE / baudrate
+        self._faults = faults or SimulatorFaults()
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        self._data = self._default_data(model)
+        self._integrated: Optional[float] = None
+        self._master: Optional[int] = None
+        self._slave: Optional[int] = None
+        self._path = ""
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._requests = 0
+        self._commands = 0
+        self._faulted = 0
+
+    def __str__(self):
+        return f"<UM-Meter simulator: model={self._data['model']} path={self._path}>"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, _1, _2, _3):
+        self.stop()
+
+    @property
+    def path(self) -> str:
+        """ Pseudo-terminal path to open as TTY interface """
+        return self._path
+
+    def is_running(self) -> bool:
+        """ Check if simulator is running """
+        return self._thread is not None
+
+    def start(self):
+        """ Open pseudo-terminal and start answering """
+        if self._thread is not None:
+            return
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self._path = os.ttyname(self._slave)
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="pyummeter-simulator", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stop answering and close pseudo-terminal """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def stats(self) -> SimulatorStats:
+        """ Get simulator statistics """
+        return SimulatorStats(self._requests, self._commands, self._faulted)
+
+    def data(self) -> UMmeterData:
+        """ Get copy of current simulated data """
+        with self._lock:
+            data = dict(self._data)
+            data["data_group"] = [dict(group) for group in self._data["data_group"]]
+            return data  # type: ignore
+
+    def update(self, **values: Any):
+        """ Update simulated data (e.g. voltage=5.1, intensity=0.5)
+
+            Power and resistance are updated from voltage and intensity,
+            unless given.
+        """
+        with self._lock:
+            for key, value in values.items():
+                if key not in UMmeterData.__annotations__:
+                    raise KeyError(f"Simulator: unknown data {key}")
+                self._data[key] = value  # type: ignore
+            data = self._data
+            if "power" not in values:
+                data["power"] = round(data["voltage"] * data["intensity"], 3)
+            if "resistance" not in values:
+                intensity = data["intensity"]
+                data["resistance"] = \
+                    round(data["voltage"] / intensity, 1) if intensity > 0 else 9999.9
+
+    def frame(self) -> bytes:
+        """ Build data dump of current simulated data """
+        with self._lock:
+            self._integrate()
+            return self._decoder.encode(self._data)
+
+    def command(self, cmd: int):
+        """ Apply control command """
+        with self._lock:
+            data = self._data
+            if cmd == 0xf1:
+                data["screen_index"] = (data["screen_index"] + 1) % self._SCREEN_COUNT
+            elif cmd == 0xf2:
+                pass  # Screen rotation is not reported in data dump.
+            elif cmd == 0xf3 and data["model"] == "UM24C":
+                # UM24C: next data group (no previous screen).
+                self._integrate()
+                data["data_group_selected"] = \
+                    (data["data_group_selected"] + 1) % UMmeterDecoder.DATA_GROUP_COUNT
+            elif cmd == 0xf3:
+                data["screen_index"] = (data["screen_index"] - 1) % self._SCREEN_COUNT
+            elif cmd == 0xf4:
+                self._integrate()
+                group = data["data_group"][data["data_group_selected"]]
+                group["capacity"] = 0.0
+                group["energy"] = 0.0
+            elif 0xe0 <= cmd <= 0xe9:
+                data["screen_timeout"] = timedelta(minutes=cmd - 0xe0)
+            elif 0xd0 <= cmd <= 0xd5:
+                data["screen_brightness"] = cmd - 0xd0
+            elif 0xb0 <= cmd <= 0xb0 + 30:
+                data["record_intensity_threshold"] = (cmd - 0xb0) / 100
+            elif 0xa0 <= cmd <= 0xa9:
+                self._integrate()
+                data["data_group_selected"] = cmd - 0xa0
+            else:
+                return
+            self._commands += 1
+
+    def _integrate(self):
+        """ Accumulate selected data group since last call (lock held) """
+        now = monotonic()
+        if self._integrated is not None:
+            hours = (now - self._integrated) / 3600
+            data = self._data
+            group = data["data_group"][data["data_group_selected"]]
+            group["capacity"] += data["intensity"] * hours
+            group["energy"] += data["power"] * hours
+            if data["intensity"] >= data["record_intensity_threshold"]:
+                data["record_duration"] += timedelta(seconds=now - self._integrated)
+        self._integrated = now
+
+    def _run(self):
+        """ Simulator loop """
+        master = self._master
+        assert master is not None
+        while not self._stop.is_set():
+            ready, _, _ = select.select([master], [], [], 0.05)
+            if not ready:
+                continue
+            try:
+                received = os.read(master, 64)
+            except OSError:
+                break
+            for cmd in received:
+                if cmd == 0xf0:
+                    self._requests += 1
+                    self._answer(master)
+                else:
+                    self.command(cmd)
+
+    def _answer(self, master: int):
+        """ Answer data dump request, with faults injected """
+        faults = self._faults
+        rand = self._random.random
+        raw = bytearray(self.frame())
+        if rand() < faults.drop:
+            self._faulted += 1
+            return
+        if faults.latency > timedelta(0):
+            sleep(faults.latency.total_seconds())
+        if rand() < faults.truncate:
+            self._faulted += 1
+            raw = raw[:self._random.randrange(1, len(raw))]
+        if rand() < faults.corrupt:
+            self._faulted += 1
+            raw[self._random.randrange(2, len(raw))] ^= 0xff
+        if rand() < faults.garbage:
+            self._faulted += 1
+            raw[0:0] = bytes(self._random.randrange(256) for _ in range(self._random.randint(1, 8)))
+        self._write(master, raw)
+
+    def _write(self, master: int, raw: bytearray):
+        """ Write data, paced at baudrate """
+        start = monotonic()
+        for index in range(0, len(raw), self._CHUNK):
+            chunk = raw[index:index + self._CHUNK]
+            if self._byte_time > 0:
+                delay = start + (index + len(chunk)) * self._byte_time - monotonic()
+                if delay > 0:
+                    sleep(delay)
+            try:
+                os.write(master, chunk)
+            except OSError:
+                return
+
+    @staticmethod
+    def _default_data(model: str) -> UMmeterData:
+        """ Get initial simulated data (idle 5 V USB port) """
+        return UMmeterData(
+            model=model,
+            voltage=5.0,
+            intensity=0.0,
+            power=0.0,
+            resistance=9999.9,
+            usb_voltage_dp=0.6,
+            usb_voltage_dn=0.6,
+            charging_mode="DCP1.5A",
+            charging_mode_full="Dedicated Charging Port (max. 1.5 A)",
+            temperature_celsius=25,
+            temperature_fahrenheit=77,
+            data_group_selected=0,
+            data_group=[
+                UMmeterDataGroup(capacity=0.0, energy=0.0)
+                for _ in range(UMmeterDecoder.DATA_GROUP_COUNT)
+            ],
+            record_capacity_threshold=0.0,
+            record_energy_threshold=0.0,
+            record_intensity_threshold=0.1,
+            record_duration=timedelta(0),
+            record_enabled=False,
+            screen_index=0,
+            screen_timeout=timedelta(0),
+            screen_brightness=5,
+            checksum=0)
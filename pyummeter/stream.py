@@ -0,0 +1,210 @@
+""" UM-Meter data dump streaming """
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from threading import Condition, Event, Thread
+from time import monotonic
+from typing import Deque, Iterator, NamedTuple, Optional, Tuple
+from pyummeter.decoder import UMmeterData, UMmeterDecoder
+from pyummeter.interface_base import UMmeterInterface
+from pyummeter.parser import UMmeterFrameParser
+
+
+class StreamStats(NamedTuple):
+    """ Streaming statistics """
+    frames: int
+    timeouts: int
+    overruns: int
+    errors: int
+    last_error: Optional[str]
+
+
+class UMmeterStream:
+    """ Background data dump reader, filling a ring buffer
+
+        The reader thread keeps a data dump request pending: next request is
+        sent as soon as a data dump is received, before decoding it. On a
+        shared interface (see UMmeterInterface.transaction()), each request
+        and its response are in a transaction instead, so next request is
+        only sent once the transaction is over. Samples are kept in a ring
+        buffer of 'size' samples, oldest samples being dropped when full
+        (counted as overrun for consumers not keeping up).
+        Received bytes go through the parser, resynchronising on data dump
+        boundaries after a short or corrupted reception. Responses are waited
+        for 'timeout' (None: until received), by slices so that the reader
+        can be stopped even if the meter does not answer.
+        An interface error stops the reader: it is counted, and raised again
+        (as IOError) by samples() once remaining samples are consumed.
+    """
+    # Longest wait of a reception (seconds), stop being checked in between.
+    _WAIT_SLICE = 0.1
+
+    def __init__(
+            self, com: UMmeterInterface, decoder: UMmeterDecoder,
+            parser: UMmeterFrameParser, size: int, timeout: Optional[timedelta] = None):
+        assert size > 0
+        self._com = com
+        self._timeout = None if timeout is None else timeout.total_seconds()
+        self._decoder = decoder
+        self._parser = parser
+        # Requests pipelined, unless transactions serialise interface users.
+        self._pipelined = isinstance(com.transaction(), nullcontext)
+        # Reception buffer, reused by each reception.
+        self._view = memoryview(bytearray(UMmeterDecoder.FRAME_SIZE))
+        self._ring: Deque[Tuple[int, datetime, UMmeterData]] = deque(maxlen=size)
+        self._seq = 0
+        self._cond = Condition()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._running = False
+        self._error: Optional[Exception] = None
+        self._frames = 0
+        self._timeouts = 0
+        self._overruns = 0
+        self._errors = 0
+        self._last_error: Optional[str] = None
+
+    def __str__(self):
+        return f"<UM-Meter stream: size={self._ring.maxlen} running={self.is_running()}>"
+
+    def is_running(self) -> bool:
+        """ Check if reader thread is running (not stopped, nor failed) """
+        return self._running
+
+    def start(self):
+        """ Start reader thread (again, after a failure) """
+        if not self._running:
+            self.stop()
+            self._stop.clear()
+            self._error = None
+            self._running = True
+            self._thread = Thread(target=self._run, name="pyummeter-stream", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """ Stop reader thread (pending data dump is received and dropped) """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            with self._cond:
+                self._cond.notify_all()
+
+    def stats(self) -> StreamStats:
+        """ Get streaming statistics """
+        return StreamStats(
+            self._frames, self._timeouts, self._overruns, self._errors, self._last_error)
+
+    def latest(self) -> Optional[Tuple[datetime, UMmeterData]]:
+        """ Get latest sample """
+        with self._cond:
+            if len(self._ring) == 0:
+                return None
+            _, date, data = self._ring[-1]
+            return date, data
+
+    def samples(
+            self, timeout: Optional[timedelta] = None
+    ) -> Iterator[Tuple[datetime, UMmeterData]]:
+        """ Iterate over new samples, until stopped or no sample during timeout
+
+            Raise IOError if reader failed, after remaining samples.
+        """
+        wait = None if timeout is None else timeout.total_seconds()
+        last = self._seq
+        while True:
+            with self._cond:
+                if self._seq == last and self._running:
+                    self._cond.wait(wait)
+                if self._seq == last:
+                    if self._error is not None and not self._running:
+                        raise IOError("UM-Meter: stream reader failed") from self._error
+                    return
+                first = self._ring[0][0]
+                if first > last + 1:
+                    # Samples dropped from ring before being consumed.
+                    self._overruns += first - last - 1
+                new = [s for s in self._ring if s[0] > last]
+                last = self._seq
+            for _, date, data in new:
+                yield date, data
+
+    def _run(self):
+        """ Reader thread """
+        try:
+            self._read()
+        except Exception as exp:  # pylint: disable=broad-except
+            # Pending bytes are dropped, next request resynchronises.
+            self._parser.reset()
+            with self._cond:
+                self._errors += 1
+                self._last_error = repr(exp)
+                self._error = exp
+        finally:
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+
+    def _read(self):
+        """ Reader thread loop """
+        pending = False
+        stale = False
+        while not self._stop.is_set():
+            # Request and its response in a transaction, not interleaved
+            # with other users of a shared interface.
+            with self._com.transaction():
+                if not pending:
+                    if stale:
+                        # Previous response incomplete: drop its bytes,
+                        # received or still to come, else they are taken for
+                        # this one.
+                        self._parser.reset()
+                        self._com.discard_input()
+                    self._com.send(bytearray([0xf0]))
+                    deadline = self._deadline()
+                while True:
+                    nb = self._parser.missing()
+                    received = self._receive(self._view[:nb], deadline)
+                    frames = self._parser.feed(self._view[:received])
+                    if frames or received < nb:
+                        break
+                stale = received < nb
+                pending = self._pipelined and not stale
+                if pending:
+                    # Request next data dump before decoding this one.
+                    self._com.send(bytearray([0xf0]))
+                    deadline = self._deadline()
+            if stale and not self._stop.is_set():
+                self._timeouts += 1
+            for frame in frames:
+                date = datetime.now()
+                data = self._decoder.decode(frame)
+                self._frames += 1
+                with self._cond:
+                    self._seq += 1
+                    self._ring.append((self._seq, date, data))
+                    self._cond.notify_all()
+        if pending:
+            # Drop pending data dump, to keep next request aligned.
+            view = self._view[:self._parser.missing()]
+            self._parser.feed(view[:self._receive(view, deadline)])
+        self._parser.reset()
+
+    def _deadline(self) -> Optional[float]:
+        """ Get monotonic deadline of response to request just sent """
+        return None if self._timeout is None else monotonic() + self._timeout
+
+    def _receive(self, view: memoryview, deadline: Optional[float]) -> int:
+        """ Receive into view until full, deadline, or stop while not answered """
+        received = 0
+        while received < len(view):
+            wait = self._WAIT_SLICE
+            if deadline is not None:
+                wait = min(wait, deadline - monotonic())
+                if wait <= 0:
+                    break
+            chunk = self._com.receive_into(view[received:], timedelta(seconds=wait))
+            received += chunk
+            if chunk == 0 and self._stop.is_set():
+                break
+        return received
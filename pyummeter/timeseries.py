@@ -0,0 +1,205 @@
+""" UM-Meter samples in-memory time-series store """
+from array import array
+from datetime import datetime, timedelta
+from math import floor
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+
+class TimeSeriesSample(NamedTuple):
+    """ Raw sample of a field """
+    date: datetime
+    value: float
+
+
+class TimeSeriesAggregate(NamedTuple):
+    """ Aggregated samples of a field, over a period starting at date """
+    date: datetime
+    min: float
+    max: float
+    mean: float
+    samples: int
+
+
+class _Ring:
+    """ Fixed capacity ring of float columns, in time order """
+    def __init__(self, capacity: int, columns: Sequence[str]):
+        assert capacity > 0
+        self.capacity = capacity
+        self.columns = {name: array("d", bytes(8 * capacity)) for name in columns}
+        self.timestamp = self.columns["timestamp"]
+        self.start = 0
+        self.length = 0
+
+    def slot(self, index: int) -> int:
+        """ Get array slot of logical index (0: oldest) """
+        return (self.start + index) % self.capacity
+
+    def append(self) -> int:
+        """ Allocate newest slot (oldest dropped when full), return it """
+        if self.length < self.capacity:
+            self.length += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+        return self.slot(self.length - 1)
+
+    def search(self, timestamp: float) -> int:
+        """ Get logical index of first entry at or after timestamp """
+        low, high = 0, self.length
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp[self.slot(middle)] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def between(self, start: float, end: float) -> range:
+        """ Get logical indexes of entries in [start, end[ """
+        return range(self.search(start), self.search(end))
+
+
+class UMmeterTimeSeries:
+    """ Fixed memory time-series of UM-Meter samples
+
+        Samples fields are kept in a raw ring of 'capacity' samples, and
+        aggregated (min/max/mean) in tiers of coarser resolution, each its
+        own ring, updated on each sample. Memory is allocated once; queries
+        cost a binary search plus the points returned. Samples are stored
+        in time order: a sample older than the last one (e.g. clock set
+        back) is dropped and counted. Naive dates are converted with their
+        fold, so datetime.now() does not go back at daylight saving time
+        end, but dates computed from it (fold reset) do.
+    """
+    FIELDS = ("voltage", "intensity", "power")
+    TIERS = (
+        (timedelta(seconds=1), 86400),
+        (timedelta(minutes=1), 10080),
+        (timedelta(hours=1), 8760),
+    )
+
+    def __init__(
+            self, capacity: int = 86400, fields: Sequence[str] = FIELDS,
+            tiers: Sequence[Tuple[timedelta, int]] = TIERS):
+        assert len(fields) > 0
+        self._fields = tuple(fields)
+        self._raw = _Ring(capacity, ("timestamp",) + self._fields)
+        columns = ["timestamp", "samples"]
+        for field in self._fields:
+            columns.extend([f"{field}.min", f"{field}.max", f"{field}.sum"])
+        self._tiers: Dict[float, _Ring] = {}
+        for resolution, size in tiers:
+            if resolution.total_seconds() <= 0:
+                raise ValueError("TimeSeries: resolution invalid range")
+            self._tiers[resolution.total_seconds()] = _Ring(size, columns)
+        # Columns of each field, resolved once for append.
+        self._raw_columns = [self._raw.columns[field] for field in self._fields]
+        self._tier_columns = {
+            resolution: [
+                (tier.columns[f"{field}.min"], tier.columns[f"{field}.max"],
+                 tier.columns[f"{field}.sum"])
+                for field in self._fields
+            ]
+            for resolution, tier in self._tiers.items()
+        }
+        self._last: Optional[float] = None
+        self._dropped = 0
+
+    def __str__(self):
+        return f"<UM-Meter time-series: samples={len(self)} tiers={len(self._tiers)}>"
+
+    def __len__(self) -> int:
+        return self._raw.length
+
+    def fields(self) -> List[str]:
+        """ Get stored fields """
+        return list(self._fields)
+
+    def dropped(self) -> int:
+        """ Get number of samples dropped, older than last sample """
+        return self._dropped
+
+    def resolutions(self) -> List[timedelta]:
+        """ Get tiers resolution """
+        return [timedelta(seconds=resolution) for resolution in self._tiers]
+
+    def append(self, date: datetime, data: Mapping[str, Any]):
+        """ Append sample (dropped if date older than last sample) """
+        timestamp = date.timestamp()
+        if self._last is not None and timestamp < self._last:
+            self._dropped += 1
+            return
+        self._last = timestamp
+        values = [float(data[field]) for field in self._fields]
+        ring = self._raw
+        slot = ring.append()
+        ring.timestamp[slot] = timestamp
+        for column, value in zip(self._raw_columns, values):
+            column[slot] = value
+        for resolution, tier in self._tiers.items():
+            self._aggregate(
+                tier, self._tier_columns[resolution],
+                floor(timestamp / resolution) * resolution, values)
+
+    def query(
+            self, field: str, start: datetime, end: datetime
+    ) -> List[TimeSeriesSample]:
+        """ Get raw samples of field in [start, end[ """
+        self._check_field(field)
+        ring = self._raw
+        column = ring.columns[field]
+        samples = []
+        for index in ring.between(start.timestamp(), end.timestamp()):
+            slot = ring.slot(index)
+            samples.append(TimeSeriesSample(
+                datetime.fromtimestamp(ring.timestamp[slot]), column[slot]))
+        return samples
+
+    def aggregate(
+            self, field: str, start: datetime, end: datetime, resolution: timedelta
+    ) -> List[TimeSeriesAggregate]:
+        """ Get aggregates of field at tier resolution, for periods in [start, end[ """
+        tier = self._tiers.get(resolution.total_seconds())
+        if tier is None:
+            raise ValueError("TimeSeries: resolution invalid range")
+        self._check_field(field)
+        columns = tier.columns
+        col_min = columns[f"{field}.min"]
+        col_max = columns[f"{field}.max"]
+        col_sum = columns[f"{field}.sum"]
+        count = columns["samples"]
+        aggregates = []
+        for index in tier.between(start.timestamp(), end.timestamp()):
+            slot = tier.slot(index)
+            aggregates.append(TimeSeriesAggregate(
+                datetime.fromtimestamp(tier.timestamp[slot]), col_min[slot], col_max[slot],
+                col_sum[slot] / count[slot], int(count[slot])))
+        return aggregates
+
+    def _check_field(self, field: str):
+        """ Check field is stored """
+        if field not in self._fields:
+            raise KeyError(f"TimeSeries: field {field} not stored")
+
+    @staticmethod
+    def _aggregate(
+            tier: _Ring, columns: List[Tuple[array, array, array]], period: float,
+            values: List[float]):
+        """ Aggregate values in tier period """
+        count = tier.columns["samples"]
+        slot = tier.slot(tier.length - 1)
+        if tier.length > 0 and tier.timestamp[slot] == period:
+            count[slot] += 1
+            for (col_min, col_max, col_sum), value in zip(columns, values):
+                if value < col_min[slot]:
+                    col_min[slot] = value
+                if value > col_max[slot]:
+                    col_max[slot] = value
+                col_sum[slot] += value
+        else:
+            slot = tier.append()
+            tier.timestamp[slot] = period
+            count[slot] = 1
+            for (col_min, col_max, col_sum), value in zip(columns, values):
+                col_min[slot] = value
+                col_max[slot] = value
+                col_sum[slot] = value
@@ -3,64 +3,91 @@
 # Information from "https://sigrok.org/wiki/RDTech_UM_series"
 #
 from datetime import timedelta
-from struct import unpack
-from typing import List, Optional, TypedDict
-from pyummeter.interface_base import UMmeterInterface
-
-
-class UMmeterDataGroup(TypedDict):
-    """ UM-Meter data group format """
-    capacity: float
-    energy: float
-
-
-class UMmeterData(TypedDict):
-    """ UM-Meter data format """
-    model: str
-    voltage: float
-    intensity: float
-    power: float
-    resistance: float
-    usb_voltage_dp: float
-    usb_voltage_dn: float
-    charging_mode: str
-    charging_mode_full: str
-    temperature_celsius: int
-    temperature_fahrenheit: int
-    data_group_selected: int
-    data_group: List[UMmeterDataGroup]
-    record_capacity_threshold: float
-    record_energy_threshold: float
-    record_intensity_threshold: float
-    record_duration: timedelta
-    record_enabled: bool
-    screen_index: int
-    screen_timeout: timedelta
-    screen_brightness: int
-    checksum: int
+from datetime import datetime
+from time import monotonic, perf_counter
+from typing import Callable, Iterator, Optional, Tuple
+from pyummeter.decoder import (  # noqa: F401
+    Buffer, UMmeterData, UMmeterDataGroup, UMmeterDecoder, UMmeterFrame
+)
+from pyummeter.interface_base import UMmeterAsyncInterface, UMmeterInterface
+from pyummeter.metrics import MetricsStats, UMmeterInterfaceMetrics, UMmeterMetrics
+from pyummeter.parser import ParserStats, UMmeterFrameParser
+from pyummeter.stream import StreamStats, UMmeterStream
+
+
+def _deadline(timeout: Optional[timedelta]) -> Optional[float]:
+    """ Get monotonic deadline of timeout (None: no deadline) """
+    if timeout is None:
+        return None
+    if timeout.total_seconds() < 0:
+        raise ValueError("UM-Meter: timeout invalid range")
+    return monotonic() + timeout.total_seconds()
+
+
+def _remaining(deadline: Optional[float]) -> Optional[timedelta]:
+    """ Get time remaining until deadline (None: no deadline) """
+    if deadline is None:
+        return None
+    return timedelta(seconds=max(0.0, deadline - monotonic()))
+
+
+# Data dump request command.
+_CMD_DATA = bytearray([0xf0])
+
+
+def _cmd_screen_timeout(minutes: int) -> bytearray:
+    """ Build screen timeout command """
+    if minutes < 0 or 9 < minutes:
+        raise ValueError("UM-Meter: timeout invalid range")
+    return bytearray([0xe0 + minutes])
+
+
+def _cmd_screen_brightness(brightness: int) -> bytearray:
+    """ Build screen brightness command """
+    if brightness < 0 or 5 < brightness:
+        raise ValueError("UM-Meter: brightness invalid range")
+    return bytearray([0xd0 + brightness])
+
+
+def _cmd_data_threshold(threshold_ma: int) -> bytearray:
+    """ Build recording threshold command """
+    if threshold_ma < 0 or 300 < threshold_ma:
+        raise ValueError("UM-Meter: threshold invalid range")
+    return bytearray([0xb0 + int(round(threshold_ma / 10))])
+
+
+def _cmd_data_group_set(group: int) -> bytearray:
+    """ Build data group selection command """
+    if group < 0 or 9 < group:
+        raise ValueError("UM-Meter: group invalid range")
+    return bytearray([0xa0 + group])
 
 
 class UMmeter():
     """ UM-Meter instance """
-    _MODEL = {
-        0x0963: "UM24C",
-        0x09c9: "UM25C",
-        0x0d4c: "UM34C"
-    }
-    _CHARGING_MODE = {
-        0: ("Unknown", "Unknown"),
-        1: ("QC2", "Qualcomm Quick Charge 2.0"),
-        2: ("QC3", "Qualcomm Quick Charge 3.0"),
-        3: ("APP2.4A", "Apple (max. 2.4 A)"),
-        4: ("APP2.1A", "Apple (max. 2.1 A)"),
-        5: ("APP1.0A", "Apple (max. 1.0 A)"),
-        6: ("APP0.5A", "Apple (max. 0.5 A)"),
-        7: ("DCP1.5A", "Dedicated Charging Port (max. 1.5 A)"),
-        8: ("Samsung", "Samsung")
-    }
-
-    def __init__(self, com: UMmeterInterface):
+    def __init__(
+            self, com: UMmeterInterface, validate: Optional[Callable[[bytes], bool]] = None,
+            metrics: Optional[UMmeterMetrics] = None):
+        """ Create UM-Meter instance on interface
+
+            Received data are resynchronised on data dump boundaries after
+            a short or corrupted reception. If 'validate' is given (e.g.
+            checksum verification), data dumps not passing it are dropped.
+            If 'metrics' is given, requests stages and I/O are instrumented.
+        """
+        if metrics is not None:
+            com = UMmeterInterfaceMetrics(com, metrics)
         self._com: UMmeterInterface = com
+        self._metrics = metrics
+        self._decoder = UMmeterDecoder()
+        self._parser = UMmeterFrameParser(validate)
+        self._stream: Optional[UMmeterStream] = None
+        # Reception buffer, reused by each request.
+        self._view = memoryview(bytearray(UMmeterDecoder.FRAME_SIZE))
+        # Last response incomplete (to discard before next request).
+        self._stale = False
+        # Configured receive timeout (None: wait forever).
+        self._timeout: Optional[timedelta] = None
 
     def __str__(self):
         return f"<UM-Meter: com={self._com}>"
@@ -82,69 +109,158 @@ class UMmeter():
 
     def close(self):
         """ Close connection """
+        self.stop_stream()
         self._com.close()
 
-    def set_timeout(self, timeout_s: int):
-        """ Configure receive timeout in seconds """
+    def set_timeout(self, timeout_s: float):
+        """ Configure receive timeout in seconds (fractional) """
+        if timeout_s < 0:
+            raise ValueError("UM-Meter: timeout invalid range")
         if self.is_open():
-            self._com.set_timeout(timedelta(seconds=timeout_s))
+            self._timeout = timedelta(seconds=timeout_s)
+            self._com.set_timeout(self._timeout)
+
+    def start_stream(self, size: int = 1024, timeout: Optional[timedelta] = None):
+        """ Start streaming data dumps from a background reader
+
+            Samples are kept in a ring buffer of 'size' samples, read with
+            latest() or stream(). Each response is waited for 'timeout'
+            (default: configured receive timeout, see set_timeout()); the
+            reader is stopped within a fraction of a second even if the meter
+            does not answer. Data dumps cannot be requested while streaming.
+            A failed reader (see stream_stats()) is restarted.
 
-    def get_data(self) -> Optional[UMmeterData]:
+            Supported on: UM24C/UM25C/UM34C.
+        """
+        if self._stream is None:
+            self._stream = UMmeterStream(
+                self._com, self._decoder, self._parser, size,
+                self._timeout if timeout is None else timeout)
+        self._stream.start()
+
+    def stop_stream(self) -> Optional[StreamStats]:
+        """ Stop streaming data dumps, return final streaming statistics """
+        if self._stream is None:
+            return None
+        self._stream.stop()
+        stats = self._stream.stats()
+        self._stream = None
+        # Reader may have stopped before receiving a response.
+        self._stale = True
+        return stats
+
+    def is_streaming(self) -> bool:
+        """ Check if data dumps are streamed (reader not failed, see stream_stats()) """
+        return self._stream is not None and self._stream.is_running()
+
+    def latest(self) -> Optional[Tuple[datetime, UMmeterData]]:
+        """ Get latest streamed sample """
+        if self._stream is None:
+            raise RuntimeError("UM-Meter: not streaming")
+        return self._stream.latest()
+
+    def stream(
+            self, timeout: Optional[timedelta] = None
+    ) -> Iterator[Tuple[datetime, UMmeterData]]:
+        """ Iterate over new streamed samples, until stopped or timeout """
+        if self._stream is None:
+            raise RuntimeError("UM-Meter: not streaming")
+        return self._stream.samples(timeout)
+
+    def stream_stats(self) -> Optional[StreamStats]:
+        """ Get streaming statistics """
+        if self._stream is None:
+            return None
+        return self._stream.stats()
+
+    def get_data(self, timeout: Optional[timedelta] = None) -> Optional[UMmeterData]:
         """ Request new data dump
 
+            If 'timeout' is given, it bounds the whole request (instead of
+            each reception with the configured receive timeout).
+
             Supported on: UM24C/UM25C/UM34C.
         """
-        # Send and wait to received data dump.
-        self._com.send(bytearray([0xf0]))
-        raw = self._com.receive(130)
-        if len(raw) == 130:
-            # Extract information.
-            (
-                mod, volt, amp, watt, temp_c, temp_f, dg_cur, dg, udp, udn,
-                cmode, rt_mah, rt_wh, rt_ma, rt_dur, rt_en, sc_time, sc_light,
-                ohm, sc_cur, _1, crc
-            ) = unpack(">HHHLHHH80sHHHLLHLHHHLHBB", raw)
-            # Get model for conversion.
-            model = UMmeter._get_model_name(mod)
-            # Parse data group.
-            data_group: List[UMmeterDataGroup] = []
-            for dg_n in [dg[i:i + 8] for i in range(0, len(dg), 8)]:
-                dg_cap, dg_wh = unpack(">LL", dg_n)
-                data_group.append({
-                    "capacity": UMmeter._convert_data_group_capacity(model, dg_cap),
-                    "energy": UMmeter._convert_data_group_energy(model, dg_wh)
-                })
-            # Format information.
-            data: UMmeterData = {
-                "model": model,
-                "voltage": UMmeter._convert_voltage(model, volt),
-                "intensity": UMmeter._convert_intensity(model, amp),
-                "power": UMmeter._convert_power(model, watt),
-                "resistance": UMmeter._convert_resistance(model, ohm),
-                "temperature_celsius": temp_c,
-                "temperature_fahrenheit": temp_f,
-                "data_group_selected": dg_cur,
-                "data_group": data_group,
-                "usb_voltage_dp": UMmeter._convert_usb_voltage(model, udp),
-                "usb_voltage_dn": UMmeter._convert_usb_voltage(model, udn),
-                "charging_mode": UMmeter._get_charging_mode_name(cmode),
-                "charging_mode_full": UMmeter._get_charging_mode_full_name(cmode),
-                "record_capacity_threshold":
-                    UMmeter._convert_record_threshold_capacity(model, rt_mah),
-                "record_energy_threshold":
-                    UMmeter._convert_record_threshold_energy(model, rt_wh),
-                "record_intensity_threshold":
-                    UMmeter._convert_record_threshold_intensity(model, rt_ma),
-                "record_duration": timedelta(seconds=rt_dur),
-                "record_enabled": bool(rt_en == 1),
-                "screen_timeout": timedelta(minutes=sc_time),
-                "screen_brightness": sc_light,
-                "screen_index": sc_cur,
-                "checksum": crc
-            }
+        raw = self._request_data(timeout)
+        if raw is not None:
+            start = perf_counter()
+            data = self._decoder.decode(raw)
+            self._record("decode", start)
             return data
         return None
 
+    def get_frame(self, timeout: Optional[timedelta] = None) -> Optional[UMmeterFrame]:
+        """ Request new data dump, decoded on access (see get_data)
+
+            Supported on: UM24C/UM25C/UM34C.
+        """
+        raw = self._request_data(timeout)
+        if raw is not None:
+            return UMmeterFrame(raw, self._decoder)
+        return None
+
+    def parser_stats(self) -> ParserStats:
+        """ Get reception statistics (resynchronisations, discarded bytes) """
+        return self._parser.stats()
+
+    def stats(self) -> Optional[MetricsStats]:
+        """ Get instrumentation statistics (None if not instrumented) """
+        if self._metrics is None:
+            return None
+        return self._metrics.stats()
+
+    def _record(self, stage: str, start: float):
+        """ Record stage duration since start, if instrumented """
+        if self._metrics is not None:
+            self._metrics.record(stage, perf_counter() - start)
+
+    def _request_data(self, timeout: Optional[timedelta]) -> Optional[Buffer]:
+        """ Request new raw data dump """
+        if self._metrics is None:
+            return self._receive_data(timeout)
+        start = perf_counter()
+        raw = self._receive_data(timeout)
+        self._record("request", start)
+        self._metrics.count("requests")
+        self._metrics.count("frames" if raw is not None else "timeouts")
+        return raw
+
+    def _receive_data(self, timeout: Optional[timedelta]) -> Optional[Buffer]:
+        """ Send data dump request, and receive it
+
+            Data dump is received in place, in a reused buffer: it is valid
+            until next request.
+        """
+        if self.is_streaming():
+            raise RuntimeError("UM-Meter: data dumps are streamed")
+        deadline = _deadline(timeout)
+        with self._com.transaction():
+            if self._stale:
+                # Previous response incomplete: drop its bytes, received or
+                # still to come, else they are taken for this response.
+                self._parser.reset()
+                self._com.discard_input()
+            # Send and wait to received data dump.
+            self._com.send(_CMD_DATA)
+            self._stale = True
+            nb = UMmeterDecoder.FRAME_SIZE
+            received = self._com.receive_into(self._view, _remaining(deadline))
+            raw = self._view if received == nb else self._view[:received]
+            if self._parser.aligned(raw):
+                self._stale = False
+                return raw
+            # Short or misaligned reception: resynchronise (parser keeps a
+            # copy of pending bytes, so the buffer is reused).
+            frames = self._parser.feed(raw)
+            if not frames and received == nb and self._parser.pending() != 0:
+                remaining = _remaining(deadline)
+                if remaining is None or remaining > timedelta(0):
+                    view = self._view[:self._parser.missing()]
+                    received = self._com.receive_into(view, remaining)
+                    frames = self._parser.feed(view[:received])
+            self._stale = not frames or self._parser.pending() != 0
+        return frames[-1] if frames else None
+
     def screen_next(self):
         """ Go to next screen
 
@@ -171,36 +287,28 @@ class UMmeter():
 
             Supported on: UM24C/UM25C/UM34C.
         """
-        if minutes < 0 or 9 < minutes:
-            raise ValueError("UM-Meter: timeout invalid range")
-        self._com.send(bytearray([0xe0 + minutes]))
+        self._com.send(_cmd_screen_timeout(minutes))
 
     def screen_brightness(self, brightness: int):
         """ Set screen brightness (0: dim, 5: full)
 
             Supported on: UM24C/UM25C/UM34C.
         """
-        if brightness < 0 or 5 < brightness:
-            raise ValueError("UM-Meter: brightness invalid range")
-        self._com.send(bytearray([0xd0 + brightness]))
+        self._com.send(_cmd_screen_brightness(brightness))
 
     def data_threshold(self, threshold_ma: int):
         """ Set recording threshold in mA (0-300)
 
             Supported on: UM24C/UM25C/UM34C.
         """
-        if threshold_ma < 0 or 300 < threshold_ma:
-            raise ValueError("UM-Meter: threshold invalid range")
-        self._com.send(bytearray([0xb0 + int(round(threshold_ma / 10))]))
+        self._com.send(_cmd_data_threshold(threshold_ma))
 
     def data_group_set(self, group: int):
         """ Set the selected data group (0-9)
 
             Supported on: UM25C/UM34C.
         """
-        if group < 0 or 9 < group:
-            raise ValueError("UM-Meter: group invalid range")
-        self._com.send(bytearray([0xa0 + group]))
+        self._com.send(_cmd_data_group_set(group))
 
     def data_group_next(self):
         """ Switch to next data group
@@ -216,97 +324,160 @@ class UMmeter():
         """
         self._com.send(bytearray([0xf4]))
 
-    @staticmethod
-    def _get_model_name(value: int) -> str:
-        """ Get model name """
-        if value in UMmeter._MODEL:
-            return UMmeter._MODEL[value]
-        return "Unknown"
-
-    @staticmethod
-    def _get_charging_mode_name(value: int) -> str:
-        """ Get charging mode name """
-        if value in UMmeter._CHARGING_MODE:
-            return UMmeter._CHARGING_MODE[value][0]
-        return "Unknown"
-
-    @staticmethod
-    def _get_charging_mode_full_name(value: int) -> str:
-        """ Get charging mode name """
-        if value in UMmeter._CHARGING_MODE:
-            return UMmeter._CHARGING_MODE[value][1]
-        return "Unknown"
-
-    @staticmethod
-    def _convert_voltage(model: str, value: int) -> float:
-        """ Apply voltage conversion by model type """
-        if model in ["UM25C"]:
-            return value / 1000
-        if model in ["UM24C", "UM34C"]:
-            return value / 100
-        return 0
-
-    @staticmethod
-    def _convert_usb_voltage(model: str, value: int) -> float:
-        """ Apply USB voltage conversion by model type """
-        if model in ["UM25C", "UM24C", "UM34C"]:
-            return value / 100
-        return 0
-
-    @staticmethod
-    def _convert_intensity(model: str, value: int) -> float:
-        """ Apply intensity conversion by model type """
-        if model in ["UM25C"]:
-            return value / 10000
-        if model in ["UM24C", "UM34C"]:
-            return value / 1000
-        return 0
-
-    @staticmethod
-    def _convert_power(model: str, value: int) -> float:
-        """ Apply power conversion by model type """
-        if model in ["UM25C", "UM24C", "UM34C"]:
-            return value / 1000
-        return 0
-
-    @staticmethod
-    def _convert_resistance(model: str, value: int) -> float:
-        """ Apply resistance conversion by model type """
-        if model in ["UM25C", "UM24C", "UM34C"]:
-            return value / 10
-        return 0
-
-    @staticmethod
-    def _convert_record_threshold_intensity(model: str, value: int) -> float:
-        """ Apply data group intensity conversion by model type """
-        if model in ["UM25C", "UM24C", "UM34C"]:
-            return value / 100
-        return 0
-
-    @staticmethod
-    def _convert_record_threshold_capacity(model: str, value: int) -> float:
-        """ Apply data group capacity conversion by model type """
-        if model in ["UM25C", "UM24C", "UM34C"]:
-            return value / 1000
-        return 0
-
-    @staticmethod
-    def _convert_record_threshold_energy(model: str, value: int) -> float:
-        """ Apply data group energy conversion by model type """
-        if model in ["UM25C", "UM24C", "UM34C"]:
-            return value / 1000
-        return 0
-
-    @staticmethod
-    def _convert_data_group_capacity(model: str, value: int) -> float:
-        """ Apply data group capacity conversion by model type """
-        if model in ["UM25C", "UM24C", "UM34C"]:
-            return value / 1000
-        return 0
-
-    @staticmethod
-    def _convert_data_group_energy(model: str, value: int) -> float:
-        """ Apply data group energy conversion by model type """
-        if model in ["UM25C", "UM24C", "UM34C"]:
-            return value / 1000
-        return 0
+
+class AsyncUMmeter():
+    """ UM-Meter instance (asyncio) """
+    def __init__(
+            self, com: UMmeterAsyncInterface,
+            validate: Optional[Callable[[bytes], bool]] = None):
+        """ Create UM-Meter instance on interface (see UMmeter) """
+        self._com: UMmeterAsyncInterface = com
+        self._decoder = UMmeterDecoder()
+        self._parser = UMmeterFrameParser(validate)
+        # Last response incomplete (to discard before next request).
+        self._stale = False
+
+    def __str__(self):
+        return f"<Async UM-Meter: com={self._com}>"
+
+    async def __aenter__(self):
+        self.open()
+        return self
+
+    async def __aexit__(self, _1, _2, _3):
+        self.close()
+
+    def is_open(self):
+        """ Check if connection is opened """
+        return self._com.is_open()
+
+    def open(self):
+        """ Open connection """
+        self._com.open()
+
+    def close(self):
+        """ Close connection """
+        self._com.close()
+
+    def set_timeout(self, timeout_s: float):
+        """ Configure receive timeout in seconds (fractional) """
+        if timeout_s < 0:
+            raise ValueError("UM-Meter: timeout invalid range")
+        if self.is_open():
+            self._com.set_timeout(timedelta(seconds=timeout_s))
+
+    async def get_data(self, timeout: Optional[timedelta] = None) -> Optional[UMmeterData]:
+        """ Request new data dump
+
+            If 'timeout' is given, it bounds the whole request (instead of
+            each reception with the configured receive timeout).
+
+            Supported on: UM24C/UM25C/UM34C.
+        """
+        raw = await self._request_data(timeout)
+        if raw is not None:
+            return self._decoder.decode(raw)
+        return None
+
+    async def get_frame(self, timeout: Optional[timedelta] = None) -> Optional[UMmeterFrame]:
+        """ Request new data dump, decoded on access (see get_data)
+
+            Supported on: UM24C/UM25C/UM34C.
+        """
+        raw = await self._request_data(timeout)
+        if raw is not None:
+            return UMmeterFrame(raw, self._decoder)
+        return None
+
+    def parser_stats(self) -> ParserStats:
+        """ Get reception statistics (resynchronisations, discarded bytes) """
+        return self._parser.stats()
+
+    async def _request_data(self, timeout: Optional[timedelta]) -> Optional[Buffer]:
+        """ Request new raw data dump """
+        deadline = _deadline(timeout)
+        if self._stale:
+            # Previous response incomplete: drop its bytes, received or still
+            # to come, else they are taken for this response.
+            self._parser.reset()
+            self._com.discard_input()
+        # Send and wait to received data dump.
+        await self._com.send(bytearray([0xf0]))
+        self._stale = True
+        nb = UMmeterDecoder.FRAME_SIZE
+        raw = await self._com.receive(nb, _remaining(deadline))
+        if self._parser.aligned(raw):
+            self._stale = False
+            return raw
+        # Short or misaligned reception: resynchronise.
+        frames = self._parser.feed(raw)
+        if not frames and len(raw) == nb and self._parser.pending() != 0:
+            remaining = _remaining(deadline)
+            if remaining is None or remaining > timedelta(0):
+                frames = self._parser.feed(
+                    await self._com.receive(self._parser.missing(), remaining))
+        self._stale = not frames or self._parser.pending() != 0
+        return frames[-1] if frames else None
+
+    async def screen_next(self):
+        """ Go to next screen
+
+            Supported on: UM24C/UM25C/UM34C.
+        """
+        await self._com.send(bytearray([0xf1]))
+
+    async def screen_previous(self):
+        """ Go to previous screen
+
+            Supported on: UM25C/UM34C.
+        """
+        await self._com.send(bytearray([0xf3]))
+
+    async def screen_rotate(self):
+        """ Rotate screen
+
+            Supported on: UM24C/UM25C/UM34C.
+        """
+        await self._com.send(bytearray([0xf2]))
+
+    async def screen_timeout(self, minutes: int):
+        """ Set screen timeout in minutes (0-9)
+
+            Supported on: UM24C/UM25C/UM34C.
+        """
+        await self._com.send(_cmd_screen_timeout(minutes))
+
+    async def screen_brightness(self, brightness: int):
+        """ Set screen brightness (0: dim, 5: full)
+
+            Supported on: UM24C/UM25C/UM34C.
+        """
+        await self._com.send(_cmd_screen_brightness(brightness))
+
+    async def data_threshold(self, threshold_ma: int):
+        """ Set recording threshold in mA (0-300)
+
+            Supported on: UM24C/UM25C/UM34C.
+        """
+        await self._com.send(_cmd_data_threshold(threshold_ma))
+
+    async def data_group_set(self, group: int):
+        """ Set the selected data group (0-9)
+
+            Supported on: UM25C/UM34C.
+        """
+        await self._com.send(_cmd_data_group_set(group))
+
+    async def data_group_next(self):
+        """ Switch to next data group
+
+            Supported on: UM24C.
+        """
+        await self._com.send(bytearray([0xf3]))
+
+    async def data_group_clear(self):
+        """ Clear data group
+
+            Supported on: UM24C/UM25C/UM34C.
+        """
+        await self._com.send(bytearray([0xf4]))
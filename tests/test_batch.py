@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+import pytest
+from tests.test_decoder import frame
+from pyummeter import UMmeterDecoder
+from pyummeter.integrator import UMmeterIntegrator
+
+np = pytest.importorskip("numpy")
+batch = pytest.importorskip("pyummeter.batch")
+
+
+class TestBatch:
+    def test_frames_view(self):
+        with pytest.raises(ValueError):
+            batch.frames_view(bytes(frame(0x0963))[:-1])
+        raw = batch.frames_view(bytes(frame(0x0963) * 2))
+        assert len(raw) == 2
+        assert raw["model_id"][1] == 0x0963
+
+    def test_decode_frames(self):
+        frames = [frame(0x0963), frame(0x09c9), frame(0x0d4c), frame(0xffff)]
+        columns = batch.decode_frames(memoryview(b"".join(frames)))
+        decoder = UMmeterDecoder()
+        for i, raw in enumerate(frames):
+            data = decoder.decode(raw)
+            for key in [
+                "model", "voltage", "intensity", "power", "resistance",
+                "usb_voltage_dp", "usb_voltage_dn", "charging_mode",
+                "charging_mode_full", "temperature_celsius",
+                "temperature_fahrenheit", "data_group_selected",
+                "record_capacity_threshold", "record_energy_threshold",
+                "record_intensity_threshold", "record_duration", "record_enabled",
+                "screen_index", "screen_timeout", "screen_brightness", "checksum"
+            ]:
+                assert columns[key][i] == data[key], key  # type: ignore
+            assert list(columns["data_group_capacity"][i]) == [
+                g["capacity"] for g in data["data_group"]]
+            assert list(columns["data_group_energy"][i]) == [
+                g["energy"] for g in data["data_group"]]
+
+    def test_to_records(self):
+        records = batch.to_records(batch.decode_frames(bytes(frame(0x09c9))))
+        assert records.dtype == batch.FRAME_DTYPE
+        assert records[0]["model"] == "UM25C"
+        assert records[0]["intensity"] == 0.0328
+
+    def test_decode_records(self, tmp_path):
+        from pyummeter.capture import CaptureReader, CaptureWriter
+        path = str(tmp_path / "capture.bin")
+        with CaptureWriter(path) as writer:
+            writer.write(frame(0x0963), 1_000)
+            writer.write(frame(0x09c9), 2_000)
+        with CaptureReader(path) as reader:
+            records = reader.records()
+            timestamps, columns = batch.decode_records(records)
+            assert list(timestamps.astype("i8")) == [1_000, 2_000]
+            assert list(columns["model"]) == ["UM24C", "UM25C"]
+            with pytest.raises(ValueError):
+                batch.decode_records(records[:-1])
+            del timestamps, columns
+            records.release()
+
+    def test_integrate(self):
+        start = datetime(2026, 1, 1)
+        dates = [start + timedelta(seconds=s) for s in [0, 0.5, 1, 1.5, 10, 10.5]]
+        intensity = np.array([0.0, 1.0, 1.0, 2.0, 2.0, 1.0])
+        power = intensity * 5
+        integrator = UMmeterIntegrator(max_gap=timedelta(seconds=5))
+        for date, i, p in zip(dates, intensity, power):
+            integrator.update(date, {"intensity": i, "power": p})
+        timestamps = np.array(dates, dtype="M8[ns]")
+        totals = batch.integrate(timestamps, intensity, power, timedelta(seconds=5))
+        expected = integrator.totals()
+        assert totals.capacity == pytest.approx(expected.capacity)
+        assert totals.energy == pytest.approx(expected.energy)
+        assert totals[2:] == expected[2:]
+        assert totals.gaps == 1
+        seconds = (timestamps - timestamps[0]).astype("f8") / 1e9
+        assert batch.integrate(seconds, intensity, power) == totals
+        # Timestamps going backwards are gaps.
+        totals = batch.integrate(timestamps[::-1], intensity, power)
+        assert totals.gaps == len(timestamps) - 1
+        assert totals.duration == timedelta(0)
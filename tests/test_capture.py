@@ -0,0 +1,102 @@
+import pytest
+from pyummeter.capture import CaptureReader, CaptureWriter, HEADER_SIZE, RECORD_SIZE
+from tests.test_decoder import frame
+
+
+@pytest.fixture
+def capture(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    with CaptureWriter(path) as writer:
+        for i in range(5):
+            writer.write(frame(0x09c9 if i % 2 else 0x0963), 1_000_000_000 * i)
+    return path
+
+
+class TestCaptureWriter:
+    def test_init(self, tmp_path):
+        with pytest.raises(AssertionError):
+            CaptureWriter(None)  # type: ignore
+        with pytest.raises(AssertionError):
+            CaptureWriter("")
+        path = tmp_path / "capture.bin"
+        writer = CaptureWriter(str(path))
+        assert str(writer) == f"<CaptureWriter: path={path}>"
+        writer.close()
+        assert not writer.is_open()
+        assert path.stat().st_size == HEADER_SIZE
+        # Invalid file format.
+        path.write_bytes(b"invalid header..")
+        with pytest.raises(IOError):
+            CaptureWriter(str(path))
+
+    def test_write(self, tmp_path):
+        path = str(tmp_path / "capture.bin")
+        with CaptureWriter(path) as writer:
+            with pytest.raises(ValueError):
+                writer.write(frame(0x0963)[:-1])
+            writer.write(frame(0x0963))
+            writer.flush()
+        with pytest.raises(IOError):
+            writer.write(frame(0x0963))
+        with CaptureReader(path) as reader:
+            assert len(reader) == 1
+            assert reader[0][0] > 0
+
+    def test_append(self, capture):
+        # Interrupted write is discarded on append.
+        with open(capture, "ab") as raw:
+            raw.write(bytes(10))
+        with CaptureWriter(capture) as writer:
+            writer.write(frame(0x0d4c), 42)
+        with CaptureReader(capture) as reader:
+            assert len(reader) == 6
+            assert reader[-1][0] == 42
+            assert reader[-1][1] == frame(0x0d4c)
+
+
+class TestCaptureReader:
+    def test_init(self, tmp_path, capture):
+        with pytest.raises(AssertionError):
+            CaptureReader(None)  # type: ignore
+        with pytest.raises(AssertionError):
+            CaptureReader("")
+        path = tmp_path / "invalid.bin"
+        path.write_bytes(b"short")
+        with pytest.raises(IOError):
+            CaptureReader(str(path))
+        reader = CaptureReader(capture)
+        assert str(reader) == f"<CaptureReader: path={capture} records=5>"
+        reader.close()
+
+    def test_access(self, capture):
+        with CaptureReader(capture) as reader:
+            assert len(reader) == 5
+            timestamp, raw = reader[3]
+            assert timestamp == 3_000_000_000
+            assert isinstance(raw, memoryview)
+            assert raw == frame(0x09c9)
+            assert reader[-1][0] == 4_000_000_000
+            with pytest.raises(IndexError):
+                reader[5]  # pylint: disable=pointless-statement
+            with pytest.raises(IndexError):
+                reader[-6]  # pylint: disable=pointless-statement
+            assert [ts for ts, _ in reader] == [i * 1_000_000_000 for i in range(5)]
+            del raw
+
+    def test_records(self, capture):
+        with CaptureReader(capture) as reader:
+            records = reader.records(1, 3)
+            assert len(records) == 2 * RECORD_SIZE
+            assert records[RECORD_SIZE - 130:RECORD_SIZE] == frame(0x09c9)
+            assert len(reader.records()) == 5 * RECORD_SIZE
+            assert len(reader.records(4, 2)) == 0
+            records.release()
+
+    def test_close_exported(self, capture):
+        with CaptureReader(capture) as reader:
+            records = list(reader)
+        # Record views keep file mapped after close.
+        assert records[3][1] == frame(0x09c9)
+        reader.close()
+        del records
+        reader.close()
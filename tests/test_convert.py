@@ -0,0 +1,86 @@
+import pytest
+from pyummeter import UMmeterDecoder
+from pyummeter.capture import CaptureWriter
+from pyummeter.convert import _date, convert, output_format
+from pyummeter.export_csv import ExportCSV
+from pyummeter.export_sqlite import ExportSQLite
+from tests.test_decoder import frame
+
+MODELS = (0x0963, 0x09c9, 0x0d4c)
+START_NS = 1_700_000_000_123_456_789
+
+
+@pytest.fixture
+def capture(tmp_path):
+    path = str(tmp_path / "capture.bin")
+    with CaptureWriter(path) as writer:
+        for i in range(25):
+            raw = frame(MODELS[i % 3])
+            raw[3] = i  # Voltage.
+            writer.write(raw, START_NS + 100_000_000 * i)
+    return path
+
+
+def samples():
+    decoder = UMmeterDecoder()
+    result = []
+    for i in range(25):
+        raw = frame(MODELS[i % 3])
+        raw[3] = i
+        result.append((_date(START_NS + 100_000_000 * i), decoder.decode(raw)))
+    return result
+
+
+class TestConvert:
+    def test_format(self, capture, tmp_path):
+        assert output_format("a.csv.gz") == "csv"
+        assert output_format("a.sqlite") == "sqlite"
+        assert output_format("a.npy") == "npy"
+        with pytest.raises(ValueError):
+            output_format("a.txt")
+        with pytest.raises(ValueError):
+            convert(capture, str(tmp_path / "a.csv"), "parquet")
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    @pytest.mark.parametrize("name", ["out.csv", "out.csv.gz"])
+    def test_csv(self, capture, tmp_path, workers, name):
+        output = str(tmp_path / name)
+        stats = convert(capture, output, workers=workers, chunk_size=4)
+        assert stats == (25, 7, workers)
+        # Same file as exported live.
+        expected = str(tmp_path / ("expected." + name.split(".", 1)[1]))
+        with ExportCSV(expected, compression="gzip" if name.endswith(".gz") else None) \
+                as export:
+            export.update_many(samples())
+        assert list(ExportCSV.read(output)) == list(ExportCSV.read(expected))
+        if not name.endswith(".gz"):
+            with open(output, "rb") as out_f, open(expected, "rb") as expected_f:
+                assert out_f.read() == expected_f.read()
+
+    def test_sqlite(self, capture, tmp_path):
+        output = str(tmp_path / "out.db")
+        convert(capture, output, workers=2, chunk_size=10, meter="rack0")
+        convert(capture, output, workers=1, meter="rack1")
+        with ExportSQLite(output) as export:
+            assert export.meters() == ["rack0", "rack1"]
+            rows = list(export.query(meter="rack0"))
+        assert [data["voltage"] for _, data in rows] == \
+            [data["voltage"] for _, data in samples()]
+        assert [date for date, _ in rows] == [date for date, _ in samples()]
+
+    def test_npy(self, capture, tmp_path):
+        np = pytest.importorskip("numpy")
+        output = str(tmp_path / "out.npy")
+        convert(capture, output, workers=2, chunk_size=3)
+        records = np.load(output)
+        assert len(records) == 25
+        assert records["timestamp"][0] == np.datetime64(START_NS, "ns")
+        assert list(records["voltage"]) == [data["voltage"] for _, data in samples()]
+        assert list(records["model"]) == [data["model"] for _, data in samples()]
+
+    def test_empty(self, tmp_path):
+        path = str(tmp_path / "capture.bin")
+        CaptureWriter(path).close()
+        stats = convert(path, str(tmp_path / "out.csv"), workers=2)
+        assert (stats.records, stats.chunks) == (0, 0)
+        assert list(ExportCSV.read(str(tmp_path / "out.csv"))) == []
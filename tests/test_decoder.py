@@ -0,0 +1,98 @@
+import pytest
+import struct
+from datetime import timedelta
+from pyummeter import UMmeterData, UMmeterDecoder, UMmeterFrame
+
+
+def frame(model_id: int) -> bytearray:
+    return bytearray([
+        model_id >> 8, model_id & 0xff, 0x01, 0xfe, 0x01, 0x48, 0x00, 0x00,
+        0x06, 0x88, 0x00, 0x14, 0x00, 0x44, 0x00, 0x08,
+        0x00, 0x00, 0x00, 0x0b, 0x00, 0x00, 0x00, 0x38,
+        0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+        0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+        0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+        0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+        0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+        0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+        0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+        0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+        0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x2a,
+        0x00, 0x01, 0x00, 0x02, 0x00, 0x09, 0x00, 0x00,
+        0x00, 0x10, 0x00, 0x00, 0x01, 0x00, 0x00, 0x0a,
+        0x00, 0x00, 0x00, 0xf0, 0x00, 0x01, 0x00, 0x02,
+        0x00, 0x04, 0x00, 0x01, 0x86, 0x9f, 0x00, 0x02,
+        0x68, 0x8c
+    ])
+
+
+class TestDecoder:
+    def test_resolve(self):
+        decoder = UMmeterDecoder()
+        assert str(decoder) == "<UM-Meter decoder: models=0>"
+        name, scale = decoder.resolve(0x0963)
+        assert name == "UM24C"
+        assert scale is not None and scale.voltage == 100
+        assert decoder.resolve(0x0963)[1] is scale
+        assert decoder.resolve(0xffff) == ("Unknown", None)
+        assert str(decoder) == "<UM-Meter decoder: models=2>"
+
+    def test_decode_um24c(self):
+        data = UMmeterDecoder().decode(frame(0x0963))
+        assert data["model"] == "UM24C"
+        assert data["voltage"] == 5.10
+        assert data["intensity"] == 0.328
+        assert data["power"] == 1.672
+        assert data["resistance"] == 9999.9
+        assert data["charging_mode"] == "Unknown"
+        assert data["charging_mode_full"] == "Unknown"
+        assert data["data_group"][0] == {"capacity": 0.011, "energy": 0.056}
+        assert data["data_group"][9] == {"capacity": 0.0, "energy": 0.042}
+        assert data["record_enabled"] is True
+        assert data["record_duration"] == timedelta(seconds=240)
+        assert data["screen_timeout"] == timedelta(minutes=2)
+
+    def test_encode(self):
+        decoder = UMmeterDecoder()
+        for model_id in [0x0963, 0x09c9, 0x0d4c]:
+            raw = frame(model_id)
+            raw[101] = 0x07     # Charging mode: DCP1.5A.
+            raw[128] = 0x00     # Reserved.
+            data = decoder.decode(raw)
+            assert decoder.encode(data) == raw
+            assert decoder.decode(decoder.encode(data)) == data
+        assert decoder.charging_mode_id("QC3") == 2
+        assert decoder.charging_mode_id("Invalid") == 0
+
+    def test_decode_invalid_size(self):
+        with pytest.raises(struct.error):
+            UMmeterDecoder().decode(frame(0x0963)[:-1])
+
+
+class TestFrame:
+    def test_init(self):
+        with pytest.raises(ValueError):
+            UMmeterFrame(frame(0x0963)[:-1])
+        raw = frame(0x09c9)
+        data = UMmeterFrame(raw)
+        assert str(data) == "<UM-Meter frame: model=UM25C>"
+        assert data.raw == bytes(raw)
+        raw[0] = 0xff
+        assert data["model"] == "UM25C"
+
+    def test_mapping(self):
+        decoder = UMmeterDecoder()
+        for model_id in [0x0963, 0x09c9, 0x0d4c, 0xffff]:
+            data = UMmeterFrame(frame(model_id), decoder)
+            assert len(data) == len(decoder.decode(frame(model_id)))
+            assert list(data) == list(UMmeterData.__annotations__)
+            assert data.to_dict() == decoder.decode(frame(model_id))
+            assert data == decoder.decode(frame(model_id))
+        data = UMmeterFrame(frame(0x0963))
+        assert data["voltage"] == 5.10
+        assert data["data_group"][9] == {"capacity": 0.0, "energy": 0.042}
+        assert data.get("unknown") is None
+        with pytest.raises(KeyError):
+            data["unknown"]  # pylint: disable=pointless-statement
+        with pytest.raises(AttributeError):
+            data.cache = {}  # type: ignore
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+import pytest
+from pyummeter import UMmeterDecoder, UMmeterFrame
+from pyummeter.export_changes import ExportChanges
+from tests.test_decoder import frame
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def data(voltage: float, intensity: float):
+    return {"voltage": voltage, "intensity": intensity, "model": "UM25C"}
+
+
+class TestExportChanges:
+    def test_init(self):
+        with pytest.raises(ValueError):
+            ExportChanges(Mock(), deadband={"voltage": 0.005})
+        with pytest.raises(ValueError):
+            ExportChanges(Mock(), fields=["intensity"], deadband={"voltage": 0.005})
+        export = Mock()
+        with ExportChanges(export) as changes:
+            changes.flush()
+            export.flush.assert_called_once()
+        export.close.assert_called_once()
+
+    def test_data(self):
+        export = Mock()
+        changes = ExportChanges(export)
+        changes.update(START, data(5.0, 0.1))
+        changes.update(START, data(5.0, 0.1))
+        changes.update(START, data(5.0, 0.2))
+        assert export.update.call_count == 2
+        assert changes.stats() == (2, 1, 0)
+
+    def test_frame(self):
+        export = Mock()
+        changes = ExportChanges(export)
+        decoder = UMmeterDecoder()
+        raw = frame(0x0963)
+        changes.update(START, UMmeterFrame(raw, decoder))
+        changes.update(START, UMmeterFrame(bytes(raw), decoder))
+        raw[3] += 1
+        changes.update(START, UMmeterFrame(raw, decoder))
+        assert export.update.call_count == 2
+
+    def test_fields_deadband(self):
+        export = Mock()
+        changes = ExportChanges(
+            export, fields=["voltage", "intensity"], deadband={"voltage": 0.005})
+        samples = [
+            data(5.000, 0.1),
+            data(5.004, 0.1),   # Within deadband.
+            data(5.008, 0.1),   # Drifted from last written.
+            data(5.008, 0.2),
+            {"voltage": 5.008, "intensity": 0.2, "model": "UM34C"},  # Not compared.
+        ]
+        changes.update_many([(START, sample) for sample in samples])
+        written = export.update_many.call_args[0][0]
+        assert [sample for _, sample in written] == [samples[0], samples[2], samples[3]]
+        assert changes.stats() == (3, 2, 0)
+
+    def test_keepalive(self):
+        export = Mock()
+        changes = ExportChanges(export, keepalive=timedelta(seconds=10))
+        for second in range(25):
+            changes.update(START + timedelta(seconds=second), data(5.0, 0.1))
+        assert [call[0][0] for call in export.update.call_args_list] == [
+            START, START + timedelta(seconds=10), START + timedelta(seconds=20)]
+        assert changes.stats() == (3, 22, 2)
@@ -1,6 +1,8 @@
+import os
 import pytest
 import unittest
 from datetime import datetime, timedelta
+from unittest.mock import call
 from pyummeter import UMmeterData
 from pyummeter.export_csv import ExportCSV
 
@@ -10,6 +12,45 @@ def mfile(mocker):
     return mocker.patch("builtins.open", unittest.mock.mock_open())  # type: ignore
 
 
+@pytest.fixture
+def data() -> UMmeterData:
+    return {
+        "model": "UM34C",
+        "voltage": 5.10,
+        "intensity": 0.328,
+        "power": 1.672,
+        "resistance": 9999.9,
+        "usb_voltage_dp": 0.01,
+        "usb_voltage_dn": 0.02,
+        "charging_mode": "DCP1.5A",
+        "charging_mode_full": "Dedicated Charging Port (max. 1.5 A)",
+        "temperature_celsius": 20,
+        "temperature_fahrenheit": 68,
+        "data_group_selected": 0,
+        "data_group": [
+            {"capacity": 0.011, "energy": 0.056},
+            {"capacity": 0.0, "energy": 0.0},
+            {"capacity": 0.0, "energy": 0.0},
+            {"capacity": 0.0, "energy": 0.0},
+            {"capacity": 0.0, "energy": 0.0},
+            {"capacity": 0.0, "energy": 0.0},
+            {"capacity": 0.0, "energy": 0.0},
+            {"capacity": 0.0, "energy": 0.0},
+            {"capacity": 0.0, "energy": 0.0},
+            {"capacity": 0.0, "energy": 0.0}
+        ],
+        "record_capacity_threshold": 0.016,
+        "record_energy_threshold": 0.256,
+        "record_intensity_threshold": 0.1,
+        "record_duration": timedelta(seconds=240),
+        "record_enabled": False,
+        "screen_index": 2,
+        "screen_timeout": timedelta(minutes=2),
+        "screen_brightness": 4,
+        "checksum": 0x8c,
+    }
+
+
 class TestExportCSV:
     def test_init(self, mfile):
         with pytest.raises(AssertionError):
@@ -25,43 +66,8 @@ class TestExportCSV:
             "Record energy (Wh);Capacity (Ah);Energy (Wh)\r\n")
         assert str(export) == "<ExportCSV: path=test.csv>"
 
-    def test_update(self, mfile):
+    def test_update(self, mfile, data):
         date = datetime.now()
-        data: UMmeterData = {
-            "model": "UM34C",
-            "voltage": 5.10,
-            "intensity": 0.328,
-            "power": 1.672,
-            "resistance": 9999.9,
-            "usb_voltage_dp": 0.01,
-            "usb_voltage_dn": 0.02,
-            "charging_mode": "DCP1.5A",
-            "charging_mode_full": "Dedicated Charging Port (max. 1.5 A)",
-            "temperature_celsius": 20,
-            "temperature_fahrenheit": 68,
-            "data_group_selected": 0,
-            "data_group": [
-                {"capacity": 0.011, "energy": 0.056},
-                {"capacity": 0.0, "energy": 0.0},
-                {"capacity": 0.0, "energy": 0.0},
-                {"capacity": 0.0, "energy": 0.0},
-                {"capacity": 0.0, "energy": 0.0},
-                {"capacity": 0.0, "energy": 0.0},
-                {"capacity": 0.0, "energy": 0.0},
-                {"capacity": 0.0, "energy": 0.0},
-                {"capacity": 0.0, "energy": 0.0},
-                {"capacity": 0.0, "energy": 0.0}
-            ],
-            "record_capacity_threshold": 0.016,
-            "record_energy_threshold": 0.256,
-            "record_intensity_threshold": 0.1,
-            "record_duration": timedelta(seconds=240),
-            "record_enabled": False,
-            "screen_index": 2,
-            "screen_timeout": timedelta(minutes=2),
-            "screen_brightness": 4,
-            "checksum": 0x8c,
-        }
         export = ExportCSV("test.csv")
         mfile().reset_mock()
         export.update(date, data)
@@ -71,3 +77,166 @@ class TestExportCSV:
             "5.1;0.328;1.672;9999.9;0.01;0.02;DCP1.5A;20;UM34C;0;240;0.1;"
             "0.016;0.256;0.011;0.056\r\n"
         )
+
+    def test_update_closed(self, mfile, data):
+        with ExportCSV("test.csv") as export:
+            assert export.is_open()
+        assert not export.is_open()
+        mfile().close.assert_called_once()
+        export.close()
+        mfile().close.assert_called_once()
+        with pytest.raises(IOError):
+            export.update(datetime.now(), data)
+        with pytest.raises(IOError):
+            export.update_many([(datetime.now(), data)])
+
+    def test_update_many(self, mfile, data):
+        date = datetime.now()
+        export = ExportCSV("test.csv", flush_rows=None)
+        mfile().reset_mock()
+        export.update_many([(date, data), (date, data)])
+        row = (
+            f"{date.isoformat(sep=' ')};"
+            "5.1;0.328;1.672;9999.9;0.01;0.02;DCP1.5A;20;UM34C;0;240;0.1;"
+            "0.016;0.256;0.011;0.056\r\n"
+        )
+        mfile().write.assert_has_calls([call(row), call(row)])
+        mfile().flush.assert_not_called()
+
+    def test_flush_rows(self, mfile, data):
+        with pytest.raises(AssertionError):
+            ExportCSV("test.csv", flush_rows=-1)
+        export = ExportCSV("test.csv", flush_rows=3)
+        mfile().reset_mock()
+        export.update(datetime.now(), data)
+        export.update_many([(datetime.now(), data)])
+        mfile().flush.assert_not_called()
+        export.update(datetime.now(), data)
+        mfile().flush.assert_called_once()
+        export.update(datetime.now(), data)
+        mfile().flush.assert_called_once()
+        export.flush()
+        assert mfile().flush.call_count == 2
+
+    def test_flush_interval(self, mocker, mfile, data):
+        now = mocker.patch("pyummeter.export_csv.monotonic", return_value=100.0)
+        export = ExportCSV(
+            "test.csv", flush_rows=None, flush_interval=timedelta(seconds=1))
+        mfile().reset_mock()
+        now.return_value = 100.5
+        export.update(datetime.now(), data)
+        mfile().flush.assert_not_called()
+        now.return_value = 101.0
+        export.update(datetime.now(), data)
+        mfile().flush.assert_called_once()
+
+    def test_fsync(self, mocker, mfile, data):
+        fsync = mocker.patch("os.fsync")
+        export = ExportCSV("test.csv", fsync=True)
+        fsync.assert_called_once_with(mfile().fileno())
+        export.update(datetime.now(), data)
+        assert fsync.call_count == 2
+
+    def test_read(self, tmp_path, data):
+        path = str(tmp_path / "export.csv")
+        date = datetime(2022, 12, 1, 10, 0, 0, 500)
+        data["data_group_selected"] = 1
+        data["data_group"][1] = {"capacity": 1.5, "energy": 7.5}
+        with ExportCSV(path) as export:
+            export.update_many([(date, data), (date + timedelta(seconds=1), data)])
+        rows = list(ExportCSV.read(path))
+        assert len(rows) == 2
+        assert rows[0][0] == date
+        assert rows[1][0] == date + timedelta(seconds=1)
+        read = rows[0][1]
+        assert read["data_group_selected"] == 0
+        assert read["data_group"][0] == {"capacity": 1.5, "energy": 7.5}
+        assert read["data_group"][1] == {"capacity": 0.0, "energy": 0.0}
+        assert read["temperature_fahrenheit"] == 68
+        assert read["screen_timeout"] == timedelta()
+        for key in [
+            "model", "voltage", "intensity", "power", "resistance", "usb_voltage_dp",
+            "usb_voltage_dn", "charging_mode", "charging_mode_full",
+            "temperature_celsius", "record_capacity_threshold",
+            "record_energy_threshold", "record_intensity_threshold",
+            "record_duration", "record_enabled"
+        ]:
+            assert read[key] == data[key], key  # type: ignore
+
+    def test_format(self, tmp_path, data):
+        path = tmp_path / "export.csv"
+        date = datetime(2022, 12, 1, 10, 0, 0)
+        with ExportCSV(str(path)) as export:
+            export.update_many([(date, data)] * 2)
+        text = ExportCSV.format_header() + ExportCSV.format_rows([(date, data)] * 2)
+        assert path.read_bytes() == text.encode("utf-8")
+
+    def test_read_truncated(self, tmp_path, data):
+        path = tmp_path / "export.csv"
+        date = datetime(2022, 12, 1, 10, 0, 0)
+        with ExportCSV(str(path)) as export:
+            export.update_many([(date, data)] * 3)
+        content = path.read_bytes()
+        path.write_bytes(content[:-20])
+        assert len(list(ExportCSV.read(str(path)))) == 2
+        path.write_bytes(content + b"\r\n" + content.splitlines()[1][:10])
+        assert len(list(ExportCSV.read(str(path)))) == 3
+
+    @pytest.mark.parametrize("compression, suffix, magic", [
+        ("gzip", ".gz", b"\x1f\x8b"), ("xz", ".xz", b"\xfd7zXZ")])
+    def test_compression(self, tmp_path, data, compression, suffix, magic):
+        path = str(tmp_path / "export.csv")
+        date = datetime(2022, 12, 1, 10, 0, 0)
+        with pytest.raises(ValueError):
+            ExportCSV(path, compression="zip")
+        with ExportCSV(path, flush_rows=None, compression=compression) as export:
+            export.update_many([(date, data)] * 100)
+        assert export.segments() == [path + suffix]
+        with open(export.segments()[0], "rb") as file:
+            assert file.read(len(magic)) == magic
+        rows = list(ExportCSV.read(export.segments()[0]))
+        assert len(rows) == 100
+        assert rows[0][1]["voltage"] == data["voltage"]
+
+    def test_compression_flush(self, tmp_path, data):
+        date = datetime(2022, 12, 1, 10, 0, 0)
+        path = str(tmp_path / "export.csv")
+        with ExportCSV(path, compression="gzip") as export:
+            assert export._flush_rows == 1000
+            export.update_many([(date, data)] * 999)
+            assert export._pending == 999
+            export.update(date, data)
+            assert export._pending == 0
+        with ExportCSV(path, compression="xz", fsync=True) as export:
+            export.update_many([(date, data)] * 1000)
+            # Rows only written to storage once segment is closed.
+            assert os.path.getsize(export.segments()[0]) < 100
+        assert len(list(ExportCSV.read(export.segments()[0]))) == 1000
+        assert ExportCSV(str(tmp_path / "plain.csv"))._flush_rows == 1
+
+    def test_rotate_size(self, tmp_path, data):
+        path = str(tmp_path / "export.csv")
+        date = datetime(2022, 12, 1, 10, 0, 0)
+        with ExportCSV(path, rotate_size=1000) as export:
+            for _ in range(20):
+                export.update(date, data)
+        segments = export.segments()
+        assert segments[:2] == [
+            str(tmp_path / "export.0001.csv"), str(tmp_path / "export.0002.csv")]
+        assert len(segments) > 2
+        assert sum(len(list(ExportCSV.read(segment))) for segment in segments) == 20
+
+    def test_rotate_interval(self, mocker, tmp_path, data):
+        monotonic = mocker.patch("pyummeter.export_csv.monotonic")
+        monotonic.return_value = 0.0
+        path = str(tmp_path / "export.csv.gz")
+        date = datetime(2022, 12, 1, 10, 0, 0)
+        with ExportCSV(
+                path, compression="gzip", rotate_interval=timedelta(hours=1)) as export:
+            export.update(date, data)
+            monotonic.return_value = 3600.0
+            export.update(date, data)
+            export.update(date, data)
+        assert export.segments() == [
+            str(tmp_path / "export.0001.csv.gz"), str(tmp_path / "export.0002.csv.gz")]
+        assert [len(list(ExportCSV.read(segment))) for segment in export.segments()] == [2, 1]
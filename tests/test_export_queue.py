@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+from threading import Event
+from typing import cast
+from unittest.mock import Mock
+import pytest
+from pyummeter import UMmeterData
+from pyummeter.export_queue import ExportQueue
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def sample(voltage: int) -> UMmeterData:
+    """ Sample data, only voltage being used """
+    return cast(UMmeterData, {"voltage": voltage})
+
+
+class BlockedExport:
+    """ Export blocked until released """
+    def __init__(self):
+        self.release = Event()
+        self.rows = []
+        self.closed = False
+
+    def update(self, date, data):
+        self.update_many([(date, data)])
+
+    def update_many(self, samples):
+        self.release.wait()
+        self.rows.extend(samples)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class TestExportQueue:
+    def test_init(self):
+        with pytest.raises(ValueError):
+            ExportQueue(Mock(), overflow="drop")
+        export = Mock()
+        with ExportQueue(export) as queue:
+            assert queue.is_open()
+        assert not queue.is_open()
+        export.close.assert_called_once()
+        with pytest.raises(IOError):
+            queue.update(START, {})
+        with pytest.raises(IOError):
+            queue.flush()
+
+    def test_update(self):
+        export = Mock()
+        with ExportQueue(export, batch=4) as queue:
+            for second in range(10):
+                queue.update(START + timedelta(seconds=second), sample(second))
+            assert queue.flush(timedelta(seconds=1))
+            export.flush.assert_called_once()
+        written = [
+            sample for call in export.update_many.call_args_list for sample in call[0][0]]
+        assert [data["voltage"] for _, data in written] == list(range(10))
+        assert all(len(call[0][0]) <= 4 for call in export.update_many.call_args_list)
+        stats = queue.stats()
+        assert (stats.queued, stats.written, stats.dropped, stats.errors) == (10, 10, 0, 0)
+
+    @pytest.mark.parametrize("overflow, kept", [
+        ("drop_oldest", [0, 7, 8, 9]), ("drop_newest", [0, 1, 2, 3])])
+    def test_overflow(self, overflow, kept):
+        export = BlockedExport()
+        queue = ExportQueue(export, size=3, overflow=overflow, batch=1)
+        queue.update(START, sample(0))
+        # Wait for worker to be blocked on first sample.
+        while queue.stats().depth_max == 0 or len(queue._queue) != 0:
+            pass
+        for index in range(1, 10):
+            queue.update(START, sample(index))
+        assert queue.stats().dropped == 6
+        export.release.set()
+        queue.close()
+        assert [data["voltage"] for _, data in export.rows] == kept
+        assert export.closed
+
+    def test_block(self):
+        export = BlockedExport()
+        queue = ExportQueue(export, size=2, batch=10)
+        export.release.set()
+        queue.update_many([(START, sample(index)) for index in range(50)])
+        queue.close()
+        assert [data["voltage"] for _, data in export.rows] == list(range(50))
+        assert queue.stats().depth_max == 2
+
+    def test_close_timeout(self):
+        export = BlockedExport()
+        queue = ExportQueue(export, batch=1)
+        queue.update_many([(START, sample(index)) for index in range(5)])
+        queue.close(timedelta(milliseconds=50))
+        assert not queue.is_open()
+        assert queue.stats().dropped >= 4
+        assert not export.closed
+        export.release.set()
+        assert queue._thread is not None
+        queue._thread.join(1)
+        assert export.closed
+
+    def test_error(self):
+        export = Mock()
+        export.update_many.side_effect = [IOError("disk full"), None]
+        with ExportQueue(export, batch=1) as queue:
+            queue.update(START, {})
+            assert queue.flush(timedelta(seconds=1))
+            queue.update(START, {})
+        stats = queue.stats()
+        assert (stats.written, stats.dropped, stats.errors) == (1, 1, 1)
+        assert stats.last_error == "OSError('disk full')"
@@ -0,0 +1,88 @@
+import sqlite3
+from datetime import datetime, timedelta
+import pytest
+from pyummeter import UMmeterDecoder, UMmeterFrame
+from pyummeter.export_sqlite import ExportSQLite
+from tests.test_decoder import frame
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def count(path: str) -> int:
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+
+
+class TestExportSQLite:
+    def test_init(self, tmp_path):
+        path = str(tmp_path / "export.db")
+        with pytest.raises(AssertionError):
+            ExportSQLite("")
+        with ExportSQLite(path) as export:
+            assert str(export) == f"<ExportSQLite: path={path} meter=default>"
+            assert export.is_open()
+        assert not export.is_open()
+        with sqlite3.connect(path) as db:
+            assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            indexes = db.execute("PRAGMA index_list(samples)").fetchall()
+            assert [index[1] for index in indexes] == ["samples_meter_timestamp"]
+            columns = {row[1]: row[2] for row in db.execute("PRAGMA table_info(samples)")}
+            assert columns["voltage"] == "REAL"
+            assert columns["model"] == "TEXT"
+            assert columns["screen_index"] == "INTEGER"
+            assert columns["data_group_9_energy"] == "REAL"
+
+    def test_update_closed(self, tmp_path):
+        export = ExportSQLite(str(tmp_path / "export.db"))
+        export.close()
+        data = UMmeterDecoder().decode(frame(0x0963))
+        with pytest.raises(IOError):
+            export.update(START, data)
+        with pytest.raises(IOError):
+            export.update_many([(START, data)])
+        with pytest.raises(IOError):
+            list(export.query())
+
+    def test_batch(self, tmp_path):
+        path = str(tmp_path / "export.db")
+        data = UMmeterDecoder().decode(frame(0x0963))
+        with ExportSQLite(path, flush_rows=3, flush_interval=None) as export:
+            export.update(START, data)
+            export.update(START, data)
+            assert count(path) == 0
+            export.update(START, data)
+            assert count(path) == 3
+            export.update_many([(START, data)] * 2)
+            assert count(path) == 3
+        assert count(path) == 5
+
+    def test_insert_rows(self, tmp_path):
+        path = str(tmp_path / "export.db")
+        data = UMmeterDecoder().decode(frame(0x0963))
+        rows = [ExportSQLite.format_row("bench0", START, data)] * 4
+        with ExportSQLite(path, flush_rows=3, flush_interval=None) as export:
+            export.insert_rows(rows)
+            assert count(path) == 4
+            assert export.meters() == ["bench0"]
+            assert list(export.query(meter="bench0"))[0][1]["voltage"] == data["voltage"]
+        with pytest.raises(IOError):
+            export.insert_rows(rows)
+
+    def test_query(self, tmp_path):
+        path = str(tmp_path / "export.db")
+        decoder = UMmeterDecoder()
+        with ExportSQLite(path, meter="bench0") as export:
+            for second in range(10):
+                export.update(
+                    START + timedelta(seconds=second), decoder.decode(frame(0x09c9)))
+            export.update(START, UMmeterFrame(frame(0x0d4c), decoder))
+            samples = list(export.query(START + timedelta(seconds=2), START + timedelta(seconds=5)))
+            assert [date for date, _ in samples] == [
+                START + timedelta(seconds=second) for second in range(2, 5)]
+            assert samples[0][1] == decoder.decode(frame(0x09c9))
+            assert len(list(export.query())) == 11
+            assert list(export.query(meter="other")) == []
+        with ExportSQLite(path, meter="bench1") as export:
+            export.update(START, decoder.decode(frame(0x0963)))
+            assert export.meters() == ["bench0", "bench1"]
+            assert len(list(export.query())) == 1
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+import pytest
+from pyummeter.integrator import UMmeterIntegrator
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+class TestIntegrator:
+    def test_update(self):
+        integrator = UMmeterIntegrator()
+        assert integrator.totals() == (0.0, 0.0, timedelta(0), 0, 0)
+        # 1 A / 5 W for one hour, in 0.5 s steps, with a ramp at start.
+        integrator.update(START, {"intensity": 0.0, "power": 0.0})
+        for index in range(1, 7201):
+            integrator.update(
+                START + timedelta(seconds=index / 2), {"intensity": 1.0, "power": 5.0})
+        totals = integrator.totals()
+        assert totals.capacity == pytest.approx(1.0 - 0.25 / 3600)
+        assert totals.energy == pytest.approx(5.0 - 1.25 / 3600)
+        assert totals.duration == timedelta(hours=1)
+        assert totals.samples == 7201
+        assert totals.gaps == 0
+        integrator.reset()
+        assert integrator.totals().samples == 0
+
+    def test_gap(self):
+        integrator = UMmeterIntegrator(max_gap=timedelta(seconds=2))
+        integrator.update(START, {"intensity": 1.0, "power": 5.0})
+        integrator.update(START + timedelta(seconds=1), {"intensity": 1.0, "power": 5.0})
+        integrator.update(START + timedelta(seconds=10), {"intensity": 1.0, "power": 5.0})
+        totals = integrator.totals()
+        assert totals.capacity == pytest.approx(1 / 3600)
+        assert totals.duration == timedelta(seconds=1)
+        assert totals.gaps == 1
+        # Gaps integrated when disabled.
+        integrator = UMmeterIntegrator(max_gap=None)
+        integrator.update(START, {"intensity": 1.0, "power": 5.0})
+        integrator.update(START + timedelta(hours=1), {"intensity": 1.0, "power": 5.0})
+        assert integrator.totals().energy == pytest.approx(5.0)
+
+    def test_backwards(self):
+        # Local time going back one hour (daylight saving time end): gap.
+        integrator = UMmeterIntegrator()
+        integrator.update(START, {"intensity": 1.0, "power": 5.0})
+        integrator.update(START + timedelta(seconds=1), {"intensity": 1.0, "power": 5.0})
+        integrator.update(START - timedelta(minutes=59), {"intensity": 1.0, "power": 5.0})
+        integrator.update(START - timedelta(minutes=59) + timedelta(seconds=1),
+                          {"intensity": 1.0, "power": 5.0})
+        totals = integrator.totals()
+        assert totals.capacity == pytest.approx(2 / 3600)
+        assert totals.duration == timedelta(seconds=2)
+        assert totals.samples == 4
+        assert totals.gaps == 1
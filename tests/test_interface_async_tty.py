@@ -0,0 +1,92 @@
+import asyncio
+import os
+import pytest
+from datetime import timedelta
+from pyummeter import AsyncUMmeter, UMmeterInterfaceAsyncTTY
+from tests.test_decoder import frame
+
+
+@pytest.fixture
+def pty():
+    master, slave = os.openpty()
+    yield master, os.ttyname(slave)
+    os.close(master)
+    os.close(slave)
+
+
+class TestInterfaceAsyncTTY:
+    def test_init(self, mocker):
+        mock_serial = mocker.patch("serial.Serial", autospec=True)
+        with pytest.raises(AssertionError):
+            UMmeterInterfaceAsyncTTY(None)  # type: ignore
+        with pytest.raises(AssertionError):
+            UMmeterInterfaceAsyncTTY("")
+        interface = UMmeterInterfaceAsyncTTY("/dev/tty")
+        assert str(interface) == "<Async TTY: path=/dev/tty open=False>"
+        interface.open()
+        mock_serial.assert_called_once_with(
+            "/dev/tty", baudrate=9600, bytesize=8, parity='N', stopbits=1,
+            timeout=0, write_timeout=0)
+        interface.close()
+        interface.open()
+        mock_serial.return_value.open.assert_called_once()
+
+    def test_open_invalid(self):
+        with pytest.raises(IOError):
+            UMmeterInterfaceAsyncTTY("/dev/invalid").open()
+
+    def test_closed(self):
+        interface = UMmeterInterfaceAsyncTTY("/dev/tty")
+        with pytest.raises(IOError):
+            interface.set_timeout(timedelta(seconds=1))
+        with pytest.raises(IOError):
+            asyncio.run(interface.send(bytearray([1])))
+        with pytest.raises(IOError):
+            asyncio.run(interface.receive(1))
+
+    def test_send_receive(self, pty):
+        master, path = pty
+
+        async def run():
+            interface = UMmeterInterfaceAsyncTTY(path)
+            interface.open()
+            assert await interface.send(bytearray([0xf0])) == 1
+            assert os.read(master, 1) == b"\xf0"
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, os.write, master, b"\x01\x02")
+            loop.call_later(0.1, os.write, master, b"\x03")
+            assert await interface.receive(3) == bytearray([1, 2, 3])
+            interface.close()
+        asyncio.run(run())
+
+    def test_receive_timeout(self, pty):
+        master, path = pty
+
+        async def run():
+            interface = UMmeterInterfaceAsyncTTY(path)
+            interface.open()
+            interface.set_timeout(timedelta(milliseconds=100))
+            os.write(master, b"\x01")
+            assert await interface.receive(2) == bytearray([1])
+            interface.close()
+        asyncio.run(run())
+
+    def test_meters(self, pty):
+        master, path = pty
+
+        async def device():
+            loop = asyncio.get_running_loop()
+            for model_id in [0x0963, 0x09c9]:
+                assert await loop.run_in_executor(None, os.read, master, 1) == b"\xf0"
+                os.write(master, frame(model_id))
+
+        async def run():
+            async with AsyncUMmeter(UMmeterInterfaceAsyncTTY(path)) as meter:
+                meter.set_timeout(1)
+                task = asyncio.create_task(device())
+                data = await meter.get_data()
+                assert data is not None and data["model"] == "UM24C"
+                data = await meter.get_frame()
+                assert data is not None and data["model"] == "UM25C"
+                await task
+        asyncio.run(run())
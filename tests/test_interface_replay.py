@@ -0,0 +1,96 @@
+import pytest
+from datetime import datetime, timedelta
+from pyummeter import UMmeter, UMmeterDecoder, UMmeterInterfaceReplay
+from pyummeter.export_csv import ExportCSV
+from tests.test_decoder import frame
+
+
+@pytest.fixture
+def records():
+    return [(i * 100_000_000, frame(model)) for i, model in enumerate([0x0963, 0x09c9])]
+
+
+class TestInterfaceReplay:
+    def test_init(self, records):
+        with pytest.raises(AssertionError):
+            UMmeterInterfaceReplay(None)  # type: ignore
+        interface = UMmeterInterfaceReplay(records)
+        assert str(interface) == "<Replay: paced=False loop=False open=False>"
+
+    def test_closed(self, records):
+        interface = UMmeterInterfaceReplay(records)
+        with pytest.raises(IOError):
+            interface.set_timeout(timedelta(seconds=1))
+        with pytest.raises(IOError):
+            interface.send(bytearray([0xf0]))
+        with pytest.raises(IOError):
+            interface.receive(130)
+
+    def test_replay(self, records):
+        with UMmeter(UMmeterInterfaceReplay(records)) as meter:
+            meter.set_timeout(1)
+            data = meter.get_data()
+            assert data is not None and data["model"] == "UM24C"
+            meter.screen_next()
+            data = meter.get_data()
+            assert data is not None and data["model"] == "UM25C"
+            assert meter.get_data() is None
+        # Re-opened: replay from first record.
+        with UMmeter(UMmeterInterfaceReplay(records)) as meter:
+            data = meter.get_data()
+            assert data is not None and data["model"] == "UM24C"
+
+    def test_receive_partial(self, records):
+        interface = UMmeterInterfaceReplay(records)
+        interface.open()
+        interface.send(bytearray([0xf0]))
+        assert interface.receive(100) == frame(0x0963)[:100]
+        assert interface.receive(100) == frame(0x0963)[100:]
+        assert interface.receive(100) == bytearray()
+        interface.send(bytearray([0xf0]))
+        interface.discard_input()
+        assert interface.receive(100) == bytearray()
+
+    def test_loop(self, records):
+        with UMmeter(UMmeterInterfaceReplay(records, loop=True)) as meter:
+            models = [meter.get_data()["model"] for _ in range(5)]  # type: ignore
+        assert models == ["UM24C", "UM25C", "UM24C", "UM25C", "UM24C"]
+
+    def test_paced(self, mocker, records):
+        mocker.patch("pyummeter.interface_replay.monotonic", return_value=10.0)
+        sleep = mocker.patch("pyummeter.interface_replay.sleep")
+        with UMmeter(UMmeterInterfaceReplay(records, paced=True)) as meter:
+            meter.get_data()
+            sleep.assert_not_called()
+            meter.get_data()
+            sleep.assert_called_once_with(pytest.approx(0.1))
+
+    def test_from_csv(self, tmp_path):
+        path = str(tmp_path / "export.csv")
+        decoder = UMmeterDecoder()
+        date = datetime(2022, 12, 1, 10, 0, 0)
+        selected = decoder.decode(frame(0x0d4c))
+        selected["data_group_selected"] = 0
+        with ExportCSV(path) as export:
+            export.update(date, selected)
+            export.update(date + timedelta(seconds=1), decoder.decode(frame(0x09c9)))
+        with UMmeter(UMmeterInterfaceReplay.from_csv(path)) as meter:
+            data = meter.get_data()
+            assert data is not None
+            assert data["model"] == "UM34C"
+            assert data["voltage"] == 5.10
+            assert data["data_group"][0] == {"capacity": 0.011, "energy": 0.056}
+            data = meter.get_data()
+            assert data is not None
+            assert data["model"] == "UM25C"
+            assert data["intensity"] == 0.0328
+
+    def test_from_csv_truncated(self, tmp_path):
+        path = tmp_path / "export.csv"
+        with ExportCSV(str(path)) as export:
+            export.update(datetime(2022, 12, 1, 10, 0, 0), UMmeterDecoder().decode(frame(0x0963)))
+        with open(path, "a", encoding="utf-8") as file:
+            file.write("2022-12-01 10:00:01;5.1")
+        with UMmeter(UMmeterInterfaceReplay.from_csv(str(path))) as meter:
+            assert meter.get_data()["model"] == "UM24C"
+            assert meter.get_data() is None
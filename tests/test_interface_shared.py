@@ -0,0 +1,88 @@
+from threading import Event, Thread
+from typing import List
+from unittest.mock import Mock
+from pyummeter import UMmeter, UMmeterInterface, UMmeterInterfaceReplay
+from pyummeter.interface_shared import UMmeterInterfaceShared
+from tests.test_decoder import frame
+from tests.test_ummeter import interface_mock
+
+
+class TestInterfaceShared:
+    def test_open_close(self):
+        com = Mock(spec=UMmeterInterface)
+        com.is_open.return_value = True
+        shared = UMmeterInterfaceShared(com)
+        with UMmeter(shared), UMmeter(shared):
+            com.open.assert_called_once()
+            com.close.assert_not_called()
+        com.open.assert_called_once()
+        com.close.assert_called_once()
+        shared.close()
+        com.close.assert_called_once()
+
+    def test_send_queued(self):
+        received = Event()
+        release = Event()
+        sent: List[bytes] = []
+        com = interface_mock(Mock)
+
+        def send(data: bytearray) -> int:
+            sent.append(bytes(data))
+            return len(data)
+        com.send.side_effect = send
+
+        def receive(nb, timeout=None):
+            received.set()
+            release.wait()
+            return frame(0x09c9)
+        com.receive.side_effect = receive
+        shared = UMmeterInterfaceShared(com)
+        poller = UMmeter(shared)
+        ui = UMmeter(shared)
+        results = []
+        thread = Thread(target=lambda: results.append(poller.get_data()))
+        thread.start()
+        received.wait()
+        # Control commands do not wait for the data dump.
+        ui.screen_next()
+        ui.data_group_clear()
+        assert shared.pending() == 2
+        assert sent == [b"\xf0"]
+        release.set()
+        thread.join()
+        assert shared.pending() == 0
+        data = results[0]
+        assert data is not None
+        assert data["model"] == "UM25C"
+        assert sent == [b"\xf0", b"\xf1", b"\xf4"]
+        # Not in transaction: sent directly.
+        ui.screen_rotate()
+        assert sent[-1] == b"\xf2"
+
+    def test_receive_into(self):
+        com = interface_mock(Mock)
+        com.receive.return_value = bytearray([1, 2])
+        shared = UMmeterInterfaceShared(com)
+        buffer = bytearray(4)
+        assert shared.receive_into(memoryview(buffer)[1:3]) == 2
+        assert buffer == bytearray([0, 1, 2, 0])
+        com.receive.assert_called_once_with(2, None)
+
+    def test_threads(self):
+        raw = frame(0x0d4c)
+        shared = UMmeterInterfaceShared(UMmeterInterfaceReplay([(0, raw)], loop=True))
+        results = []
+
+        def poll():
+            with UMmeter(shared) as meter:
+                for _ in range(100):
+                    results.append(meter.get_frame())
+                    meter.screen_next()
+        threads = [Thread(target=poll) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(results) == 400
+        assert all(result is not None and result.raw == raw for result in results)
+        assert not shared.is_open()
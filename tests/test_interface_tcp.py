@@ -0,0 +1,162 @@
+import socket
+from datetime import timedelta
+from threading import Thread
+from time import sleep
+import pytest
+from pyummeter import UMmeter, UMmeterInterfaceTCP
+from pyummeter.interface_tcp import UMmeterConnectionPool
+from tests.test_decoder import frame
+
+
+class MeterServer:
+    """ Local TCP server answering data dump requests """
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self.clients = []
+        self.received = bytearray()
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return
+            self.clients.append(client)
+            Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client):
+        while True:
+            try:
+                data = client.recv(16)
+            except OSError:
+                return
+            if len(data) == 0:
+                return
+            self.received += data
+            for byte in data:
+                if byte == 0xf0:
+                    client.sendall(frame(0x0963))
+
+    def drop(self):
+        for client in self.clients:
+            client.shutdown(socket.SHUT_RDWR)
+            client.close()
+        self.clients.clear()
+
+    def close(self):
+        self.drop()
+        # Wake accept() up, so port is released.
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+@pytest.fixture
+def server():
+    server = MeterServer()
+    yield server
+    server.close()
+
+
+class TestInterfaceTCP:
+    def test_open_close(self, server):
+        com = UMmeterInterfaceTCP("127.0.0.1", server.port)
+        assert not com.is_open()
+        with pytest.raises(IOError):
+            com.send(bytearray([0xf0]))
+        with UMmeter(com) as meter:
+            assert com.is_open() and com.is_connected()
+            assert meter.get_data()["model"] == "UM24C"
+        assert not com.is_open() and not com.is_connected()
+        server.close()
+        with pytest.raises(IOError):
+            com.open()
+
+    def test_options(self, server):
+        com = UMmeterInterfaceTCP("127.0.0.1", server.port)
+        com.open()
+        sock = com._sock
+        assert sock is not None
+        assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY) != 0
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE) != 0
+        com.close()
+
+    def test_timeout(self, server):
+        com = UMmeterInterfaceTCP("127.0.0.1", server.port)
+        com.open()
+        com.set_timeout(timedelta(milliseconds=50))
+        assert com.receive(10) == bytearray()
+        com.send(bytearray([0xf0]))
+        assert com.receive(200, timedelta(milliseconds=200)) == frame(0x0963)
+        com.close()
+
+    def test_receive_into(self, server):
+        com = UMmeterInterfaceTCP("127.0.0.1", server.port)
+        com.open()
+        buffer = bytearray(140)
+        com.send(bytearray([0xf0]))
+        view = memoryview(buffer)
+        assert com.receive_into(view[10:], timedelta(milliseconds=200)) == 130
+        assert buffer[10:] == frame(0x0963)
+        assert com.receive_into(view[:10], timedelta(milliseconds=50)) == 0
+        com.close()
+
+    def test_discard_input(self, server):
+        com = UMmeterInterfaceTCP("127.0.0.1", server.port)
+        com.open()
+        com.send(bytearray([0xf0, 0xf0]))
+        assert len(com.receive(130, timedelta(milliseconds=200))) == 130
+        sleep(0.05)
+        com.discard_input()
+        assert com.receive(130, timedelta(milliseconds=50)) == bytearray()
+        assert com.is_connected()
+        com.close()
+
+    def test_reconnect(self, server):
+        com = UMmeterInterfaceTCP(
+            "127.0.0.1", server.port, backoff_min=timedelta(seconds=60),
+            backoff_max=timedelta(seconds=60))
+        with UMmeter(com) as meter:
+            meter.set_timeout(1)
+            assert meter.get_data() is not None
+            server.drop()
+            with pytest.raises(IOError):
+                meter.get_data()
+            assert not com.is_connected()
+            # Reconnected on next request.
+            assert meter.get_data() is not None
+            assert com.connections() == 2
+            # Backoff after failed connection.
+            server.close()
+            with pytest.raises(IOError):
+                meter.get_data()
+            with pytest.raises(IOError):
+                meter.get_data()
+            with pytest.raises(IOError, match="disconnected"):
+                meter.get_data()
+
+
+class TestConnectionPool:
+    def test_get(self, server):
+        pool = UMmeterConnectionPool()
+        shared = pool.get("127.0.0.1", server.port)
+        assert pool.get("127.0.0.1", server.port) is shared
+        assert len(pool) == 1
+        with UMmeter(pool.get("127.0.0.1", server.port)) as meter1, \
+                UMmeter(pool.get("127.0.0.1", server.port)) as meter2:
+            assert meter1.get_data() is not None
+            meter2.screen_next()
+            assert meter2.get_data() is not None
+            assert len(server.clients) == 1
+        assert not shared.is_open()
+        shared.open()
+        pool.clear()
+        assert not shared.is_open()
+        assert len(pool) == 0
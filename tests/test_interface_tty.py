@@ -1,3 +1,4 @@
+import os
 import pytest
 from datetime import timedelta
 from pyummeter import UMmeterInterfaceTTY
@@ -48,6 +49,8 @@ class TestInterfaceTTY:
         interface.set_timeout(timedelta(seconds=10))
         mock_serial.assert_called_once()
         assert mock_serial.return_value.timeout == 10
+        interface.set_timeout(timedelta(milliseconds=150))
+        assert mock_serial.return_value.timeout == 0.15
 
     def test_set_timeout_closed(self):
         with pytest.raises(IOError):
@@ -76,3 +79,35 @@ class TestInterfaceTTY:
         interface.open()
         assert interface.receive(2) == data
         mock_serial.return_value.read.assert_called_once()
+
+    def test_receive_timeout(self, mock_serial):
+        mock_serial.return_value.read.return_value = bytearray()
+        interface = UMmeterInterfaceTTY("/dev/tty")
+        interface.open()
+        interface.set_timeout(timedelta(seconds=1))
+        interface.receive(2, timedelta(milliseconds=50))
+        assert mock_serial.return_value.timeout == 0.05
+        interface.receive(2)
+        assert mock_serial.return_value.timeout == 1
+
+    def test_receive_into(self, mock_serial):
+        read_fd, write_fd = os.pipe()
+        mock_serial.return_value.fileno.return_value = read_fd
+        interface = UMmeterInterfaceTTY("/dev/tty")
+        with pytest.raises(IOError):
+            interface.receive_into(memoryview(bytearray(2)))
+        interface.open()
+        buffer = bytearray(4)
+        os.write(write_fd, bytes([0xaa, 0xff, 0x55]))
+        # Timeout: bytes received so far.
+        assert interface.receive_into(memoryview(buffer), timedelta(milliseconds=50)) == 3
+        assert buffer == bytearray([0xaa, 0xff, 0x55, 0x00])
+        os.write(write_fd, bytes([0x01, 0x02]))
+        assert interface.receive_into(memoryview(buffer)[1:3]) == 2
+        assert buffer == bytearray([0xaa, 0x01, 0x02, 0x00])
+        mock_serial.return_value.read.assert_not_called()
+        # Closed by peer.
+        os.close(write_fd)
+        with pytest.raises(IOError):
+            interface.receive_into(memoryview(buffer))
+        os.close(read_fd)
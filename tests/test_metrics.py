@@ -0,0 +1,127 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, Mock
+import pytest
+from pyummeter import UMmeter, UMmeterInterface
+from pyummeter.metrics import Histogram, UMmeterInterfaceMetrics, UMmeterMetrics
+from tests.test_decoder import frame
+from tests.test_ummeter import interface_mock
+
+
+class TestHistogram:
+    def test_empty(self):
+        histogram = Histogram()
+        assert len(histogram) == 0
+        assert histogram.percentile(50) == 0.0
+        assert histogram.stats() == (0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        with pytest.raises(ValueError):
+            histogram.percentile(101)
+
+    def test_percentile(self):
+        histogram = Histogram()
+        for ms in range(1, 1001):
+            histogram.add(ms / 1000)
+        assert len(histogram) == 1000
+        stats = histogram.stats()
+        assert stats.samples == 1000
+        assert stats.mean == pytest.approx(0.5005)
+        assert stats.p50 == pytest.approx(0.5, rel=0.07)
+        assert stats.p95 == pytest.approx(0.95, rel=0.07)
+        assert stats.p99 == pytest.approx(0.99, rel=0.07)
+        assert stats.max == 1.0
+        # Below resolution.
+        histogram = Histogram()
+        histogram.add(1e-7)
+        assert histogram.percentile(100) == 1e-7
+
+
+class TestMetrics:
+    def test_record(self):
+        hook = Mock()
+        metrics = UMmeterMetrics()
+        metrics.add_hook(hook)
+        metrics.record("decode", 0.001)
+        hook.assert_called_once_with("decode", 0.001)
+        with metrics.measure("export"):
+            pass
+        metrics.count("frames")
+        metrics.count("bytes_received", 130)
+        stats = metrics.stats()
+        assert stats.frames == 1
+        assert stats.bytes_received == 130
+        assert set(stats.stages) == {"decode", "export"}
+        assert stats.stages["decode"].samples == 1
+        metrics.reset()
+        assert metrics.stats().stages == {}
+        assert metrics.stats().frames == 0
+
+    def test_interface(self):
+        com = MagicMock(spec=UMmeterInterface)
+        com.send.return_value = 1
+        com.receive.side_effect = [bytearray([1]), bytearray([2, 3])]
+        metrics = UMmeterMetrics()
+        interface = UMmeterInterfaceMetrics(com, metrics)
+        assert interface.send(bytearray([0xf0])) == 1
+        assert interface.receive(3, timedelta(seconds=1)) == bytearray([1, 2, 3])
+        assert com.receive.call_args_list[0][0] == (1, timedelta(seconds=1))
+        assert com.receive.call_args_list[1][0][0] == 2
+        assert com.receive.call_args_list[1][0][1] <= timedelta(seconds=1)
+        # Timeout: no byte received.
+        com.receive.side_effect = [bytearray()]
+        assert interface.receive(3) == bytearray()
+        stats = metrics.stats()
+        assert stats.bytes_sent == 1
+        assert stats.bytes_received == 3
+        assert stats.short_reads == 1
+        assert stats.stages["send"].samples == 1
+        assert stats.stages["first_byte"].samples == 1
+        assert stats.stages["receive"].samples == 2
+
+    def test_interface_receive_into(self):
+        com = MagicMock(spec=UMmeterInterface)
+        com.receive_into.side_effect = [1, 2, 0]
+        metrics = UMmeterMetrics()
+        interface = UMmeterInterfaceMetrics(com, metrics)
+        interface.send(bytearray([0xf0]))
+        buffer = memoryview(bytearray(3))
+        assert interface.receive_into(buffer, timedelta(seconds=1)) == 3
+        first, rest = (call[0] for call in com.receive_into.call_args_list)
+        assert (len(first[0]), first[1]) == (1, timedelta(seconds=1))
+        assert len(rest[0]) == 2 and rest[1] <= timedelta(seconds=1)
+        # Timeout: no byte received.
+        assert interface.receive_into(buffer) == 0
+        stats = metrics.stats()
+        assert stats.bytes_received == 3
+        assert stats.short_reads == 1
+        assert stats.stages["first_byte"].samples == 1
+        assert stats.stages["receive"].samples == 2
+
+    def test_interface_timeout(self, mocker):
+        mocker.patch("pyummeter.metrics.perf_counter", side_effect=[0.0, 0.75, 1.0] * 2)
+        com = MagicMock(spec=UMmeterInterface)
+        com.receive.side_effect = [bytearray([1]), bytearray([2])]
+        com.receive_into.side_effect = [1, 1]
+        interface = UMmeterInterfaceMetrics(com, UMmeterMetrics())
+        interface.set_timeout(timedelta(seconds=1))
+        com.set_timeout.assert_called_once_with(timedelta(seconds=1))
+        # Configured timeout bounds whole reception.
+        assert interface.receive(2) == bytearray([1, 2])
+        assert com.receive.call_args_list[1][0] == (1, timedelta(seconds=0.25))
+        assert interface.receive_into(memoryview(bytearray(2))) == 2
+        assert com.receive_into.call_args_list[1][0][1] == timedelta(seconds=0.25)
+
+    def test_meter(self):
+        com = interface_mock()
+        com.is_open.return_value = True
+        com.send.return_value = 1
+        raw = frame(0x0963)
+        com.receive.side_effect = [raw[:1], raw[1:], bytearray()]
+        assert UMmeter(com).stats() is None
+        metrics = UMmeterMetrics()
+        meter = UMmeter(com, metrics=metrics)
+        assert meter.get_data() is not None
+        assert meter.get_data() is None
+        stats = meter.stats()
+        assert stats is not None
+        assert (stats.requests, stats.frames, stats.timeouts) == (2, 1, 1)
+        assert (stats.bytes_sent, stats.bytes_received, stats.short_reads) == (2, 130, 1)
+        assert set(stats.stages) == {"send", "first_byte", "receive", "decode", "request"}
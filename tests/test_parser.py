@@ -0,0 +1,67 @@
+from pyummeter.parser import ParserStats, UMmeterFrameParser
+from tests.test_decoder import frame
+
+
+class TestParser:
+    def test_aligned(self):
+        parser = UMmeterFrameParser()
+        assert str(parser) == "<UM-Meter parser: pending=0>"
+        assert parser.missing() == 130
+        assert parser.feed(frame(0x0963) + frame(0x09c9)) == [
+            bytes(frame(0x0963)), bytes(frame(0x09c9))]
+        assert parser.pending() == 0
+        assert parser.stats() == ParserStats(2, 0, 0, 0)
+
+    def test_split(self):
+        parser = UMmeterFrameParser()
+        raw = frame(0x0d4c)
+        assert parser.feed(raw[:1]) == []
+        assert parser.missing() == 130
+        assert parser.feed(raw[1:50]) == []
+        assert parser.pending() == 50
+        assert parser.missing() == 80
+        assert parser.feed(raw[50:]) == [bytes(raw)]
+        assert parser.stats() == ParserStats(1, 0, 0, 0)
+
+    def test_resync(self):
+        parser = UMmeterFrameParser()
+        # Tail of a previous frame, then a complete frame.
+        raw = frame(0x0963)[70:] + frame(0x09c9)
+        assert parser.feed(raw) == [bytes(frame(0x09c9))]
+        assert parser.stats() == ParserStats(1, 1, 60, 0)
+        # Garbage only: last byte kept as a possible model ID start.
+        assert parser.feed(bytearray([0x00, 0x11, 0x09])) == []
+        assert parser.pending() == 1
+        assert parser.feed(frame(0x0963)[1:]) == [bytes(frame(0x0963))]
+        assert parser.stats() == ParserStats(2, 2, 62, 0)
+
+    def test_truncated(self):
+        # Truncated frame followed by a complete one: without validation,
+        # the truncated frame is completed with the following bytes.
+        raw = frame(0x0963)[:40] + frame(0x0963)
+        parser = UMmeterFrameParser()
+        assert parser.feed(raw) == [bytes(raw[:130])]
+        assert parser.pending() == 1
+        parser.reset()
+        assert parser.pending() == 0
+        assert parser.stats() == ParserStats(1, 1, 40, 0)
+        # With validation, the truncated frame is dropped.
+        parser = UMmeterFrameParser(lambda raw: raw[129] == 0x8c)
+        assert parser.feed(raw) == [bytes(frame(0x0963))]
+        assert parser.stats() == ParserStats(1, 1, 40, 1)
+
+    def test_validate(self):
+        parser = UMmeterFrameParser(lambda raw: raw[129] == 0x8c)
+        bad = frame(0x0963)
+        bad[129] = 0x00
+        assert parser.feed(bad + frame(0x09c9)) == [bytes(frame(0x09c9))]
+        assert parser.stats() == ParserStats(1, 1, 130, 1)
+
+    def test_aligned_check(self):
+        parser = UMmeterFrameParser()
+        assert parser.aligned(frame(0x0963))
+        # Unknown model, without known model ID inside.
+        assert parser.aligned(frame(0xffff))
+        assert not parser.aligned(frame(0x0963)[50:] + frame(0x09c9)[:50])
+        assert not parser.aligned(frame(0x0963)[:129])
+        assert parser.stats().frames == 2
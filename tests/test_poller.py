@@ -0,0 +1,79 @@
+import pytest
+from datetime import timedelta
+from queue import Queue
+from time import sleep
+from typing import List
+from unittest.mock import MagicMock
+from pyummeter import UMmeter, UMmeterInterface, UMmeterInterfaceReplay
+from pyummeter.poller import PollerSample, UMmeterPoller
+from tests.test_decoder import frame
+from tests.test_ummeter import interface_mock
+
+
+def replay_meter(model_id: int) -> UMmeter:
+    return UMmeter(UMmeterInterfaceReplay([(0, frame(model_id))], loop=True))
+
+
+class TestPoller:
+    def test_init(self):
+        with pytest.raises(AssertionError):
+            UMmeterPoller()
+        poller = UMmeterPoller(queue=Queue())
+        poller.add("a", replay_meter(0x0963), timedelta(milliseconds=10))
+        with pytest.raises(ValueError):
+            poller.add("a", replay_meter(0x0963), timedelta(milliseconds=10))
+        with pytest.raises(ValueError):
+            poller.add("b", replay_meter(0x0963), timedelta(seconds=-1))
+        assert poller.devices() == ["a"]
+        assert str(poller) == "<UM-Meter poller: devices=1 running=False>"
+        with poller:
+            assert poller.is_running()
+            with pytest.raises(RuntimeError):
+                poller.add("c", replay_meter(0x0963), timedelta(milliseconds=10))
+        assert not poller.is_running()
+
+    def test_poll(self):
+        queue: Queue = Queue()
+        samples: List[PollerSample] = []
+        poller = UMmeterPoller(callback=samples.append, queue=queue)
+        poller.add("a", replay_meter(0x0963), timedelta(milliseconds=10))
+        poller.add("b", replay_meter(0x09c9), timedelta(milliseconds=20))
+        with poller:
+            sleep(0.2)
+        stats = poller.stats()
+        assert stats["a"].samples > stats["b"].samples > 0
+        assert stats["a"].errors == 0
+        assert len(samples) == queue.qsize() == stats["a"].samples + stats["b"].samples
+        models = {sample.name: sample.data["model"] for sample in samples}
+        assert models == {"a": "UM24C", "b": "UM25C"}
+
+    def test_device_isolation(self):
+        failing = MagicMock(spec=UMmeterInterface)
+        failing.is_open.return_value = False
+        failing.open.side_effect = IOError("unplugged")
+        timeout = interface_mock()
+        timeout.receive.return_value = bytearray()
+        poller = UMmeterPoller(
+            queue=Queue(), retry_delay=timedelta(milliseconds=10),
+            retry_max=timedelta(milliseconds=20))
+        poller.add("ok", replay_meter(0x0963), timedelta(milliseconds=10))
+        poller.add("failing", UMmeter(failing), timedelta(milliseconds=10))
+        poller.add("timeout", UMmeter(timeout), timedelta(milliseconds=10))
+        with poller:
+            sleep(0.2)
+        stats = poller.stats()
+        assert stats["ok"].samples > 10
+        assert stats["failing"].samples == 0
+        assert stats["failing"].errors > 1
+        assert stats["failing"].last_error == "OSError('unplugged')"
+        assert stats["timeout"].timeouts > 10
+
+    def test_callback_error(self):
+        def callback(_):
+            raise RuntimeError()
+        poller = UMmeterPoller(callback=callback)
+        poller.add("a", replay_meter(0x0963), timedelta(milliseconds=10))
+        with poller:
+            sleep(0.05)
+        assert poller.stats()["a"].errors == 0
+        assert poller.callback_errors() == poller.stats()["a"].samples > 0
@@ -0,0 +1,82 @@
+import pytest
+from datetime import timedelta
+from unittest.mock import Mock
+from pyummeter import UMmeter, UMmeterInterfaceReplay
+from pyummeter.sampler import DeadlineScheduler, UMmeterSampler
+from tests.test_decoder import frame
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestDeadlineScheduler:
+    def test_init(self):
+        with pytest.raises(ValueError):
+            DeadlineScheduler(timedelta(seconds=-1))
+        assert str(DeadlineScheduler(timedelta(seconds=1))) == "<Scheduler: period=1.0s>"
+
+    def test_no_drift(self):
+        clock = Clock()
+        scheduler = DeadlineScheduler(timedelta(seconds=1), clock)
+        for i in range(10):
+            assert scheduler.delay() == pytest.approx(0.0 if i == 0 else 0.7)
+            clock.now += scheduler.delay()
+            scheduler.tick()
+            # Request round-trip.
+            clock.now += 0.3
+        stats = scheduler.stats()
+        assert stats.samples == 10
+        assert stats.missed == 0
+        assert stats.rate == pytest.approx(10 / 9.3)
+        assert stats.jitter == pytest.approx(0.0)
+
+    def test_missed(self):
+        clock = Clock()
+        scheduler = DeadlineScheduler(timedelta(seconds=1), clock)
+        scheduler.tick()
+        # Request overrun: deadline at 101 missed, 102 served late.
+        clock.now += 2.5
+        assert scheduler.delay() == 0.0
+        scheduler.tick()
+        assert scheduler.delay() == pytest.approx(0.5)
+        stats = scheduler.stats()
+        assert stats.samples == 2
+        assert stats.missed == 1
+        assert stats.lateness_max == pytest.approx(0.5)
+        assert stats.jitter == pytest.approx(0.25)
+        # Realign grid on now, statistics kept.
+        clock.now += 10
+        scheduler.realign()
+        assert scheduler.delay() == 0.0
+        assert scheduler.stats().missed == 1
+        scheduler.start()
+        assert scheduler.stats().samples == 0
+
+
+class TestSampler:
+    def test_sample(self, mocker):
+        sleep = mocker.patch("pyummeter.sampler.sleep")
+        meter = UMmeter(UMmeterInterfaceReplay([(0, frame(0x0963))], loop=True))
+        meter.open()
+        sampler = UMmeterSampler(meter, timedelta(milliseconds=10))
+        assert str(sampler).startswith("<UM-Meter sampler: meter=")
+        samples = []
+        for date, data in sampler:
+            samples.append((date, data))
+            if len(samples) == 3:
+                break
+        assert all(data is not None and data["model"] == "UM24C" for _, data in samples)
+        assert sleep.call_count == 3
+        assert sampler.stats().samples == 3
+
+    def test_sample_timeout(self, mocker):
+        mocker.patch("pyummeter.sampler.sleep")
+        meter = Mock(spec=UMmeter)
+        meter.get_data.return_value = None
+        _, data = UMmeterSampler(meter, timedelta(seconds=1)).sample()
+        assert data is None
@@ -0,0 +1,112 @@
+from datetime import timedelta
+from time import sleep
+import pytest
+from pyummeter import UMmeter, UMmeterInterfaceTTY
+from pyummeter.simulator import SimulatorFaults, UMmeterSimulator
+
+
+@pytest.fixture
+def simulator():
+    with UMmeterSimulator("UM34C", baudrate=None) as sim:
+        yield sim
+
+
+class TestSimulator:
+    def test_init(self):
+        with pytest.raises(ValueError):
+            UMmeterSimulator("UM99C")
+        sim = UMmeterSimulator()
+        assert not sim.is_running()
+        assert sim.data()["model"] == "UM25C"
+        with pytest.raises(KeyError):
+            sim.update(unknown=1)
+        sim.update(voltage=5.0, intensity=0.5)
+        assert sim.data()["power"] == 2.5
+        assert sim.data()["resistance"] == 10.0
+
+    def test_command(self):
+        sim = UMmeterSimulator(baudrate=None)
+        sim.command(0xf3)
+        assert sim.data()["screen_index"] == 5
+        sim.command(0xf1)
+        assert sim.data()["screen_index"] == 0
+        sim.command(0xe9)
+        assert sim.data()["screen_timeout"] == timedelta(minutes=9)
+        sim.command(0xd2)
+        assert sim.data()["screen_brightness"] == 2
+        sim.command(0xb5)
+        assert sim.data()["record_intensity_threshold"] == 0.05
+        sim.command(0xbf)
+        assert sim.data()["record_intensity_threshold"] == 0.15
+        sim.command(0xce)
+        assert sim.data()["record_intensity_threshold"] == 0.3
+        sim.command(0xa4)
+        assert sim.data()["data_group_selected"] == 4
+        sim.command(0x00)
+        assert sim.stats() == (0, 8, 0)
+
+    def test_command_um24c(self):
+        sim = UMmeterSimulator("UM24C", baudrate=None)
+        sim.command(0xa9)
+        sim.command(0xf3)
+        assert sim.data()["data_group_selected"] == 0
+        sim.command(0xf3)
+        assert sim.data()["data_group_selected"] == 1
+        assert sim.data()["screen_index"] == 0
+        with UMmeterSimulator("UM24C", baudrate=None) as sim:
+            with UMmeter(UMmeterInterfaceTTY(sim.path)) as meter:
+                meter.set_timeout(1)
+                meter.data_group_next()
+                data = meter.get_data()
+                assert data is not None
+                assert data["data_group_selected"] == 1
+
+    def test_get_data(self, simulator):
+        simulator.update(voltage=5.1, intensity=1.2)
+        with UMmeter(UMmeterInterfaceTTY(simulator.path)) as meter:
+            meter.set_timeout(1)
+            data = meter.get_data()
+            assert data is not None
+            assert data["model"] == "UM34C"
+            assert data["voltage"] == 5.1
+            assert data["intensity"] == 1.2
+            meter.screen_brightness(1)
+            meter.data_group_set(7)
+            data = meter.get_data()
+            assert data is not None
+            assert data["screen_brightness"] == 1
+            assert data["data_group_selected"] == 7
+        assert simulator.stats() == (2, 2, 0)
+
+    def test_baudrate(self):
+        with UMmeterSimulator(baudrate=9600) as sim:
+            with UMmeter(UMmeterInterfaceTTY(sim.path)) as meter:
+                meter.set_timeout(1)
+                # 130 bytes at 9600 bauds: at least 135 ms.
+                assert meter.get_data(timedelta(milliseconds=50)) is None
+                assert meter.get_data(timedelta(seconds=1)) is not None
+
+    def test_late_response(self):
+        with UMmeterSimulator(baudrate=9600) as sim:
+            with UMmeter(UMmeterInterfaceTTY(sim.path)) as meter:
+                meter.set_timeout(1)
+                sim.update(voltage=2.0)
+                # Timeout: response received late, discarded on next request.
+                assert meter.get_data(timedelta(milliseconds=50)) is None
+                for voltage in [3.0, 4.0, 5.0]:
+                    sleep(0.3)
+                    sim.update(voltage=voltage)
+                    data = meter.get_data()
+                    assert data is not None
+                    assert data["voltage"] == voltage
+
+    def test_faults(self):
+        faults = SimulatorFaults(drop=0.2, truncate=0.2, garbage=0.2)
+        with UMmeterSimulator(baudrate=None, faults=faults, seed=1) as sim:
+            with UMmeter(UMmeterInterfaceTTY(sim.path)) as meter:
+                meter.set_timeout(0.05)
+                received = [meter.get_data() for _ in range(50)]
+            assert sim.stats().faults > 0
+            assert meter.parser_stats().resyncs > 0
+            assert all(data["model"] == "UM25C" for data in received if data is not None)
+            assert sum(data is not None for data in received) > 20
@@ -0,0 +1,161 @@
+import pytest
+from contextlib import nullcontext
+from datetime import timedelta
+from time import monotonic, sleep
+from typing import List, Optional
+from pyummeter import (
+    UMmeter, UMmeterData, UMmeterDecoder, UMmeterInterfaceReplay, UMmeterInterfaceTTY
+)
+from pyummeter.simulator import SimulatorFaults, UMmeterSimulator
+from tests.test_decoder import frame
+from tests.test_ummeter import interface_mock
+
+
+@pytest.fixture
+def meter():
+    records = [(0, frame(0x0963)), (0, frame(0x09c9))]
+    with UMmeter(UMmeterInterfaceReplay(records, loop=True)) as meter:
+        yield meter
+
+
+class TestStream:
+    def test_not_streaming(self, meter):
+        assert not meter.is_streaming()
+        assert meter.stop_stream() is None
+        assert meter.stream_stats() is None
+        with pytest.raises(RuntimeError):
+            meter.latest()
+        with pytest.raises(RuntimeError):
+            meter.stream()
+
+    def test_stream(self, meter):
+        meter.start_stream(size=16)
+        assert meter.is_streaming()
+        with pytest.raises(RuntimeError):
+            meter.get_data()
+        samples = []
+        for date, data in meter.stream(timeout=timedelta(seconds=1)):
+            samples.append((date, data))
+            if len(samples) == 100:
+                break
+        assert [data["model"] for _, data in samples[:2]] in [
+            ["UM24C", "UM25C"], ["UM25C", "UM24C"]]
+        assert all(samples[i][0] <= samples[i + 1][0] for i in range(99))
+        date, data = meter.latest()
+        assert data["model"] in ["UM24C", "UM25C"]
+        stats = meter.stop_stream()
+        assert stats.frames >= 100
+        assert stats.timeouts == 0
+        assert not meter.is_streaming()
+        # Pending data dump dropped: requests still aligned.
+        assert meter.get_data() is not None
+
+    def test_stream_overrun(self, meter):
+        meter.start_stream(size=1)
+        samples = meter.stream(timeout=timedelta(seconds=1))
+        next(samples)
+        sleep(0.05)
+        next(samples)
+        assert meter.stream_stats().overruns > 0
+        meter.close()
+        assert not meter.is_streaming()
+
+    def test_stream_stopped(self, meter):
+        meter.start_stream()
+        samples = meter.stream()
+        next(samples)
+        meter.stop_stream()
+        # Iteration ends once stopped, after remaining samples.
+        assert all(data is not None for _, data in samples)
+
+    def test_stream_timeout(self):
+        interface = interface_mock()
+        interface.receive.return_value = bytearray()
+        meter = UMmeter(interface)
+        meter.start_stream(timeout=timedelta(milliseconds=10))
+        assert list(meter.stream(timeout=timedelta(milliseconds=50))) == []
+        assert meter.latest() is None
+        stats = meter.stop_stream()
+        assert stats is not None
+        assert stats.timeouts > 0
+
+    def test_stream_silent(self):
+        faults = SimulatorFaults(drop=1.0)
+        with UMmeterSimulator(baudrate=None, faults=faults) as sim:
+            meter = UMmeter(UMmeterInterfaceTTY(sim.path))
+            meter.open()
+            meter.start_stream()
+            assert list(meter.stream(timeout=timedelta(milliseconds=50))) == []
+            # Reader waiting for a response forever, still stopped.
+            start = monotonic()
+            meter.close()
+            assert monotonic() - start < 1
+
+    def test_stream_error(self):
+        interface = interface_mock()
+        interface.receive.side_effect = IOError("disconnected")
+        meter = UMmeter(interface)
+        meter.start_stream()
+        samples = meter.stream()
+        with pytest.raises(IOError):
+            next(samples)
+        assert not meter.is_streaming()
+        stats = meter.stream_stats()
+        assert stats is not None
+        assert stats.errors == 1
+        assert stats.last_error is not None
+        assert "disconnected" in stats.last_error
+        # Reader restarted once interface is back.
+        interface.receive.side_effect = None
+        interface.receive.return_value = frame(0x0963)
+        meter.start_stream()
+        assert meter.is_streaming()
+        assert next(meter.stream(timeout=timedelta(seconds=1)))[1]["model"] == "UM24C"
+        stats = meter.stop_stream()
+        assert stats is not None
+        assert stats.errors == 1
+
+    def test_stream_transaction(self):
+        calls: List[str] = []
+
+        def receive(nb: int, timeout: Optional[timedelta] = None) -> bytearray:
+            calls.append("receive")
+            return frame(0x0963)[:nb]
+        interface = interface_mock()
+        transaction = interface.transaction.return_value
+        transaction.__enter__.side_effect = lambda: calls.append("enter")
+        transaction.__exit__.side_effect = lambda *_: calls.append("exit")
+        interface.send.side_effect = lambda data: calls.append("send")
+        interface.receive.side_effect = receive
+        meter = UMmeter(interface)
+        meter.start_stream()
+        next(meter.stream(timeout=timedelta(seconds=1)))
+        meter.stop_stream()
+        # Each request and its response in a transaction.
+        count = calls.count("enter")
+        assert count > 0
+        assert calls == ["enter", "send", "receive", "exit"] * count
+
+    def test_stream_pipelined(self, mocker):
+        calls: List[str] = []
+        decode = UMmeterDecoder.decode
+
+        def record_decode(decoder: UMmeterDecoder, raw: bytes) -> UMmeterData:
+            calls.append("decode")
+            return decode(decoder, raw)
+
+        def receive(nb: int, timeout: Optional[timedelta] = None) -> bytearray:
+            calls.append("receive")
+            return frame(0x0963)[:nb]
+        mocker.patch.object(UMmeterDecoder, "decode", record_decode)
+        interface = interface_mock()
+        interface.transaction.return_value = nullcontext(interface)
+        interface.send.side_effect = lambda data: calls.append("send")
+        interface.receive.side_effect = receive
+        meter = UMmeter(interface)
+        meter.start_stream()
+        next(meter.stream(timeout=timedelta(seconds=1)))
+        meter.stop_stream()
+        # Next request sent before decoding data dump, pending one dropped.
+        assert calls[:5] == ["send", "receive", "send", "decode", "receive"]
+        assert calls[-2:] == ["decode", "receive"]
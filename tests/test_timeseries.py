@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+import pytest
+from pyummeter.timeseries import TimeSeriesAggregate, TimeSeriesSample, UMmeterTimeSeries
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def sample(power: float):
+    return {"voltage": 5.0, "intensity": power / 5.0, "power": power}
+
+
+class TestTimeSeries:
+    def test_init(self):
+        series = UMmeterTimeSeries()
+        assert len(series) == 0
+        assert series.fields() == ["voltage", "intensity", "power"]
+        assert series.resolutions() == [
+            timedelta(seconds=1), timedelta(minutes=1), timedelta(hours=1)]
+        assert str(series) == "<UM-Meter time-series: samples=0 tiers=3>"
+        with pytest.raises(ValueError):
+            UMmeterTimeSeries(tiers=[(timedelta(0), 10)])
+
+    def test_query(self):
+        series = UMmeterTimeSeries(capacity=10)
+        for index in range(15):
+            series.append(START + timedelta(seconds=index / 2), sample(index))
+        # Oldest samples dropped.
+        assert len(series) == 10
+        assert series.query("power", START, START + timedelta(hours=1)) == [
+            TimeSeriesSample(START + timedelta(seconds=index / 2), index)
+            for index in range(5, 15)
+        ]
+        assert series.query(
+            "power", START + timedelta(seconds=3), START + timedelta(seconds=4)
+        ) == [
+            TimeSeriesSample(START + timedelta(seconds=3), 6),
+            TimeSeriesSample(START + timedelta(seconds=3.5), 7),
+        ]
+        assert series.query("power", START, START) == []
+        with pytest.raises(KeyError):
+            series.query("resistance", START, START)
+        # Sample older than last one dropped.
+        assert series.dropped() == 0
+        series.append(START, sample(0))
+        assert len(series) == 10
+        assert series.dropped() == 1
+        # Then appended again once not older.
+        series.append(START + timedelta(seconds=7), sample(15))
+        assert series.query("power", START + timedelta(seconds=7), START + timedelta(hours=1)) == [
+            TimeSeriesSample(START + timedelta(seconds=7), 14),
+            TimeSeriesSample(START + timedelta(seconds=7), 15),
+        ]
+
+    def test_aggregate(self):
+        series = UMmeterTimeSeries(tiers=[(timedelta(seconds=1), 3), (timedelta(minutes=1), 2)])
+        for index in range(10):
+            series.append(START + timedelta(seconds=index / 2), sample(index))
+        # Tier ring of 3 periods.
+        assert series.aggregate(
+            "power", START, START + timedelta(minutes=1), timedelta(seconds=1)
+        ) == [
+            TimeSeriesAggregate(START + timedelta(seconds=2), 4, 5, 4.5, 2),
+            TimeSeriesAggregate(START + timedelta(seconds=3), 6, 7, 6.5, 2),
+            TimeSeriesAggregate(START + timedelta(seconds=4), 8, 9, 8.5, 2),
+        ]
+        assert series.aggregate(
+            "voltage", START, START + timedelta(hours=1), timedelta(minutes=1)
+        ) == [TimeSeriesAggregate(START, 5.0, 5.0, 5.0, 10)]
+        with pytest.raises(ValueError):
+            series.aggregate("power", START, START, timedelta(hours=1))
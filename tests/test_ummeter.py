@@ -1,12 +1,25 @@
+import asyncio
 from datetime import timedelta
-from unittest.mock import Mock
+from functools import partial
+from typing import Awaitable, Callable, List, Tuple
+from unittest.mock import MagicMock, Mock
 import pytest
-from pyummeter import UMmeter, UMmeterInterface
+from pyummeter import (
+    AsyncUMmeter, UMmeter, UMmeterAsyncInterface, UMmeterDecoder, UMmeterInterface
+)
+from tests.test_decoder import frame
+
+
+def interface_mock(mock_class=MagicMock):
+    """ Interface mock, receive_into() using mocked receive() """
+    com = mock_class(spec=UMmeterInterface)
+    com.receive_into.side_effect = partial(UMmeterInterface.receive_into, com)
+    return com
 
 
 @pytest.fixture
 def mock_interface():
-    return Mock(spec=UMmeterInterface)
+    return interface_mock()
 
 
 class TestUMmeter:
@@ -24,6 +37,10 @@ class TestUMmeter:
         mock_interface.is_open.return_value = True
         UMmeter(mock_interface).set_timeout(1)
         mock_interface.set_timeout.assert_called_once()
+        UMmeter(mock_interface).set_timeout(0.2)
+        mock_interface.set_timeout.assert_called_with(timedelta(milliseconds=200))
+        with pytest.raises(ValueError):
+            UMmeter(mock_interface).set_timeout(-1)
 
     def test_control(self, mock_interface):
         mock_interface.is_open.return_value = True
@@ -259,3 +276,142 @@ class TestUMmeter:
             "screen_brightness": 4,
             "checksum": 0x8c,
         }
+
+    def test_get_frame(self, mock_interface):
+        mock_interface.is_open.return_value = True
+        mock_interface.receive.return_value = bytearray()
+        assert UMmeter(mock_interface).get_frame() is None
+        mock_interface.receive.return_value = frame(0x0d4c)
+        data = UMmeter(mock_interface).get_frame()
+        mock_interface.send.assert_called_with(bytearray([0xf0]))
+        assert data is not None
+        assert data.raw == bytes(frame(0x0d4c))
+        assert data["voltage"] == 5.10
+        assert data == UMmeterDecoder().decode(frame(0x0d4c))
+
+    def test_get_frame_buffer(self, mock_interface):
+        mock_interface.is_open.return_value = True
+        mock_interface.receive.side_effect = [frame(0x0963), frame(0x0d4c)]
+        meter = UMmeter(mock_interface)
+        first = meter.get_frame()
+        second = meter.get_frame()
+        # Received in the same buffer, frames keep their own data.
+        views = [call[0][0] for call in mock_interface.receive_into.call_args_list]
+        assert views[0].obj is views[1].obj
+        assert first is not None and first.raw == bytes(frame(0x0963))
+        assert second is not None and second.raw == bytes(frame(0x0d4c))
+
+    def test_get_data_resync(self, mock_interface):
+        mock_interface.is_open.return_value = True
+        meter = UMmeter(mock_interface)
+        # Short reception: stale response discarded on next request.
+        mock_interface.receive.side_effect = [frame(0x0963)[:50], bytearray()]
+        assert meter.get_data() is None
+        mock_interface.discard_input.assert_not_called()
+        mock_interface.receive.side_effect = [frame(0x09c9)]
+        assert meter.get_data() == UMmeterDecoder().decode(frame(0x09c9))
+        mock_interface.discard_input.assert_called_once()
+        mock_interface.receive.assert_called_with(130, None)
+        assert meter.parser_stats().discarded == 50
+        mock_interface.receive.side_effect = [frame(0x0d4c)]
+        assert meter.get_data() is not None
+        mock_interface.discard_input.assert_called_once()
+        # Misaligned reception: resynchronised on next frame.
+        meter = UMmeter(mock_interface)
+        mock_interface.receive.side_effect = [
+            frame(0x0963)[50:] + frame(0x09c9)[:50], frame(0x09c9)[50:]]
+        assert meter.get_data() == UMmeterDecoder().decode(frame(0x09c9))
+        assert meter.parser_stats() == (1, 1, 80, 0)
+        mock_interface.receive.side_effect = [frame(0x0d4c)]
+        assert meter.get_data() == UMmeterDecoder().decode(frame(0x0d4c))
+
+    def test_get_data_deadline(self, mock_interface, mocker):
+        mock_interface.is_open.return_value = True
+        meter = UMmeter(mock_interface)
+        with pytest.raises(ValueError):
+            meter.get_data(timedelta(seconds=-1))
+        monotonic = mocker.patch("pyummeter.ummeter.monotonic")
+        # Deadline covers both receptions.
+        monotonic.side_effect = [10.0, 10.0, 10.1]
+        mock_interface.receive.side_effect = [
+            frame(0x0963)[50:] + frame(0x09c9)[:50], frame(0x09c9)[50:]]
+        assert meter.get_data(timedelta(milliseconds=300)) is not None
+        assert mock_interface.receive.call_args_list[-2][0] == (
+            130, timedelta(milliseconds=300))
+        assert mock_interface.receive.call_args_list[-1][0] == (
+            80, timedelta(milliseconds=200))
+        # Deadline elapsed: no further reception.
+        monotonic.side_effect = [20.0, 20.0, 20.5]
+        mock_interface.receive.side_effect = [frame(0x0963)[50:] + frame(0x09c9)[:50]]
+        assert meter.get_data(timedelta(milliseconds=300)) is None
+        assert mock_interface.receive.call_count == 3
+
+    def test_get_data_validate(self, mock_interface):
+        mock_interface.is_open.return_value = True
+        meter = UMmeter(mock_interface, validate=lambda raw: raw[129] == 0x8c)
+        bad = frame(0x0963)
+        bad[129] = 0x00
+        mock_interface.receive.side_effect = [bad, bytearray()]
+        assert meter.get_data() is None
+        assert meter.parser_stats().invalid == 1
+
+
+@pytest.fixture
+def mock_async_interface():
+    return Mock(spec=UMmeterAsyncInterface)
+
+
+class TestAsyncUMmeter:
+    def test_enter_exit(self, mock_async_interface):
+        async def run():
+            async with AsyncUMmeter(mock_async_interface) as meter:
+                mock_async_interface.open.assert_called_once()
+                assert str(meter).startswith("<Async UM-Meter: com=")
+            mock_async_interface.close.assert_called_once()
+        asyncio.run(run())
+
+    def test_set_timeout(self, mock_async_interface):
+        mock_async_interface.is_open.return_value = False
+        AsyncUMmeter(mock_async_interface).set_timeout(1)
+        mock_async_interface.set_timeout.assert_not_called()
+        mock_async_interface.is_open.return_value = True
+        AsyncUMmeter(mock_async_interface).set_timeout(1)
+        mock_async_interface.set_timeout.assert_called_once_with(timedelta(seconds=1))
+
+    def test_control(self, mock_async_interface):
+        async def run():
+            meter = AsyncUMmeter(mock_async_interface)
+            commands: List[Tuple[Callable[..., Awaitable[None]], List[int], int]] = [
+                (meter.screen_next, [], 0xf1),
+                (meter.screen_previous, [], 0xf3),
+                (meter.screen_rotate, [], 0xf2),
+                (meter.screen_timeout, [9], 0xe9),
+                (meter.screen_brightness, [5], 0xd5),
+                (meter.data_threshold, [16], 0xb2),
+                (meter.data_group_set, [9], 0xa9),
+                (meter.data_group_next, [], 0xf3),
+                (meter.data_group_clear, [], 0xf4),
+            ]
+            for command, args, value in commands:
+                await command(*args)
+                mock_async_interface.send.assert_awaited_with(bytearray([value]))
+            for command, value in [
+                (meter.screen_timeout, 10),
+                (meter.screen_brightness, 6),
+                (meter.data_threshold, 301),
+                (meter.data_group_set, -1),
+            ]:
+                with pytest.raises(ValueError):
+                    await command(value)
+        asyncio.run(run())
+
+    def test_get_data(self, mock_async_interface):
+        async def run():
+            meter = AsyncUMmeter(mock_async_interface)
+            mock_async_interface.receive.return_value = bytearray()
+            assert await meter.get_data() is None
+            assert await meter.get_frame() is None
+            mock_async_interface.receive.return_value = frame(0x0d4c)
+            assert await meter.get_data() == UMmeterDecoder().decode(frame(0x0d4c))
+            mock_async_interface.send.assert_awaited_with(bytearray([0xf0]))
+        asyncio.run(run())